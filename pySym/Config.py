@@ -1,3 +1,32 @@
 # This file will house generic PySym config settings
 
 PYSYM_MAX_SYM_LIST_SPLIT=256
+
+# Number of solver queries to remember answers for (per z3 context, per process)
+PYSYM_QUERY_CACHE_SIZE=4096
+
+# How pyState.String() represents strings when the Project doesn't say.
+#   chars: A list of Chars, one z3 Int per character (default)
+#   seq: A single z3 String, with symbolic length (see pyObjectManager.SeqString)
+PYSYM_STRING_BACKEND="chars"
+
+# When PathGroup asks the solver if a new path is still possible. See PathGroup.feasibility.
+#   eager: After every step (default)
+#   lazy: Only after steps that branched (If, While, Assert or more than one resulting path)
+#   completion: Only once a path completes
+PYSYM_FEASIBILITY="eager"
+
+# Merge paths that reach the same point in the program in PathGroup. See PathGroup.merge.
+PYSYM_MERGE=False
+
+# Don't merge states that differ in more variables than this. Each one becomes a z3.If.
+PYSYM_MERGE_MAX_VARS=16
+
+# Don't merge states that added more constraints than this between them since they split
+PYSYM_MERGE_MAX_CONSTRAINTS=64
+
+# Drop redundant paths in PathGroup. See PathGroup.prune.
+#   none: Keep every path (default)
+#   duplicates: Drop paths at the same point as another with the same variables and constraints
+#   subsumption: Also drop paths whose constraints imply another's there (asks the solver)
+PYSYM_PRUNE="none"
@@ -1,6 +1,7 @@
 import logging
 logger = logging.getLogger("Project")
 from . import Colorer
+from . import Config
 
 import enforce
 import os
@@ -9,9 +10,15 @@ import types
 #@enforce.runtime_validation
 class Project:
 
-    __slots__ = ['__file_name', '__factory', '__weakref__', '__hooks']
+    __slots__ = ['__file_name', '__factory', '__weakref__', '__hooks', '__string_backend']
 
-    def __init__(self, file, debug=False):
+    def __init__(self, file, debug=False, string_backend=None):
+        """
+        Args:
+            file (str): Python file to symbolically execute.
+            debug (bool, optional): Turn on debug logging.
+            string_backend (str, optional): How pyState.String() represents strings. See string_backend.
+        """
     
         if debug:
             logging.basicConfig(level=logging.DEBUG)
@@ -19,6 +26,7 @@ class Project:
         self.file_name = file
         self.factory = Factory(self)
         self._hooks = {}
+        self.string_backend = string_backend
 
     def hook(self, address, callback):
         """Registers pySym to hook address and call the callback when hit.
@@ -54,6 +62,25 @@ class Project:
         assert isinstance(hooks, dict), "Unexpected type for hooks of {}".format(type(hooks))
         self.__hooks = hooks
 
+    @property
+    def string_backend(self):
+        """str: How pyState.String() represents strings.
+
+        Valid options are:
+           - chars: A list of Chars, one z3 Int per character.
+           - seq: A single z3 String with symbolic length.
+
+        Defaults to Config.PYSYM_STRING_BACKEND.
+        """
+        return self.__string_backend
+
+    @string_backend.setter
+    def string_backend(self, string_backend):
+        if string_backend is None:
+            string_backend = Config.PYSYM_STRING_BACKEND
+        assert string_backend in ["chars", "seq"], "String backend '{}' is not valid.".format(string_backend)
+        self.__string_backend = string_backend
+
     @property
     def factory(self):
         return self.__factory
@@ -0,0 +1,499 @@
+"""
+Search strategies for PathGroup.
+
+A strategy holds a PathGroup's active paths. It keeps them in a heap ordered
+by its priority for each path, so adding a path, removing one and picking the
+next one to step are all O(log n), however many paths are active. Iterating
+over a strategy gives the paths in the order they were added.
+
+The random strategies don't need an order. They keep their paths in an array
+instead, with a sum tree over the weights where paths aren't all equally
+likely, so a pick is O(1) or O(log n) too.
+
+To make a new strategy, subclass SearchStrategy and override priority (and
+select if more than one path should be stepped at a time). Then give the
+class as PathGroup's search_strategy.
+"""
+
+import logging
+import random
+import itertools
+from collections import OrderedDict
+
+logger = logging.getLogger("SearchStrategy")
+
+
+class SearchStrategy:
+    """
+    Base strategy. Steps the path with the lowest priority first, breaking
+    ties by the order they were added.
+    """
+
+    __slots__ = ['__heap', '__positions', '__order', '__count', '__list']
+
+    # True if a path's priority can change while it waits in the heap. Such
+    # priorities get checked again before the path is picked.
+    dynamic = False
+
+    # Break ties in favor of the newest path instead of the oldest
+    newest_first = False
+
+    def __init__(self, paths=None):
+        """
+        Args:
+            paths (iterable, optional): Paths to start with.
+        """
+        # Heap entries are ((priority, sequence), path). Sequences are unique, so paths are never compared.
+        self.__heap = []
+        # id(path) -> index into heap
+        self.__positions = {}
+        # id(path) -> path, in the order they were added
+        self.__order = OrderedDict()
+        self.__count = itertools.count()
+        # Paths in the order they were added, for iterating and indexing. None until needed after a change.
+        self.__list = None
+
+        for path in paths if paths is not None else []:
+            self.append(path)
+
+    def priority(self, path):
+        """Priority of path. Lower gets stepped first. The base strategy doesn't prefer any path."""
+        return 0
+
+    def selected(self, path):
+        """Called when path is picked to be stepped."""
+        pass
+
+    def select(self):
+        """
+        Returns:
+            list: Paths to step next. They are removed from the strategy.
+        """
+        return [self.pop()]
+
+    def append(self, path):
+        """Add path. Named like list.append so PathGroup can stash paths here like in any other stash."""
+        if id(path) in self.__positions:
+            err = "append: Path {} is already active".format(path)
+            logger.error(err)
+            raise Exception(err)
+
+        self.__order[id(path)] = path
+        self.__list = None
+        seq = next(self.__count)
+        self.__heap.append(((self.priority(path), -seq if self.newest_first else seq), path))
+        self.__positions[id(path)] = len(self.__heap) - 1
+        self.__sift_up(len(self.__heap) - 1)
+
+    def remove(self, path):
+        """Remove path. Raises ValueError if it isn't here, like list.remove."""
+        if id(path) not in self.__positions:
+            raise ValueError("SearchStrategy.remove(path): path not active")
+
+        self.__remove_at(self.__positions[id(path)])
+
+    def pop(self):
+        """Removes and returns the path to step next."""
+        if len(self.__heap) == 0:
+            raise IndexError("pop from empty SearchStrategy")
+
+        if self.dynamic:
+            self.__refresh_top()
+
+        path = self.__heap[0][1]
+        self.__remove_at(0)
+        self.selected(path)
+        return path
+
+    def clear(self):
+        """Removes all paths."""
+        self.__heap = []
+        self.__positions = {}
+        self.__order = OrderedDict()
+        self.__list = None
+
+    def __len__(self):
+        return len(self.__heap)
+
+    def __ordered(self):
+        if self.__list is None:
+            self.__list = list(self.__order.values())
+        return self.__list
+
+    def __iter__(self):
+        # The list is replaced rather than changed, so paths can be removed while iterating
+        return iter(self.__ordered())
+
+    def __contains__(self, path):
+        return id(path) in self.__positions
+
+    def __getitem__(self, index):
+        return self.__ordered()[index]
+
+    def __repr__(self):
+        return "<{0} with {1} paths>".format(type(self).__name__, len(self))
+
+    ########
+    # Heap #
+    ########
+
+    def __refresh_top(self):
+        """Re-ranks the top of the heap until its priority is current."""
+        heap = self.__heap
+
+        while True:
+            (prio, seq), path = heap[0]
+            current = self.priority(path)
+            if current == prio:
+                return
+            heap[0] = ((current, seq), path)
+            self.__sift_down(0)
+
+    def __remove_at(self, index):
+        heap = self.__heap
+        path = heap[index][1]
+        del self.__positions[id(path)]
+        del self.__order[id(path)]
+        self.__list = None
+
+        last = heap.pop()
+        if index == len(heap):
+            return
+
+        heap[index] = last
+        self.__positions[id(last[1])] = index
+        self.__sift_up(index)
+        self.__sift_down(self.__positions[id(last[1])])
+
+    def __sift_up(self, index):
+        heap = self.__heap
+        positions = self.__positions
+        entry = heap[index]
+
+        while index > 0:
+            parent = (index - 1) >> 1
+            if not entry[0] < heap[parent][0]:
+                break
+            heap[index] = heap[parent]
+            positions[id(heap[index][1])] = index
+            index = parent
+
+        heap[index] = entry
+        positions[id(entry[1])] = index
+
+    def __sift_down(self, index):
+        heap = self.__heap
+        positions = self.__positions
+        entry = heap[index]
+        end = len(heap)
+
+        while True:
+            child = 2 * index + 1
+            if child >= end:
+                break
+            if child + 1 < end and heap[child + 1][0] < heap[child][0]:
+                child += 1
+            if not heap[child][0] < entry[0]:
+                break
+            heap[index] = heap[child]
+            positions[id(heap[index][1])] = index
+            index = child
+
+        heap[index] = entry
+        positions[id(entry[1])] = index
+
+
+class Breadth(SearchStrategy):
+    """Traditional searching. Every step, step each active path in the order they were added."""
+
+    __slots__ = []
+
+    def select(self):
+        paths = list(self)
+        self.clear()
+        for path in paths:
+            self.selected(path)
+        return paths
+
+
+class Depth(SearchStrategy):
+    """Drill one path down as far as possible. Always steps the newest path."""
+
+    __slots__ = []
+
+    newest_first = True
+
+
+class _SumTree:
+    """
+    Fenwick tree over an array of non-negative weights. Appending or popping
+    the last weight, changing one, and finding where a running total falls
+    are all O(log n).
+    """
+
+    __slots__ = ['__tree', '__weights']
+
+    def __init__(self):
+        # 1 indexed. tree[i] is the sum of the weights in (i - lowbit(i), i].
+        self.__tree = [0.0]
+        self.__weights = []
+
+    def __len__(self):
+        return len(self.__weights)
+
+    def __getitem__(self, index):
+        return self.__weights[index]
+
+    def __setitem__(self, index, weight):
+        tree = self.__tree
+        delta = weight - self.__weights[index]
+        self.__weights[index] = weight
+
+        i = index + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def append(self, weight):
+        tree = self.__tree
+        self.__weights.append(weight)
+
+        i = len(tree)
+        j = i - 1
+        lowest = i - (i & -i)
+        while j > lowest:
+            weight += tree[j]
+            j -= j & -j
+
+        tree.append(weight)
+
+    def pop(self):
+        """Removes the last weight. Nothing before it depends on it."""
+        self.__tree.pop()
+        return self.__weights.pop()
+
+    def total(self):
+        tree = self.__tree
+        total = 0.0
+        i = len(tree) - 1
+
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+
+        return total
+
+    def find(self, value):
+        """Returns the index of the weight that the running total passes value in."""
+        tree = self.__tree
+        n = len(tree) - 1
+        index = 0
+        step = 1 << n.bit_length()
+
+        while step > 0:
+            if index + step <= n and tree[index + step] <= value:
+                index += step
+                value -= tree[index]
+            step >>= 1
+
+        # Rounding can leave value just past the end
+        return min(index, n - 1)
+
+
+class Random(SearchStrategy):
+    """
+    Step one path picked uniformly at random. Paths are also kept in an
+    array, so a pick is O(1), and the last path fills in the slot of a path
+    that's removed.
+    """
+
+    __slots__ = ['__paths', '__index', '__tree', '__logs', '__base']
+
+    # If True, pick paths by the weights from weight instead of uniformly
+    weighted = False
+
+    def __init__(self, paths=None):
+        # Slot -> path
+        self.__paths = []
+        # id(path) -> slot
+        self.__index = {}
+        # Weights and their base 2 logs by slot, if weighted
+        self.__tree = _SumTree()
+        self.__logs = []
+        # Weights are stored as 2^(log - base), so they don't all underflow
+        self.__base = 0
+        super(Random, self).__init__(paths)
+
+    def weight(self, path):
+        """Base 2 log of the relative chance of path being picked. Only used if weighted, and must not change while path is active."""
+        return 0
+
+    def select(self):
+        if len(self) == 0:
+            raise IndexError("select from empty SearchStrategy")
+
+        if not self.weighted:
+            slot = random.randrange(len(self.__paths))
+
+        else:
+            # Everything heavy is gone. Scale back up before the rest underflows.
+            if self.__tree.total() < 2.0 ** -500:
+                self.__rebase()
+            slot = self.__tree.find(random.random() * self.__tree.total())
+
+        path = self.__paths[slot]
+        self.remove(path)
+        self.selected(path)
+        return [path]
+
+    def append(self, path):
+        super(Random, self).append(path)
+        self.__index[id(path)] = len(self.__paths)
+        self.__paths.append(path)
+
+        if self.weighted:
+            log = self.weight(path)
+            if len(self.__logs) == 0:
+                self.__base = log
+            self.__logs.append(log)
+
+            # Much heavier than anything so far. Scale everything down before it overflows.
+            if log - self.__base > 500:
+                self.__tree.append(0.0)
+                self.__rebase()
+            else:
+                self.__tree.append(self.__scale(log))
+
+    def remove(self, path):
+        super(Random, self).remove(path)
+        self.__unslot(path)
+
+    def pop(self):
+        path = super(Random, self).pop()
+        self.__unslot(path)
+        return path
+
+    def clear(self):
+        super(Random, self).clear()
+        self.__paths = []
+        self.__index = {}
+        self.__tree = _SumTree()
+        self.__logs = []
+
+    def __scale(self, log):
+        return 2.0 ** max(log - self.__base, -1000)
+
+    def __rebase(self):
+        """Make the heaviest path weigh 1. O(n), but only needed when weights have drifted by 2^500."""
+        self.__base = max(self.__logs)
+        for slot, log in enumerate(self.__logs):
+            self.__tree[slot] = self.__scale(log)
+
+    def __unslot(self, path):
+        slot = self.__index.pop(id(path))
+        last = self.__paths.pop()
+
+        if self.weighted:
+            log = self.__logs.pop()
+            weight = self.__tree.pop()
+
+        if slot == len(self.__paths):
+            return
+
+        self.__paths[slot] = last
+        self.__index[id(last)] = slot
+
+        if self.weighted:
+            self.__logs[slot] = log
+            self.__tree[slot] = weight
+
+
+class RandomPath(Random):
+    """
+    Step one path picked at random, weighted by 2^-forks. Every fork halves
+    the chance of each side, so paths deep in a fork heavy region don't crowd
+    out the rest. See pySym.pyPath.Path.forks.
+    """
+
+    __slots__ = []
+
+    weighted = True
+
+    def weight(self, path):
+        # A path's forks don't change until it's stepped
+        return -path.forks
+
+
+class Coverage(SearchStrategy):
+    """Step paths about to run a line nothing has stepped yet first, oldest first."""
+
+    __slots__ = ['covered']
+
+    dynamic = True
+
+    def __init__(self, paths=None):
+        # Line numbers already stepped
+        self.covered = set()
+        super(Coverage, self).__init__(paths)
+
+    def priority(self, path):
+        return 0 if path.state.lineno() not in self.covered else 1
+
+    def selected(self, path):
+        self.covered.add(path.state.lineno())
+
+
+class Constraints(SearchStrategy):
+    """Step the path with the fewest constraints first."""
+
+    __slots__ = []
+
+    def priority(self, path):
+        trail = path.state.solver.trail
+        return 0 if trail is None else trail.depth
+
+
+class Forks(SearchStrategy):
+    """Step the path that has forked the fewest times first. See pySym.pyPath.Path.forks."""
+
+    __slots__ = []
+
+    def priority(self, path):
+        return path.forks
+
+
+class ProgramOrder(SearchStrategy):
+    """
+    Step the path that is furthest behind in the program first, comparing
+    where each path will go back to from the outermost call down. Paths that
+    split at a branch then meet again where it ends, which is what
+    PathGroup's merge needs.
+    """
+
+    __slots__ = []
+
+    def priority(self, path):
+        state = path.state
+        position = [frame.path[0].lineno for frame in reversed(list(state.callStack)) if len(frame.path) > 0]
+
+        if len(state.path) > 0:
+            position.append(state.path[0].lineno)
+        elif state.loop is not None:
+            position.append(state.loop.lineno)
+
+        # Anything still inside a block comes before whatever is waiting after it
+        position.append(float('inf'))
+        return tuple(position)
+
+
+# Name -> strategy class for PathGroup's search_strategy
+strategies = {
+    "breadth": Breadth,
+    "depth": Depth,
+    "random": Random,
+    "random_path": RandomPath,
+    "coverage": Coverage,
+    "constraints": Constraints,
+    "forks": Forks,
+    "program_order": ProgramOrder,
+}
@@ -0,0 +1,180 @@
+"""
+Saving and loading of Paths, for checkpointing explorations and moving them
+between machines.
+
+A file holds two pickles. The first is a header with the format version and
+the root AST nodes (function bodies, paths, call stacks, loops and
+backtraces) of every state being saved. Every AST node under those roots gets
+an id from its position in an ast.walk of them. The second pickle holds the
+paths themselves, where AST nodes are only written as their id. States,
+object managers and solvers pickle themselves, with constraints as SMT-LIB2.
+
+dumps and loads do the same for paths going to and from PathGroup's worker
+processes, which build the same NodeTable once when they start. Solver trail
+nodes are written with their key as well, so the side that loads them keeps
+using the nodes it already has.
+"""
+
+import io
+import ast
+import pickle
+import logging
+from .pyState import Solver
+
+logger = logging.getLogger("Serialize")
+
+FORMAT_VERSION = 1
+
+
+class NodeTable:
+    """
+    Numbers every AST node reachable from a list of root nodes.
+    """
+
+    __slots__ = ['roots', 'nodes', 'index']
+
+    def __init__(self, roots):
+        """
+        Args:
+            roots (list): Root ast.AST nodes. The same roots always give the same ids.
+        """
+        self.roots = roots
+        self.nodes = []
+        # id(node) -> index into nodes
+        self.index = {}
+
+        for root in roots:
+            for node in ast.walk(root):
+                if id(node) not in self.index:
+                    self.index[id(node)] = len(self.nodes)
+                    self.nodes.append(node)
+
+    @classmethod
+    def from_paths(cls, paths):
+        """Builds the table for all AST nodes held by the given paths."""
+        roots = []
+        seen = set()
+
+        def add(nodes):
+            for node in nodes:
+                if isinstance(node, ast.AST) and id(node) not in seen:
+                    seen.add(id(node))
+                    roots.append(node)
+
+        for path in paths:
+            # Summaries (see pySym.pyPath.PathSummary) don't hold any AST
+            state = getattr(path, "state", None)
+            if state is None:
+                continue
+
+            add(state.functions.values())
+            add(state.path)
+            add(state.backtrace)
+            add([state.loop])
+
+            for frame in state.callStack:
+                add(frame.path)
+                add([frame.loop])
+
+        return cls(roots)
+
+
+class _Pickler(pickle.Pickler):
+    """Pickler that writes the AST nodes in its NodeTable as just their id."""
+
+    def __init__(self, file, table):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.table = table
+
+    def persistent_id(self, obj):
+        if isinstance(obj, ast.AST):
+            return self.table.index.get(id(obj))
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    """Unpickler for _Pickler output."""
+
+    def __init__(self, file, table):
+        super().__init__(file)
+        self.table = table
+
+    def persistent_load(self, pid):
+        return self.table.nodes[pid]
+
+
+class _TransferPickler(_Pickler):
+    """_Pickler that also writes trail nodes with their key. See pySym.pyState.Solver.trail_node."""
+
+    def persistent_id(self, obj):
+        if type(obj) is Solver.TrailNode:
+            return ('trail', obj.key, obj.__getstate__())
+        return super().persistent_id(obj)
+
+
+class _TransferUnpickler(_Unpickler):
+    """Unpickler for _TransferPickler output."""
+
+    def persistent_load(self, pid):
+        if type(pid) is tuple:
+            kind, key, state = pid
+            return Solver.trail_node(key, state)
+        return super().persistent_load(pid)
+
+
+def dumps(obj, table):
+    """Pickle obj for another process that has the same NodeTable.
+
+    Args:
+        obj (object): What to pickle. Usually a pySym.pyPath.Path.
+        table (NodeTable): Table for the AST nodes obj holds.
+
+    Returns:
+        bytes: The pickle.
+    """
+    f = io.BytesIO()
+    _TransferPickler(f, table).dump(obj)
+    return f.getvalue()
+
+def loads(data, table):
+    """Inverse of dumps. AST nodes and trail nodes this process has already are used as they are."""
+    return _TransferUnpickler(io.BytesIO(data), table).load()
+
+def dump(paths, file, info=None):
+    """Write paths to a file.
+
+    Args:
+        paths (dict): Name -> list of pySym.pyPath.Path (or pySym.pyPath.PathSummary) objects.
+        file (file): File object opened for binary writing.
+        info (dict, optional): Anything else picklable to save along with the paths.
+    """
+    table = NodeTable.from_paths([path for group in paths.values() for path in group])
+
+    pickle.dump({'version': FORMAT_VERSION, 'roots': table.roots}, file, pickle.HIGHEST_PROTOCOL)
+    _Pickler(file, table).dump({'paths': paths, 'info': {} if info is None else info})
+
+def load(file, project=None):
+    """Read paths written by dump.
+
+    Args:
+        file (file): File object opened for binary reading.
+        project (pySym.Project, optional): Project to give the loaded paths.
+
+    Returns:
+        tuple: (paths, info) as they were given to dump.
+    """
+    header = pickle.load(file)
+
+    if type(header) is not dict or header.get('version') != FORMAT_VERSION:
+        err = "load: Unsupported file format. Expected version {0}".format(FORMAT_VERSION)
+        logger.error(err)
+        raise Exception(err)
+
+    body = _Unpickler(file, NodeTable(header['roots'])).load()
+
+    for group in body['paths'].values():
+        for path in group:
+            if hasattr(path, "state"):
+                path._project = path.state._project = project
+
+    return body['paths'], body['info']
@@ -0,0 +1,337 @@
+import z3
+import weakref
+import logging
+from .. import pyState
+from . import pickling
+from . import ids
+
+logger = logging.getLogger("ObjectManager:Array")
+
+
+class Array:
+    """
+    Define a List where every element is the same type (Int, Real or BitVec),
+    backed by a single z3 Array from Int to that type. Indexing, symbolic or
+    not, is a z3 Select and writing is a z3 Store, so a symbolic index does
+    not need to be checked against every element or split the state.
+    """
+
+    __slots__ = ['count', 'varName', 'ctx', 'length', 'elementType', 'size', 'uuid', '__state', '__weakref__', 'parent']
+
+    def __init__(self,varName,ctx,length=None,elementType=None,size=None,count=None,state=None,increment=False,uuid=None):
+        """
+        Args:
+            varName (str): Name for this variable.
+            ctx (int): What context is this variable in?
+            length (int, optional): How many elements are in this Array. Defaults to 0.
+            elementType (class, optional): Type of the elements. One of Int, Real or BitVec. Defaults to Int.
+            size (int, optional): Bit size of the elements if elementType is BitVec.
+            count (int, optional): How many of this variable iterations have we seen? Defaults to 0.
+            state (pySym.pyState.State, optional): State object for this Array to reside in.
+            increment (bool, optional): Should we increment this value right away. Defaults to False.
+            uuid (int, optional): UUID for this object generated at creation time.
+        """
+        elementType = Int if elementType is None else elementType
+
+        assert type(varName) is str, "Unexpected varName type of {}".format(type(varName))
+        assert type(ctx) is int, "Unexpected ctx type of {}".format(type(ctx))
+        assert type(length) in [int, type(None)], "Unexpected length type of {}".format(type(length))
+        assert elementType in [Int, Real, BitVec], "Unexpected elementType of {}".format(elementType)
+        assert (elementType is BitVec) == (type(size) is int), "BitVec elements need a size, other elements can't have one"
+        assert type(uuid) in [int, type(None)], "Unexpected uuid type of {}".format(type(uuid))
+
+        self.count = 0 if count is None else count
+        self.varName = varName
+        self.ctx = ctx
+        self.length = 0 if length is None else length
+        self.elementType = elementType
+        self.size = size
+        self.uuid = ids.next_id() if uuid is None else uuid
+        self.parent = None
+        self.state = state
+
+        if increment:
+            self.increment()
+
+    def __deepcopy__(self,_):
+        return self.copy()
+
+    def __copy__(self):
+        return self.copy()
+
+    def __getstate__(self):
+        return pickling.get_state(self)
+
+    def __setstate__(self, state):
+        pickling.set_state(self, state)
+
+    def copy(self):
+        return Array(
+            varName = self.varName,
+            ctx = self.ctx,
+            length = self.length,
+            elementType = self.elementType,
+            size = self.size,
+            count = self.count,
+            state = self.state if hasattr(self,"state") else None,
+            uuid = self.uuid,
+        )
+
+    def increment(self):
+        self.count += 1
+        self.uuid = ids.next_id()
+
+    def _elementSort(self):
+        """Returns the z3 sort of the elements."""
+        ctx = self.state.solver.ctx
+
+        if self.elementType is Int:
+            return z3.IntSort(ctx=ctx)
+
+        if self.elementType is Real:
+            return z3.RealSort(ctx=ctx)
+
+        return z3.BitVecSort(self.size, ctx=ctx)
+
+    def getZ3Object(self):
+        """
+        Returns the z3 object for this variable
+        """
+        ctx = self.state.solver.ctx
+        return z3.Array("{0}{1}@{2}".format(self.count,self.varName,self.ctx),z3.IntSort(ctx=ctx),self._elementSort())
+
+    def _isSame(self,length=None,elementType=None,size=None,**kwargs):
+        """
+        Checks if variables for this object are the same as those entered.
+        Assumes checks of type will be done prior to calling.
+        """
+        return length == self.length and elementType in [None, self.elementType] and size == self.size
+
+    def _element(self,value):
+        """
+        Input:
+            value = int, float, Int, Real, BitVec or Char to store in this Array
+        Action:
+            Convert value into a z3 expression of our element sort
+        Returns:
+            z3 expression
+        """
+        ctx = self.state.solver.ctx
+
+        if type(value) in [Int, Real, BitVec, Char] and value.isStatic():
+            value = value.getValue()
+            value = ord(value) if type(value) is str else value
+
+        if self.elementType is Int:
+            if type(value) is int:
+                return z3.IntVal(value, ctx=ctx)
+            if type(value) in [Int, Char]:
+                return value.getZ3Object()
+            if type(value) is BitVec:
+                return z3.BV2Int(value.getZ3Object())
+
+        elif self.elementType is Real:
+            if type(value) in [int, float]:
+                return z3.RealVal(value, ctx=ctx)
+            if type(value) is Real:
+                return value.getZ3Object()
+            if type(value) in [Int, Char]:
+                return z3.ToReal(value.getZ3Object())
+
+        else:
+            if type(value) is int:
+                return z3.BitVecVal(value, self.size, ctx=ctx)
+            if type(value) is BitVec and value.size == self.size:
+                return value.getZ3Object()
+            if type(value) in [Int, Char]:
+                return z3.Int2BV(value.getZ3Object(), self.size)
+
+        err = "_element: Can't store {0} in an Array of {1}".format(type(value), self.elementType.__name__)
+        logger.error(err)
+        raise Exception(err)
+
+    def _index(self,index):
+        """
+        Input:
+            index = int, Int or BitVec index into this Array, python style.
+        Action:
+            Normalize negative indexes. Static indexes are checked here. A
+            symbolic index is constrained to be in range, since python would
+            raise IndexError otherwise.
+        Returns:
+            int or z3 expression of the index into the z3 Array
+        """
+        if type(index) in [Int, BitVec] and index.isStatic():
+            index = index.getValue()
+
+        if type(index) is int:
+            if not -self.length <= index < self.length:
+                err = "_index: Array index {0} out of range".format(index)
+                logger.error(err)
+                raise Exception(err)
+
+            return index if index >= 0 else index + self.length
+
+        if type(index) is Int:
+            index = index.getZ3Object()
+        elif type(index) is BitVec:
+            index = z3.BV2Int(index.getZ3Object())
+        else:
+            err = "_index: Can't index Array with type {0}".format(type(index))
+            logger.error(err)
+            raise Exception(err)
+
+        self.state.addConstraint(z3.And(index >= -self.length, index < self.length))
+
+        return z3.If(index < 0, index + self.length, index)
+
+    def _select(self,i):
+        """z3 expression of the element at (normalized) index i."""
+        return z3.Select(self.getZ3Object(), i)
+
+    def setTo(self,var,*args,**kwargs):
+        """
+        Sets this Array to be equal to var. Type can be Array or List. Lists
+        must only hold things that can be stored in this Array.
+        """
+        assert type(var) in [Array, List], "Unexpected type for var of {0}".format(type(var))
+
+        if type(var) is Array:
+            if var.elementType is not self.elementType or var.size != self.size:
+                err = "setTo: Can't set Array of {0} to Array of {1}".format(self.elementType.__name__, var.elementType.__name__)
+                logger.error(err)
+                raise Exception(err)
+
+            self.length = var.length
+            self.state.addConstraint(self.getZ3Object() == var.getZ3Object())
+            return
+
+        self.length = len(var)
+
+        if self.length > 0:
+            self.state.addConstraint(z3.And(*[self._select(i) == self._element(elm) for i, elm in enumerate(var)]))
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        for i in range(self.length):
+            yield self[i]
+
+    def __getitem__(self,index):
+        """
+        We want to be able to do "array[x]", so we define this. The index
+        can be symbolic. Returns a new element object.
+        """
+        if type(index) is slice:
+            err = "__getitem__: Array doesn't support slicing"
+            logger.error(err)
+            raise Exception(err)
+
+        select = self._select(self._index(index))
+
+        kwargs = {'size': self.size} if self.elementType is BitVec else None
+        element = self.state.getVar("tempArraySelect",ctx=1,varType=self.elementType,kwargs=kwargs)
+        element.increment()
+        self.state.addConstraint(element.getZ3Object() == select)
+
+        return element.copy()
+
+    def __setitem__(self,index,value):
+        """
+        Sets the element at index to value. The index can be symbolic. This
+        makes a new version of this Array that is a z3 Store into the old one.
+        """
+        index = self._index(index)
+        value = self._element(value)
+        old = self.getZ3Object()
+
+        self.increment()
+        self.state.addConstraint(self.getZ3Object() == z3.Store(old, index, value))
+
+    def __str__(self):
+        return str(self.state.any_list(self))
+
+    def isStatic(self):
+        """
+        Returns True if every element of this Array has only one possibility.
+        """
+        if not self.state.isSat():
+            return False
+
+        return all(self.state.solver.is_fixed(self._select(i)) for i in range(self.length))
+
+    def getValue(self):
+        """
+        Return a possible value. You probably want to check isStatic before calling this.
+        """
+        return self.state.any_list(self)
+
+    def canBe(self,var):
+        """
+        Test if this Array can be equal to the given Array or List
+        Returns True or False
+        """
+        if type(var) not in [Array, List] or len(var) != self.length:
+            return False
+
+        if self.length == 0:
+            return True
+
+        if type(var) is Array:
+            others = [var._select(i) for i in range(self.length)]
+        else:
+            try:
+                others = [self._element(elm) for elm in var]
+            except Exception:
+                return False
+
+        return self.state.isSat(extra_constraints=[z3.And(*[self._select(i) == other for i, other in enumerate(others)])])
+
+    def mustBe(self,var):
+        """
+        Test if this Array must be equal to the given Array or List
+        """
+        if not self.canBe(var):
+            return False
+
+        return self.isStatic() and var.isStatic()
+
+    @property
+    def is_unconstrained(self):
+        """bool: Returns True if this Array has no external constraints applied to it. False otherwise."""
+        return not self.state.var_in_solver(self.getZ3Object())
+
+    @property
+    def is_constrained(self):
+        """bool: Opposite of is_unconstrained."""
+        return not self.is_unconstrained
+
+    @property
+    def state(self):
+        """Returns the state assigned to this object."""
+
+        if self.__state is None:
+            return None
+
+        # Using weakref magic here
+        return self.__state()
+
+    @state.setter
+    def state(self, state):
+        assert type(state) in [pyState.State, weakref.ReferenceType, type(None)], "Unexpected state type of {}".format(type(state))
+
+        # Turn it into a weakref
+        if type(state) is pyState.State:
+            self.__state = weakref.ref(state)
+
+        # It's weakref or None. Set it
+        else:
+            self.__state = state
+
+# Circular importing problem. Don't hate :-)
+from .Int import Int
+from .Real import Real
+from .BitVec import BitVec
+from .Char import Char
+from .List import List
@@ -1,12 +1,14 @@
 import z3
 import weakref
 from .. import pyState
+from . import pickling
+from . import ids
 from . import decorators
+from . import interning
 
 import logging
 logger = logging.getLogger("ObjectManager:BitVec")
 
-import os
 
 class BitVec:
     """
@@ -27,7 +29,7 @@ class BitVec:
         self.ctx = ctx
         self.size = size
         self.value = value
-        self.uuid = os.urandom(32) if uuid is None else uuid
+        self.uuid = ids.next_id() if uuid is None else uuid
         self.parent = None
         self.state = state
 
@@ -40,6 +42,12 @@ class BitVec:
     def __copy__(self):
         return self.copy()
 
+    def __getstate__(self):
+        return pickling.get_state(self)
+
+    def __setstate__(self, state):
+        pickling.set_state(self, state)
+
     def copy(self):
         return BitVec(
             varName = self.varName,
@@ -59,7 +67,7 @@ class BitVec:
         self._clone = None
         self.value = None
         self.count += 1
-        self.uuid = os.urandom(32)
+        self.uuid = ids.next_id()
         
     @decorators.as_clone
     def getZ3Object(self):
@@ -69,9 +77,9 @@ class BitVec:
         
         # If we're not static    
         if self.value == None:
-            return z3.BitVec("{0}{1}@{2}".format(self.count,self.varName,self.ctx),self.size,ctx=self.state.solver.ctx)
+            return interning.BitVec(self.count,self.varName,self.ctx,self.size,self.state.solver.ctx)
 
-        return z3.BitVecVal(self.value,self.size)
+        return interning.BitVecVal(self.value,self.size,self.state.solver.ctx)
     
     def _isSame(self,size):
         """
@@ -142,7 +150,7 @@ class BitVec:
             return True
 
         # If this is a BitVec with only one possibility
-        if len(self.state.any_n_int(self,2)) == 1:
+        if self.state.is_fixed(self):
             return True
 
         return False
@@ -217,11 +225,11 @@ class BitVec:
             return False
 
         # Can we be something else?
-        if len(self.state.any_n_int(self,2)) == 2:
+        if not self.state.is_fixed(self):
             return False
 
         # Ok, we can't be anything else. How about the var?
-        if len(self.state.any_n_int(var,2)) == 2:
+        if not self.state.is_fixed(var):
             return False
 
         # So we can be, now must we?
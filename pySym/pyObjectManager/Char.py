@@ -3,11 +3,12 @@ import weakref
 import ast
 import logging
 from .. import pyState
+from . import pickling
+from . import ids
 from . import decorators
 
 logger = logging.getLogger("ObjectManager:Char")
 
-import os
 
 class Char:
     """
@@ -15,19 +16,21 @@ class Char:
     """
 
     __slots__ = ['_clone', 'uuid', '__state', 'count', 'varName', 'ctx',
-                 'variable', '__weakref__', 'parent']
+                 'variable', '__variable_shared', '__weakref__', 'parent']
 
-    def __init__(self,varName,ctx,count=None,variable=None,state=None,increment=False,uuid=None,clone=None):
+    def __init__(self,varName,ctx,count=None,variable=None,state=None,increment=False,uuid=None,clone=None,variable_shared=False):
         assert type(varName) is str, "Unexpected varName type of {}".format(type(varName))
         assert type(ctx) is int, "Unexpected ctx type of {}".format(type(ctx))
         assert type(count) in [int, type(None)], "Unexpected count type of {}".format(type(count))
 
         self._clone = clone
-        self.uuid = os.urandom(32) if uuid is None else uuid
+        self.uuid = ids.next_id() if uuid is None else uuid
         self.count = 0 if count is None else count
         self.varName = varName
         self.ctx = ctx
         self.variable = self.__make_variable(state) if variable is None else variable
+        # Copies share their Int until one of them sets it
+        self.__variable_shared = variable_shared
         self.parent = None
         self.state = state
 
@@ -56,10 +59,12 @@ class Char:
             self.state.remove_constraints(bounds)
             return
 
-        # If we don't already have those added, add them
-        if bounds not in self.state.solver.assertions():
+        # If we don't already have those added, add them. Ask the solver, since
+        # popping a scope drops them from the solver but not from the index.
+        if not self.state.solver.is_tracked(bounds):
             # We're ignoring these for the purpose of checking if the variable is in the solver. Sorta emulating a different var type.
-            self.state.addConstraint(bounds)
+            # They get removed once we're static, so make that cheap.
+            self.state.addConstraint(bounds,retractable=True)
 
 
     def __deepcopy__(self,_):
@@ -68,17 +73,33 @@ class Char:
     def __copy__(self):
         return self.copy()
 
+    def __getstate__(self):
+        return pickling.get_state(self)
+
+    def __setstate__(self, state):
+        pickling.set_state(self, state)
+
     def copy(self):
+        self.__variable_shared = True
+
         return Char(
             varName = self.varName,
             ctx = self.ctx,
             count = self.count,
-            variable = self.variable.copy(),
+            variable = self.variable,
             state = self.state if hasattr(self,"state") else None,
             uuid = self.uuid,
-            clone = self._clone
+            clone = self._clone,
+            variable_shared = True
         )
 
+    def __own_variable(self):
+        """Make sure our Int isn't shared with another Char before changing it."""
+        if self.__variable_shared:
+            self.variable = self.variable.copy()
+            self.variable.state = self.state
+            self.__variable_shared = False
+
     @decorators.as_clone
     def __str__(self):
         return chr(int(self))
@@ -106,6 +127,7 @@ class Char:
             self._clone = None
             # Remove our bounds constraints to help improve speed.
             self.state.remove_constraints(self.__z3_bounds_constraint())
+            self.__own_variable()
             self.variable.setTo(ord(var))
         
         else:
@@ -116,6 +138,7 @@ class Char:
             if var.isStatic():
                 self._clone = None
                 self.state.remove_constraints(self.__z3_bounds_constraint())
+                self.__own_variable()
                 self.variable.setTo(var)
 
             # We're being set to a non-static object
@@ -129,13 +152,15 @@ class Char:
                 else:
                     # Make sure we have our bounds set
                     self._add_variable_bounds()
+                    self.__own_variable()
                     self.variable.setTo(var)
 
     def increment(self):
         self._clone = None
         self.count += 1
         self.variable = self.__make_variable()
-        self.uuid = os.urandom(32)
+        self.__variable_shared = False
+        self.uuid = ids.next_id()
     
     def _isSame(self,**args):
         """
@@ -10,57 +10,58 @@ from .BitVec import BitVec
 from .List import List
 from .String import String
 from .Char import Char
+from .SeqString import SeqString
+from .Array import Array
 from .. import pyState
+from .Hamt import Hamt
+from . import pickling
 
 logger = logging.getLogger("ObjectManager:Ctx")
 
 class Ctx:
     """
-    Define a Ctx Object
+    Define a Ctx Object. Variables are held in a persistent Hamt so copying a
+    Ctx shares them. Each variable is copied the first time it's touched.
     """
 
-    __slots__ = ['ctx', 'variables', 'variables_need_copy', '__state', '__weakref__']
+    __slots__ = ['ctx', 'variables', '__owned', '__state', '__weakref__']
 
     def __init__(self,ctx,variables=None):
         assert type(ctx) is int, "Unexpected ctx type of {}".format(type(ctx))
         
         self.ctx = ctx
-        self.variables = {} if variables is None else variables
-        self.variables_need_copy = {key: True for key in self.variables.keys()} # JIT Copy
+        self.variables = Hamt() if variables is None else variables if type(variables) is Hamt else Hamt(variables)
+        # Keys whose objects are ours alone. Everything else is JIT copied
+        self.__owned = set()
 
     def copy(self):
-        self.variables_need_copy = {key: True for key in self.variables.keys()} # JIT Copy
+        # Both sides share the variables now
+        self.__owned = set()
 
         return Ctx(
             ctx = self.ctx,
-            #variables = {key:self.variables[key].copy() for key in self.variables},
-            #variables = {key:value for key, value in self.variables.items()} # JIT copy
             variables = self.variables
         )
 
     def __iter__(self): return iter(self.variables)
 
+    def __contains__(self, key): return key in self.variables
+
+    def __len__(self): return len(self.variables)
+
     def __ensure_copy(self, key):
         """Perform JIT copy for the given key."""
-        # If this is the first touch, create a new dictionary object for us
-        if not any(self.variables_need_copy[key] is False for key in self.variables_need_copy):
-            self.variables = {key:value for key, value in self.variables.items()}
-
-        # If this is a first time set
-        if key not in self.variables_need_copy:
-            self.variables_need_copy[key] = True
-
-        # If we are returning to an existing key
-        elif self.variables_need_copy[key]:
-            #print("CTX {} Copy".format(self.ctx))
-            self.variables[key] = copy(self.variables[key])
-            self.variables[key].state = self.state # Pass it the correct state...
-            self.variables[key].parent = weakref.proxy(self)
-            self.variables_need_copy[key] = False
-
-    #def items(self): return self.variables.items()
+        if key in self.__owned or key not in self.variables:
+            return
+
+        var = copy(self.variables[key])
+        var.state = self.state # Pass it the correct state...
+        var.parent = weakref.proxy(self)
+        self.variables = self.variables.set(key, var)
+        self.__owned.add(key)
+
     def items(self): 
-        for key in self.variables.keys():
+        for key in list(self.variables):
             self.__ensure_copy(key)
         return self.variables.items()
 
@@ -69,7 +70,12 @@ class Ctx:
         Returns "index" of the given element. Raises exception if it's not found
         For a pseudo dict class, this is just the key for the key,val pair
         """
-        val = [k for k,v in self.variables.items() if v.uuid is elm.uuid]
+        # Variables are nearly always stored under their own name
+        var = self.variables.get(elm.varName)
+        if var is not None and var.uuid == elm.uuid:
+            return elm.varName
+
+        val = [k for k,v in self.variables.items() if v.uuid == elm.uuid]
         assert len(val) == 1, "Expected one item to be found. Found {} instead".format(len(val))
         return val[0]
 
@@ -85,7 +91,7 @@ class Ctx:
         Sets value at index key. Checks for variable type, updates counter according, similar to getVar call
         """
         # Attempt to return variable
-        assert type(value) in [Int, Real, BitVec, List, String, Char]
+        assert type(value) in [Int, Real, BitVec, List, String, Char, SeqString, Array]
 
         self.__ensure_copy(key)
         
@@ -113,11 +119,15 @@ class Ctx:
         #print("Set",self.variables[key].getZ3Object())
         #return
 
-        if type(value) is Int:
-            logger.debug("__setitem__: setting Int")
+        # Never go back to a version of this name that's already been used
+        if type(value) in [Int, Real, BitVec, SeqString, Array] and value.count < count:
+            value.count = count
+
+        if type(value) in [Int, SeqString, Array]:
+            logger.debug("__setitem__: setting {0}".format(type(value)))
             #self.variables[key] = Int('{0}'.format(key),ctx=self.ctx,count=count,state=self.state,on_increment=value.on_increment)
 
-            self.variables[key] = value
+            self.variables = self.variables.set(key, value)
             # Don't add a constraint if it's the same thing!
             #if self.variables[key].getZ3Object().get_id() != value.getZ3Object().get_id():
             #    #self.state.addConstraint(self.variables[key].getZ3Object() == value.getZ3Object())
@@ -126,7 +136,7 @@ class Ctx:
         elif type(value) is Real:
             logger.debug("__setitem__: setting Real")
             #self.variables[key] = Real('{0}'.format(key),ctx=self.ctx,count=count,state=self.state)
-            self.variables[key] = value
+            self.variables = self.variables.set(key, value)
             # Don't add a constraint if it's the same thing!
             if self.variables[key].getZ3Object().get_id() != value.getZ3Object().get_id():
                 #self.state.addConstraint(self.variables[key].getZ3Object() == value.getZ3Object())
@@ -135,7 +145,7 @@ class Ctx:
         elif type(value) is BitVec:
             logger.debug("__setitem__: setting BitVec")
             #self.variables[key] = BitVec('{0}'.format(key),ctx=self.ctx,count=count,size=value.size,state=self.state)
-            self.variables[key] = value
+            self.variables = self.variables.set(key, value)
             # Don't add a constraint if it's the same thing!
             if self.variables[key].getZ3Object().get_id() != value.getZ3Object().get_id():
                 #self.state.addConstraint(self.variables[key].getZ3Object() == value.getZ3Object())
@@ -144,14 +154,14 @@ class Ctx:
         elif type(value) in [List, String]:
             logger.debug("__setitem__: setting {0}".format(type(value)))
             value = value.copy()
-            self.variables[key] = value
-            self.variables[key].state = self.state
+            self.variables = self.variables.set(key, value)
+            value.state = self.state
             #value.count = count
         
         elif type(value) is Char:
             logger.debug("__setitem__: setting Char")
             #self.variables[key] = Char('{0}'.format(key),ctx=self.ctx,count=count,state=self.state)
-            self.variables[key] = value
+            self.variables = self.variables.set(key, value)
             # Don't add a constraint if it's the same thing!
             #if self.variables[key].getZ3Object().get_id() != value.getZ3Object().get_id():
             #    #self.state.addConstraint(self.variables[key].getZ3Object() == value.getZ3Object())
@@ -162,11 +172,22 @@ class Ctx:
             logger.error(err)
             raise Exception(err)
 
-        self.variables_need_copy[key] = True
+        # Whoever handed us value may still hold it
+        self.__owned.discard(key)
         
     def __copy__(self):
         return self.copy()
 
+    def __getstate__(self):
+        state = pickling.get_state(self)
+        # Objects may be shared with other pickled Ctxs, so nothing is owned after loading
+        del state['__owned']
+        return state
+
+    def __setstate__(self, state):
+        pickling.set_state(self, state)
+        self.__owned = set()
+
     @property
     def state(self):
         """Returns the state assigned to this object."""
@@ -0,0 +1,252 @@
+"""
+Persistent hash array mapped trie, used by Ctx and ObjectManager to hold
+their variables.
+
+A Hamt is never changed in place. Setting or deleting a key returns a new
+Hamt that shares everything but the path down to that key with the old one,
+so copying is O(1) and updates are O(log n).
+"""
+
+import logging
+
+logger = logging.getLogger("ObjectManager:Hamt")
+
+# Bits of the hash used per level of the trie
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_MASK = (1 << 64) - 1
+
+
+def _hash(key):
+    return hash(key) & _HASH_MASK
+
+def _bit(h, shift):
+    return 1 << ((h >> shift) & _MASK)
+
+def _popcount(i):
+    return bin(i).count('1')
+
+
+class _Leaf:
+    """One key and its value."""
+
+    __slots__ = ['hash', 'key', 'value']
+
+    def __init__(self, h, key, value):
+        self.hash = h
+        self.key = key
+        self.value = value
+
+    def __iter__(self):
+        yield self
+
+
+class _Collision:
+    """Leaves whose keys have the same full hash."""
+
+    __slots__ = ['hash', 'leaves']
+
+    def __init__(self, h, leaves):
+        self.hash = h
+        self.leaves = leaves
+
+    def __iter__(self):
+        return iter(self.leaves)
+
+
+class _Node:
+    """Interior node. Bit i of bitmap is set if there is a child for hash chunk i."""
+
+    __slots__ = ['bitmap', 'children']
+
+    def __init__(self, bitmap=0, children=()):
+        self.bitmap = bitmap
+        self.children = children
+
+    def __iter__(self):
+        for child in self.children:
+            yield from child
+
+
+def _get(node, h, shift, key):
+    """Returns the leaf for key, or None."""
+    while True:
+        if type(node) is _Node:
+            bit = _bit(h, shift)
+            if not node.bitmap & bit:
+                return None
+            node = node.children[_popcount(node.bitmap & (bit - 1))]
+            shift += _BITS
+
+        elif type(node) is _Leaf:
+            return node if node.key == key else None
+
+        else:
+            for leaf in node.leaves:
+                if leaf.key == key:
+                    return leaf
+            return None
+
+def _merge(a, b, shift):
+    """Returns a node holding a and b, which have different hashes."""
+    bit_a = _bit(a.hash, shift)
+    bit_b = _bit(b.hash, shift)
+
+    if bit_a == bit_b:
+        return _Node(bit_a, (_merge(a, b, shift + _BITS),))
+
+    children = (a, b) if bit_a < bit_b else (b, a)
+    return _Node(bit_a | bit_b, children)
+
+def _set(node, h, shift, leaf):
+    """Returns (new node, True if the key is new)."""
+    if type(node) is _Node:
+        bit = _bit(h, shift)
+        i = _popcount(node.bitmap & (bit - 1))
+
+        if not node.bitmap & bit:
+            return _Node(node.bitmap | bit, node.children[:i] + (leaf,) + node.children[i:]), True
+
+        child, added = _set(node.children[i], h, shift + _BITS, leaf)
+        return _Node(node.bitmap, node.children[:i] + (child,) + node.children[i+1:]), added
+
+    if node.hash != h:
+        return _merge(node, leaf, shift), True
+
+    if type(node) is _Leaf:
+        if node.key == leaf.key:
+            return leaf, False
+        return _Collision(h, (node, leaf)), True
+
+    leaves = tuple(x for x in node.leaves if x.key != leaf.key)
+    return _Collision(h, leaves + (leaf,)), len(leaves) == len(node.leaves)
+
+def _delete(node, h, shift, key):
+    """Returns the node without key. None if nothing is left. Raises KeyError if key isn't there."""
+    if type(node) is _Node:
+        bit = _bit(h, shift)
+        if not node.bitmap & bit:
+            raise KeyError(key)
+
+        i = _popcount(node.bitmap & (bit - 1))
+        child = _delete(node.children[i], h, shift + _BITS, key)
+
+        if child is not None:
+            return _Node(node.bitmap, node.children[:i] + (child,) + node.children[i+1:])
+
+        if node.bitmap == bit:
+            return None
+
+        children = node.children[:i] + node.children[i+1:]
+
+        # Pull a lone leaf back up
+        if len(children) == 1 and type(children[0]) is not _Node:
+            return children[0]
+
+        return _Node(node.bitmap & ~bit, children)
+
+    if type(node) is _Leaf:
+        if node.key != key:
+            raise KeyError(key)
+        return None
+
+    leaves = tuple(x for x in node.leaves if x.key != key)
+
+    if len(leaves) == len(node.leaves):
+        raise KeyError(key)
+
+    return leaves[0] if len(leaves) == 1 else _Collision(node.hash, leaves)
+
+
+def _from_items(items):
+    """Rebuilds a Hamt from (key, value) pairs. Used for unpickling."""
+    hamt = Hamt()
+    for key, value in items:
+        hamt = hamt.set(key, value)
+    return hamt
+
+
+class Hamt:
+    """
+    Immutable mapping. Supports the read only parts of the dict interface,
+    and set/delete which return the changed copy.
+    """
+
+    __slots__ = ['__root', '__len']
+
+    def __init__(self, items=None):
+        """
+        Args:
+            items (dict or iterable, optional): (key, value) pairs to start with.
+        """
+        self.__root = _Node()
+        self.__len = 0
+
+        if items is not None:
+            items = items.items() if hasattr(items, 'items') else items
+            for key, value in items:
+                self.__root, added = _set(self.__root, _hash(key), 0, _Leaf(_hash(key), key, value))
+                self.__len += added
+
+    @classmethod
+    def __new_from(cls, root, length):
+        hamt = cls.__new__(cls)
+        hamt.__root = root
+        hamt.__len = length
+        return hamt
+
+    def get(self, key, default=None):
+        leaf = _get(self.__root, _hash(key), 0, key)
+        return default if leaf is None else leaf.value
+
+    def __getitem__(self, key):
+        leaf = _get(self.__root, _hash(key), 0, key)
+        if leaf is None:
+            raise KeyError(key)
+        return leaf.value
+
+    def __contains__(self, key):
+        return _get(self.__root, _hash(key), 0, key) is not None
+
+    def set(self, key, value):
+        """Returns a new Hamt with key set to value."""
+        h = _hash(key)
+        root, added = _set(self.__root, h, 0, _Leaf(h, key, value))
+        return Hamt.__new_from(root, self.__len + added)
+
+    def delete(self, key):
+        """Returns a new Hamt without key. Raises KeyError if it isn't there."""
+        root = _delete(self.__root, _hash(key), 0, key)
+
+        # The root is always a _Node
+        if root is None:
+            root = _Node()
+        elif type(root) is not _Node:
+            root = _Node(_bit(root.hash, 0), (root,))
+
+        return Hamt.__new_from(root, self.__len - 1)
+
+    def __len__(self):
+        return self.__len
+
+    def __iter__(self):
+        for leaf in self.__root:
+            yield leaf.key
+
+    def keys(self):
+        return iter(self)
+
+    def values(self):
+        for leaf in self.__root:
+            yield leaf.value
+
+    def items(self):
+        for leaf in self.__root:
+            yield leaf.key, leaf.value
+
+    def __repr__(self):
+        return "Hamt({{{0}}})".format(", ".join("{0!r}: {1!r}".format(key, value) for key, value in self.items()))
+
+    def __reduce__(self):
+        # Pickle flat. The trie layout depends on the hash seed of the process.
+        return (_from_items, (list(self.items()),))
@@ -2,12 +2,13 @@ import weakref
 import z3
 import logging
 from .. import pyState
+from . import pickling
+from . import ids
 from . import decorators
+from . import interning
 
 logger = logging.getLogger("ObjectManager:Int")
 
-import os
-
 
 class Int:
     """
@@ -32,13 +33,13 @@ class Int:
         assert type(varName) is str, "Unexpected varName type of {}".format(type(varName))
         assert type(ctx) is int, "Unexpected ctx type of {}".format(type(ctx))
         assert type(value) in [type(None),int], "Unexpected value type of {}".format(type(value))
-        assert type(uuid) in [bytes, type(None)], "Unexpected uuid type of {}".format(type(uuid))
+        assert type(uuid) in [int, type(None)], "Unexpected uuid type of {}".format(type(uuid))
 
         self.count = 0 if count is None else count
         self.varName = varName
         self.ctx = ctx
         self.value = value
-        self.uuid = os.urandom(32) if uuid is None else uuid
+        self.uuid = ids.next_id() if uuid is None else uuid
         self._clone = clone
         self.parent = None
         self.state = state
@@ -53,6 +54,12 @@ class Int:
     def __copy__(self):
         return self.copy()
 
+    def __getstate__(self):
+        return pickling.get_state(self)
+
+    def __setstate__(self, state):
+        pickling.set_state(self, state)
+
     def copy(self):
         return Int(
             varName = self.varName,
@@ -69,7 +76,7 @@ class Int:
         self._clone = None
         self.value = None
         self.count += 1
-        self.uuid = os.urandom(32)
+        self.uuid = ids.next_id()
         
     @decorators.as_clone
     def getZ3Object(self):
@@ -77,9 +84,9 @@ class Int:
         Returns the z3 object for this variable
         """
         if self.value is None:
-            return z3.Int("{0}{1}@{2}".format(self.count,self.varName,self.ctx),ctx=self.state.solver.ctx)
+            return interning.Int(self.count,self.varName,self.ctx,self.state.solver.ctx)
         
-        return z3.IntVal(self.value)
+        return interning.IntVal(self.value,self.state.solver.ctx)
 
     
     def _isSame(self,value=None,*args,**kwargs):
@@ -103,7 +110,7 @@ class Int:
             return True
         
         # If this is an integer with only one possibility
-        if len(self.state.any_n_int(self,2)) == 1:
+        if self.state.is_fixed(self):
             return True
 
         return False
@@ -217,11 +224,11 @@ class Int:
             return False
 
         # Can we be something else?
-        if len(self.state.any_n_int(self,2)) == 2:
+        if not self.state.is_fixed(self):
             return False
 
         # Can the other var be something else?
-        if len(self.state.any_n_int(var,2)) == 2:
+        if not self.state.is_fixed(var):
             return False
         
         #return False
@@ -3,17 +3,18 @@ import weakref
 import ast
 import logging
 from .. import pyState
+from . import pickling
+from . import ids
 
 logger = logging.getLogger("ObjectManager:List")
 
-import os
 
 class List:
     """
     Define a List
     """
 
-    __slots__ = ['count', 'varName', 'ctx', 'variables', 'uuid', '__state', '__weakref__', 'variables_need_copy', 'parent']
+    __slots__ = ['count', 'varName', 'ctx', 'variables', 'uuid', '__state', '__weakref__', 'variables_need_copy', 'parent', '__positions']
 
     def __init__(self,varName,ctx,count=None,variables=None,state=None,increment=False,uuid=None):
         assert type(varName) is str
@@ -24,7 +25,9 @@ class List:
         self.ctx = ctx
         self.variables = [] if variables is None else variables
         self.variables_need_copy = [True] * len(self.variables)
-        self.uuid = os.urandom(32) if uuid is None else uuid
+        # uuid -> position in variables. Only a hint, checked on use
+        self.__positions = {}
+        self.uuid = ids.next_id() if uuid is None else uuid
         self.parent = None
         self.state = state
 
@@ -36,7 +39,7 @@ class List:
         # Reset my copy requirements
         self.variables_need_copy = [True] * len(self.variables)
 
-        return List(
+        new = List(
             varName = self.varName,
             ctx = self.ctx,
             count = self.count,
@@ -45,6 +48,9 @@ class List:
             state = self.state if hasattr(self,"state") else None,
             uuid = self.uuid
         )
+        # Copies of the elements keep their uuid, so the hints still hold
+        new.__positions = self.__positions
+        return new
 
     def __deepcopy__(self,_):
         return self.copy()
@@ -52,6 +58,12 @@ class List:
     def __copy__(self):
         return self.copy()
 
+    def __getstate__(self):
+        return pickling.get_state(self)
+
+    def __setstate__(self, state):
+        pickling.set_state(self, state)
+
     def __ensure_copy(self, index):
         """Small stub to ensure that we make a copy if we need to.
         
@@ -104,9 +116,10 @@ class List:
         # reset variable list if we're incrementing our count
         self.variables = []
         self.variables_need_copy = []
+        self.__positions = {}
 
         # Reset my copy requirements
-        self.uuid = os.urandom(32)
+        self.uuid = ids.next_id()
 
         
     def append(self,var,kwargs=None):
@@ -149,6 +162,12 @@ class List:
             if type(var) is Char:
                 self.variables[-1].setTo(copy(var))
 
+        elif type(var) is SeqString or var is SeqString:
+            logger.debug("append: adding SeqString")
+            self.variables.append(SeqString('{2}{0}[{1}]'.format(self.varName,len(self.variables),self.count),ctx=self.ctx,state=self.state))
+            if type(var) is SeqString:
+                self.variables[-1].setTo(copy(var))
+
         elif type(var) in [List, String]:
             logger.debug("append: adding {0}".format(type(var)))
             self.variables.append(copy(var))
@@ -165,7 +184,7 @@ class List:
         """Emulate the list insert method, just on this object."""
 
         assert type(index) in [int, Int], "Unexpected index of type {}".format(type(index))
-        assert type(object) in [Int, Real, Char, BitVec, List, String], "Unexpected type for object of {}".format(type(object))
+        assert type(object) in [Int, Real, Char, BitVec, List, String, SeqString], "Unexpected type for object of {}".format(type(object))
 
         self.__ensure_copy(None)
 
@@ -199,6 +218,11 @@ class List:
             var.setTo(object)
             self.variables.insert(index, var)
 
+        elif type(object) is SeqString:
+            var = SeqString('{2}{0}[{1}]'.format(self.varName,len(self.variables),self.count),ctx=self.ctx,state=self.state)
+            var.setTo(object)
+            self.variables.insert(index, var)
+
         elif type(object) in [List, String]:
             self.variables.insert(index, object)
 
@@ -222,13 +246,20 @@ class List:
         Returns index of the given element. Raises exception if it's not found
         """
         # Lookup our own variables by uuid
-        if type(elm) in [String, Int, BitVec, Char, Real]:
-            i = 0
-            for var in self.variables:
-                if var.uuid == elm.uuid:
-                    return i
-                i += 1
-            raise Exception("Could not find object {}".format(elm))
+        if type(elm) in [String, Int, BitVec, Char, Real, SeqString, List, Array]:
+            i = self.__positions.get(elm.uuid)
+
+            # Stale or missing hint. Rebuild them all, first occurrence wins
+            if i is None or i >= len(self.variables) or self.variables[i].uuid != elm.uuid:
+                self.__positions = {}
+                for i in range(len(self.variables)-1, -1, -1):
+                    self.__positions[self.variables[i].uuid] = i
+                i = self.__positions.get(elm.uuid)
+
+            if i is None:
+                raise Exception("Could not find object {}".format(elm))
+
+            return i
             
         return self.variables.index(elm)
 
@@ -254,7 +285,7 @@ class List:
         """
         # Attempt to return variable
         assert type(key) is int
-        assert type(value) in [Int, Real, BitVec, List, String]
+        assert type(value) in [Int, Real, BitVec, List, String, SeqString]
 
         self.__ensure_copy(key)
 
@@ -276,6 +307,11 @@ class List:
             self.variables[key] = BitVec('{2}{0}[{1}]'.format(self.varName,key,self.count),ctx=self.ctx,count=count,size=value.size,state=self.state)
             self.variables[key].setTo(value)
 
+        elif type(value) is SeqString:
+            logger.debug("__setitem__: setting SeqString")
+            self.variables[key] = SeqString('{2}{0}[{1}]'.format(self.varName,key,self.count),ctx=self.ctx,count=count,state=self.state)
+            self.variables[key].setTo(value)
+
         elif type(value) in [List, String]:
             logger.debug("__setitem__: setting {0}".format(type(value)))
             self.variables[key] = value
@@ -397,4 +433,6 @@ from .Real import Real
 from .BitVec import BitVec
 from .Char import Char
 from .String import String
+from .SeqString import SeqString
+from .Array import Array
 
@@ -1,8 +1,10 @@
 import z3
 import weakref
 import logging
-import os
 from .. import pyState
+from . import pickling
+from . import ids
+from . import interning
 
 logger = logging.getLogger("ObjectManager:Real")
 
@@ -22,7 +24,7 @@ class Real:
         self.varName = varName
         self.ctx = ctx
         self.value = value
-        self.uuid = os.urandom(32) if uuid is None else uuid
+        self.uuid = ids.next_id() if uuid is None else uuid
         self.parent = None
         self.state = state
 
@@ -35,6 +37,12 @@ class Real:
     def __copy__(self):
         return self.copy()
 
+    def __getstate__(self):
+        return pickling.get_state(self)
+
+    def __setstate__(self, state):
+        pickling.set_state(self, state)
+
     def copy(self):
         return Real(
             varName = self.varName,
@@ -48,7 +56,7 @@ class Real:
     def increment(self):
         self.value = None
         self.count += 1
-        self.uuid = os.urandom(32)
+        self.uuid = ids.next_id()
 
     def getZ3Object(self,increment=False):
         """
@@ -59,9 +67,9 @@ class Real:
             self.increment()
         
         if self.value is None:
-            return z3.Real("{0}{1}@{2}".format(self.count,self.varName,self.ctx),ctx=self.state.solver.ctx)
+            return interning.Real(self.count,self.varName,self.ctx,self.state.solver.ctx)
 
-        return z3.RealVal(self.value)
+        return interning.RealVal(self.value,self.state.solver.ctx)
     
     def _isSame(self,value=None):
         """
@@ -79,7 +87,7 @@ class Real:
         if self.value is not None:
             return True
 
-        elif len(self.state.any_n_real(self,2)) == 1:
+        elif self.state.is_fixed(self):
             return True
 
         return False
@@ -147,11 +155,11 @@ class Real:
         #    return True
 
         # Can we be something else?
-        if len(self.state.any_n_int(self,2)) == 2:
+        if not self.state.is_fixed(self):
             return False
 
         # Can the other var be something else?
-        if len(self.state.any_n_int(var,2)) == 2:
+        if not self.state.is_fixed(var):
             return False
 
 
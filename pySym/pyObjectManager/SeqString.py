@@ -0,0 +1,359 @@
+import z3
+import ctypes
+import weakref
+import logging
+from .. import pyState
+from . import pickling
+from . import ids
+
+logger = logging.getLogger("ObjectManager:SeqString")
+
+
+def _encode(string, ctx=None):
+    """Returns a z3 string value for the python str string."""
+    # Escape everything, otherwise z3 will read things like "\x" and "\u{..}" as escapes itself
+    return z3.StringVal(''.join('\\u{{{0:x}}}'.format(ord(c)) for c in string), ctx=ctx)
+
+def fromSeq(value):
+    """Returns the python str for a z3 string value."""
+    length = z3.Z3_get_string_length(value.ctx_ref(), value.as_ast())
+    contents = (ctypes.c_uint * length)()
+    z3.Z3_get_string_contents(value.ctx_ref(), value.as_ast(), length, contents)
+    return ''.join(chr(c) for c in contents)
+
+def toSeq(obj, ctx=None):
+    """
+    Input:
+        obj = str, String, Char, SeqString or z3 string expression
+        (optional) ctx = z3 context to build the expression in
+    Action:
+        Convert obj into a single z3 string expression
+    Returns:
+        z3.SeqRef
+    """
+    if type(obj) is str:
+        return _encode(obj, ctx=ctx)
+
+    if isinstance(obj, z3.SeqRef):
+        return obj
+
+    if type(obj) is SeqString:
+        return obj.getZ3Object()
+
+    if type(obj) is Char:
+        if obj.isStatic():
+            return _encode(obj.getValue(), ctx=ctx)
+        return z3.StrFromCode(obj.getZ3Object())
+
+    if type(obj) is String:
+        parts = [toSeq(c, ctx=ctx) for c in obj]
+
+        if len(parts) == 0:
+            return _encode("", ctx=ctx)
+        if len(parts) == 1:
+            return parts[0]
+        return z3.Concat(*parts)
+
+    err = "toSeq: Don't know how to convert type {0}".format(type(obj))
+    logger.error(err)
+    raise Exception(err)
+
+
+class SeqString:
+    """
+    Define a String as a single z3 String (sequence of characters) instead of
+    a list of Chars. Its length can be symbolic.
+    """
+
+    __slots__ = ['count', 'varName', 'ctx', 'value', 'uuid', '__state', '__weakref__', 'parent']
+
+    def __init__(self,varName,ctx,count=None,value=None,state=None,increment=False,uuid=None):
+        """
+        Args:
+            varName (str): Name for this variable.
+            ctx (int): What context is this variable in?
+            count (int, optional): How many of this variable iterations have we seen? Defaults to 0.
+            value (str, optional): Static value for this String.
+            state (pySym.pyState.State, optional): State object for this String to reside in.
+            increment (bool, optional): Should we increment this value right away. Defaults to False.
+            uuid (int, optional): UUID for this object generated at creation time.
+        """
+        assert type(varName) is str, "Unexpected varName type of {}".format(type(varName))
+        assert type(ctx) is int, "Unexpected ctx type of {}".format(type(ctx))
+        assert type(value) in [type(None), str], "Unexpected value type of {}".format(type(value))
+        assert type(uuid) in [int, type(None)], "Unexpected uuid type of {}".format(type(uuid))
+
+        self.count = 0 if count is None else count
+        self.varName = varName
+        self.ctx = ctx
+        self.value = value
+        self.uuid = ids.next_id() if uuid is None else uuid
+        self.parent = None
+        self.state = state
+
+        if increment:
+            self.increment()
+
+    def __deepcopy__(self,_):
+        return self.copy()
+
+    def __copy__(self):
+        return self.copy()
+
+    def __getstate__(self):
+        return pickling.get_state(self)
+
+    def __setstate__(self, state):
+        pickling.set_state(self, state)
+
+    def copy(self):
+        return SeqString(
+            varName = self.varName,
+            ctx = self.ctx,
+            count = self.count,
+            value = self.value,
+            state = self.state if hasattr(self,"state") else None,
+            uuid = self.uuid,
+        )
+
+    def increment(self):
+        self.value = None
+        self.count += 1
+        self.uuid = ids.next_id()
+
+    def getZ3Object(self):
+        """
+        Returns the z3 object for this variable
+        """
+        if self.value is None:
+            return z3.String("{0}{1}@{2}".format(self.count,self.varName,self.ctx),ctx=self.state.solver.ctx)
+
+        return _encode(self.value, ctx=self.state.solver.ctx)
+
+    def _isSame(self,value=None,**kwargs):
+        """
+        Checks if variables for this object are the same as those entered.
+        Assumes checks of type will be done prior to calling.
+        """
+        return value == self.value
+
+    def _add_bounds(self,length=None):
+        """
+        Constrain this String to bytes (same as Char) and its length.
+
+        Args:
+            length (int, optional): Exact length of this String. Otherwise it
+                can be anywhere up to Z3_MAX_STRING_LENGTH long.
+        """
+        ctx = self.state.solver.ctx
+        z3_obj = self.getZ3Object()
+
+        if length is None:
+            self.state.addConstraint(z3.Length(z3_obj) <= pyState.z3Helpers.Z3_MAX_STRING_LENGTH)
+        else:
+            self.state.addConstraint(z3.Length(z3_obj) == length)
+
+        self.state.addConstraint(z3.InRe(z3_obj, z3.Star(z3.Range(_encode(chr(0), ctx=ctx), _encode(chr(0xff), ctx=ctx)))))
+
+    def setTo(self,var,*args,**kwargs):
+        """
+        Sets this SeqString to be equal to var. Type can be str, String, Char, SeqString or a z3 string expression.
+        """
+        assert type(var) in [str, String, Char, SeqString] or isinstance(var, z3.SeqRef), "Unexpected type for var of {0}".format(type(var))
+
+        # If we're not in the solver, static values don't need to touch it
+        if not self.state.var_in_solver(self.getZ3Object()):
+
+            if type(var) is str:
+                self.value = var
+                return
+
+            elif type(var) in [String, Char, SeqString] and var.isStatic():
+                self.value = var.getValue()
+                return
+
+        obj = toSeq(var, ctx=self.state.solver.ctx)
+
+        self.value = None
+        self.state.addConstraint(self.getZ3Object() == obj)
+
+    def length(self):
+        """z3.ArithRef: Length of this String as a z3 expression."""
+        return z3.Length(self.getZ3Object())
+
+    def __len__(self):
+        """
+        Length of this String if it only has one possible length. Raises an
+        exception if the length is symbolic.
+        """
+        if self.value is not None:
+            return len(self.value)
+
+        length = self.length()
+
+        if not self.state.isSat() or not self.state.solver.is_fixed(length):
+            err = "__len__: Length of String {0} is symbolic".format(self.varName)
+            logger.error(err)
+            raise Exception(err)
+
+        return pyState.Solver.evaluate(self.state.solver.model(variables=[length]), length).as_long()
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def _slice(self,lower=None,upper=None):
+        """
+        Input:
+            (optional) lower = int lower bound of the slice
+            (optional) upper = int upper bound of the slice
+        Action:
+            Build the z3 expression for self[lower:upper], with python's
+            semantics for negative and out of range bounds.
+        Returns:
+            z3.SeqRef
+        """
+        assert type(lower) in [int, type(None)]
+        assert type(upper) in [int, type(None)]
+
+        if self.value is not None:
+            return _encode(self.value[lower:upper], ctx=self.state.solver.ctx)
+
+        z3_obj = self.getZ3Object()
+        length = z3.Length(z3_obj)
+
+        def bound(i, default):
+            if i is None:
+                return default
+            if i >= 0:
+                return z3.If(length < i, length, i)
+            return z3.If(length + i < 0, 0, length + i)
+
+        lower = bound(lower, 0)
+        upper = bound(upper, length)
+
+        return z3.SubString(z3_obj, lower, z3.If(upper > lower, upper - lower, 0))
+
+    def __getitem__(self,index):
+        """
+        We want to be able to do "string[x]", so we define this. Returns a new
+        SeqString. Only static indexes and slices with a step of 1 are supported.
+        """
+        if type(index) is slice:
+            if index.step not in [None, 1]:
+                err = "__getitem__: Slice step {0} is not supported".format(index.step)
+                logger.error(err)
+                raise Exception(err)
+
+            expr = self._slice(index.start, index.stop)
+
+        else:
+            assert type(index) is int, "Unexpected index type of {}".format(type(index))
+
+            if self.value is not None:
+                expr = _encode(self.value[index], ctx=self.state.solver.ctx)
+            elif index >= 0:
+                expr = z3.SubString(self.getZ3Object(), index, 1)
+            else:
+                expr = z3.SubString(self.getZ3Object(), self.length() + index, 1)
+
+        newString = self.state.getVar("tempSeqStringSlice",ctx=1,varType=SeqString)
+        newString.increment()
+        newString.setTo(expr)
+
+        return newString.copy()
+
+    def __setitem__(self,key,value):
+        """
+        String doesn't support setitem
+        """
+        err = "String type does not support item assignment"
+        logger.error(err)
+        raise Exception(err)
+
+    def __str__(self):
+        """
+        str will change this object into a possible representation by calling state.any_str
+        """
+        return self.state.any_str(self)
+
+    def isStatic(self):
+        """
+        Returns True if this object is a static variety (i.e.: "test").
+        Also returns True if object has only one possibility
+        """
+        if self.value is not None:
+            return True
+
+        return self.state.is_fixed(self)
+
+    def getValue(self):
+        """
+        Resolves the value of this String. Assumes that isStatic method is called
+        before this is called to ensure the value is not symbolic
+        """
+        if self.value is not None:
+            return self.value
+
+        return self.state.any_str(self)
+
+    def canBe(self,var):
+        """
+        Test if this String can be equal to the given variable
+        Returns True or False
+        """
+        if type(var) not in [str, String, Char, SeqString]:
+            return False
+
+        if self.value is not None and (type(var) is str or var.isStatic()):
+            return self.value == (var if type(var) is str else var.getValue())
+
+        return self.state.isSat(extra_constraints=[self.getZ3Object() == toSeq(var, ctx=self.state.solver.ctx)])
+
+    def mustBe(self,var):
+        """
+        Test if this String must be equal to the given variable. This means there's no other options and it's not symbolic
+        """
+        if not self.canBe(var):
+            return False
+
+        if not self.isStatic():
+            return False
+
+        return type(var) is str or var.isStatic()
+
+    @property
+    def is_unconstrained(self):
+        """bool: Returns True if this String has no external constraints applied to it. False otherwise."""
+        return not self.state.var_in_solver(self.getZ3Object())
+
+    @property
+    def is_constrained(self):
+        """bool: Opposite of is_unconstrained."""
+        return not self.is_unconstrained
+
+    @property
+    def state(self):
+        """Returns the state assigned to this object."""
+
+        if self.__state is None:
+            return None
+
+        # Using weakref magic here
+        return self.__state()
+
+    @state.setter
+    def state(self, state):
+        assert type(state) in [pyState.State, weakref.ReferenceType, type(None)], "Unexpected state type of {}".format(type(state))
+
+        # Turn it into a weakref
+        if type(state) is pyState.State:
+            self.__state = weakref.ref(state)
+
+        # It's weakref or None. Set it
+        else:
+            self.__state = state
+
+# Circular importing problem. Don't hate :-)
+from .String import String
+from .Char import Char
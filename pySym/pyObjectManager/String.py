@@ -3,17 +3,22 @@ import weakref
 import ast
 import logging
 from .. import pyState
+from . import pickling
+from . import ids
 
 logger = logging.getLogger("ObjectManager:String")
 
-import os
 
 class String:
     """
     Define a String
+
+    Like List, the Chars are copied just in time. A copy shares the list of
+    Chars with the original, and each Char is only copied the first time it
+    is touched. Until then neither String owns it.
     """
 
-    __slots__ = ['count', 'varName', 'ctx', 'variables', 'uuid', '__state', '__weakref__', 'parent']
+    __slots__ = ['count', 'varName', 'ctx', '__variables', '__owned', '__shared', 'uuid', '__state', '__weakref__', 'parent']
 
     def __init__(self,varName,ctx,count=None,string=None,variables=None,state=None,length=None,increment=False,uuid=None):
         assert type(varName) is str
@@ -25,14 +30,13 @@ class String:
         self.ctx = ctx
         # Treating string as a list of BitVecs
         self.variables = [] if variables is None else variables
-        self.uuid = os.urandom(32) if uuid is None else uuid
+        self.uuid = ids.next_id() if uuid is None else uuid
         self.parent = None
+        self.state = state
 
         if increment:
             self.increment()
 
-        self.state = state
-
 
         if string is not None:
             self.setTo(string,clear=True)
@@ -44,14 +48,63 @@ class String:
 
 
     def copy(self):
-        return String(
+        # The Chars are now shared, so neither of us owns them
+        self.__owned = {}
+        self.__shared = True
+
+        new = String(
             varName = self.varName,
             ctx = self.ctx,
             count = self.count,
-            variables = [x.copy() for x in self.variables],
             state = self.state if hasattr(self,"state") else None,
             uuid = self.uuid
         )
+        new.__variables = self.__variables
+        new.__shared = True
+
+        return new
+
+    @property
+    def variables(self):
+        """list: The Chars of this String. Whoever gets this list may hand its Chars to someone else, so this String gives up owning them."""
+        self.__ensure_list()
+        self.__owned = {}
+        return self.__variables
+
+    @variables.setter
+    def variables(self, variables):
+        self.__variables = variables
+        self.__owned = {}
+        self.__shared = False
+
+    def __ensure_list(self):
+        """Make sure the list of Chars itself is ours to change."""
+        if self.__shared:
+            self.__variables = list(self.__variables)
+            self.__shared = False
+
+    def __ensure_copy(self, index):
+        """Small stub to ensure that we make a copy if we need to.
+
+        index == Index to ensure will be a copy. If value is None, then perform full copy of the String, not just index.
+        """
+        if index is None:
+            for i in range(len(self.__variables)):
+                self.__ensure_copy(i)
+            return
+
+        c = self.__variables[index]
+
+        # Already ours
+        if self.__owned.get(id(c)) is c:
+            return
+
+        self.__ensure_list()
+        c = copy(c)
+        c.state = self.state
+        c.parent = weakref.proxy(self)
+        self.__variables[index] = c
+        self.__owned[id(c)] = c
 
     def __deepcopy__(self, _):
         return self.copy()
@@ -60,6 +113,17 @@ class String:
     def __copy__(self):
         return self.copy()
 
+    def __getstate__(self):
+        state = pickling.get_state(self)
+        # Ownership is by object id, which doesn't survive pickling
+        del state['__owned']
+        return state
+
+    def __setstate__(self, state):
+        pickling.set_state(self, state)
+        self.__owned = {}
+        self.__shared = False
+
     def increment(self):
         self.count += 1
 
@@ -67,13 +131,16 @@ class String:
         for c in self:
             c.increment()
 
-        self.uuid = os.urandom(32)
+        self.uuid = ids.next_id()
     
     def _addChar(self):
         """
         Append a generic Char item to this string.
         """
-        self.variables.append(Char('{2}{0}[{1}]'.format(self.varName,len(self.variables),self.count),ctx=self.ctx,state=self.state))
+        self.__ensure_list()
+        c = Char('{2}{0}[{1}]'.format(self.varName,len(self.__variables),self.count),ctx=self.ctx,state=self.state)
+        self.__variables.append(c)
+        self.__owned[id(c)] = c
 
     def setTo(self,var,clear=None):
         """
@@ -121,7 +188,7 @@ class String:
         """Convenience function. Will return z3 object for Chr if this is a string of length 1, else error."""
 
         if len(self) == 1:
-            return self.variables[0].getZ3Object()
+            return self[0].getZ3Object()
 
         raise Exception("String: getZ3Object with String of length {0} makes no sense.".format(len(self)))
 
@@ -139,7 +206,7 @@ class String:
         """
         Returns index of the given element. Raises exception if it's not found
         """
-        return self.variables.index(elm)
+        return self.__variables.index(elm)
 
     def __getitem__(self,index):
         """
@@ -151,13 +218,14 @@ class String:
             # Create a copy
             newString = self.copy()
 
-            # Adjust the variables down to the slice
-            newString.variables = newString.variables[index]
+            # Adjust the variables down to the slice. The Chars are still shared.
+            newString.__variables = newString.__variables[index]
+            newString.__shared = False
 
             return newString
             
-
-        return self.variables[index]
+        self.__ensure_copy(index)
+        return self.__variables[index]
 
     def __setitem__(self,key,value):
         """
@@ -171,10 +239,13 @@ class String:
         """
         Not exactly something you can do on a string, but helpful for our symbolic execution
         """
-        if index is not None:
-            return self.variables.pop(index)
-        else:
-            return self.variables.pop()
+        index = -1 if index is None else index
+
+        self.__ensure_copy(index)
+        c = self.__variables.pop(index)
+        del self.__owned[id(c)]
+
+        return c
 
     def __str__(self):
         """
@@ -183,7 +254,17 @@ class String:
         return self.state.any_str(self)
 
     def __len__(self):
-        return len(self.variables)
+        return len(self.__variables)
+
+    def _equalities(self,var):
+        """
+        Returns list of z3 equalities between each of our characters and those of var.
+        Assumes var is the same length.
+        """
+        if type(var) is str:
+            return [me.getZ3Object() == ord(you) for (me,you) in zip(self,var)]
+
+        return [me.getZ3Object() == you.getZ3Object() for (me,you) in zip(self,var)]
 
     def mustBe(self,var):
         """
@@ -191,20 +272,15 @@ class String:
         """
         assert type(var) in [str, String]
 
-        # TODO: Re-assess how i do this. Can probably make this more efficient...
-
         # If it's not even possible, just return no
         if not self.canBe(var):
             return False
 
-        # If we can possible be this value, see if we MUST be this value
-        # Loop through all our characters and see if they have more than one possibility
-        for c in self:
-            if len(self.state.any_n_int(c,2)) != 1:
-                return False
+        if len(self) == 0:
+            return True
 
-        # Looks like we've got a match...
-        return True
+        # We must be this value if no character can be different
+        return not self.state.isSat(extra_constraints=[z3.Not(z3.And(*self._equalities(var)))])
 
     def canBe(self,var):
         """
@@ -214,42 +290,16 @@ class String:
 
         # May need to add String object canBe later
         assert type(var) in [str, String]
-        
-        # If we're dealing with a python string
-        if type(var) is str:
-            # It can't be equal if it's a different length...
-            if len(self) != len(var):
-                return False
-            
-            # Ask the solver...
-            s = self.state.copy()
-            for (me,you) in zip(self,var):
-                # Add the constraint
-                s.addConstraint(me.getZ3Object() == ord(you))
-                # If we're not possible, return False
-                if not s.isSat():
-                    return False
-        
-            # If we made it here, it's a possibility
-            return True
-    
-        # if we're dealing with a String object
-        if type(var) is String:
-            # It can't be equal if it's a different length...
-            if len(self) != len(var):
-                return False
 
-            # Ask the solver...
-            s = self.state.copy()
-            for (me,you) in zip(self,var):
-                # Add the constraint
-                s.addConstraint(me.getZ3Object() == you.getZ3Object())
-                # If we're not possible, return False
-                if not s.isSat():
-                    return False
+        # It can't be equal if it's a different length...
+        if len(self) != len(var):
+            return False
+
+        if len(self) == 0:
+            return self.state.isSat()
 
-            # If we made it here, it's a possibility
-            return True
+        # Ask the solver once about all the characters
+        return self.state.isSat(extra_constraints=[z3.And(*self._equalities(var))])
 
     def isStatic(self):
         """
@@ -293,9 +343,11 @@ class String:
         else:
             self.__state = state
 
-        for var in self.variables:
+        # Chars we don't own get our state when we copy them
+        for var in getattr(self, '_String__owned', {}).values():
             var.state = self.state
 
+from copy import copy
 # Circular importing problem. Don't hate :-)
 from .Int import Int
 from .Real import Real
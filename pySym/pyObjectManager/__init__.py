@@ -9,7 +9,11 @@ from .List import List
 from .Ctx import Ctx
 from .String import String
 from .Char import Char
+from .SeqString import SeqString
+from .Array import Array
+from .Hamt import Hamt
 from .. import pyState
+from . import pickling
 
 logger = logging.getLogger("ObjectManager")
 
@@ -21,11 +25,14 @@ class ObjectManager:
     Object Manager will keep track of objects. Generally, Objects will be variables such as ints, lists, strings, etc.
     """
 
-    __slots__ = ['variables', 'returnObjects', '__state','__weakref__']
+    __slots__ = ['variables', 'returnObjects', '__owned', '__state','__weakref__']
 
     def __init__(self,variables=None,returnObjects=None,state=None):
-        self.variables = {CTX_GLOBAL: Ctx(CTX_GLOBAL), CTX_RETURNS: Ctx(CTX_RETURNS)} if variables is None else variables
+        # ctx -> Ctx. Shared with copies of this ObjectManager until written to
+        self.variables = Hamt({CTX_GLOBAL: Ctx(CTX_GLOBAL), CTX_RETURNS: Ctx(CTX_RETURNS)}) if variables is None else variables
         self.returnObjects = returnObjects if returnObjects is not None else {}
+        # ctxs whose Ctx objects are ours alone
+        self.__owned = set(self.variables) if variables is None else set()
 
         if state is not None:
             self.state = state
@@ -36,8 +43,25 @@ class ObjectManager:
         """
         assert ctx is not None
 
-        self.variables[ctx] = Ctx(ctx)
+        self.variables = self.variables.set(ctx, Ctx(ctx))
         self.variables[ctx].state = self.state
+        self.__owned.add(ctx)
+
+    def getCtx(self,ctx):
+        """
+        Input:
+            ctx = Context to get
+        Action:
+            JIT copy the Ctx if it is still shared with another ObjectManager
+        Returns:
+            pyObjectManager.Ctx object for ctx
+        """
+        if ctx not in self.__owned:
+            self.variables = self.variables.set(ctx, self.variables[ctx].copy())
+            self.variables[ctx].state = self.state
+            self.__owned.add(ctx)
+
+        return self.variables[ctx]
 
     def setVar(self,varName,ctx,var):
         """
@@ -54,7 +78,7 @@ class ObjectManager:
         assert type(ctx) is int
         assert type(var) in [Int, Real, BitVec, List]
 
-        self.variables[ctx][varName] = var
+        self.getCtx(ctx)[varName] = var
         
 
     def getVar(self,varName,ctx,varType=None,kwargs=None,softFail=None):
@@ -74,7 +98,7 @@ class ObjectManager:
         # Attempt to return variable
         assert type(varName) is str
         assert type(ctx) is int
-        assert varType in [None, Int, Real, BitVec, List, String, Char]
+        assert varType in [None, Int, Real, BitVec, List, String, Char, SeqString, Array]
 
         logger.debug("getVar: {} {} {} {}".format(varName,varType,kwargs,softFail))
         
@@ -82,21 +106,24 @@ class ObjectManager:
         create = False
         count = None
         
+        variables = self.getCtx(ctx)
+
         # Check that we already have this variable defined
-        if varName in self.variables[ctx]:
+        if varName in variables:
+            var = variables[varName]
             
             # Check the type of the var is correct
             if varType is not None:
 
                 # If the variable type is different or it's settings are different, we need to create a new object
-                if type(self.variables[ctx][varName]) is not varType or not self.variables[ctx][varName]._isSame(**kwargs if kwargs is not None else {}):
+                if type(var) is not varType or not var._isSame(**kwargs if kwargs is not None else {}):
                     create = True
                     # Re-using variable names is BAD!
-                    count = self.variables[ctx][varName].count + 1
+                    count = var.count + 1
             
             # If we can just return the current one, let's do it
             if not create:
-                return self.variables[ctx][varName]
+                return var
 
         # Looks like we need to create a var
         if varType == None:
@@ -109,42 +136,24 @@ class ObjectManager:
                 return None
         
         # Make the var
-        self.variables[ctx][varName] = varType(varName=varName,ctx=ctx,count=count,state=self.state,**kwargs if kwargs is not None else {})
+        variables[varName] = varType(varName=varName,ctx=ctx,count=count,state=self.state,**kwargs if kwargs is not None else {})
         
-        return self.variables[ctx][varName]
+        return variables[varName]
 
     def getParent(self,key,haystack=None):
         """
         Returns the parent object for any given object by recursively searching.
         """
 
-        """
-        
-        # Recursively resolve up the chain for JIT copy
-        parents = [key, key.parent]
-        while not isinstance(parents[-1], Ctx):
-            parents.append[parents[-1].parent]
-
-        # Now that we know the parents, start at the top and ensure JIT copy has happened for each step
-        parents = parents[::-1]
-        for i in range(len(parents)-1):
-            parent = parents[i]
-            child = parents[i+1]
-
-            if isinstance(parent, (Ctx, List, String)):
-                # Force JIT copy
-                index = parent.index(child)
-                parent[index]
-
-            #elif isinstance(parent, Char):
-
-        return key.parent
-        """
+        if haystack is None:
+            parent = self.__followParents(key)
+            if parent is not None:
+                return parent
 
         # TODO: This might get to be a long search if there are a lot of variables...
 
         #haystack = self.variables if haystack is None else haystack
-        haystack = self.variables[key.state.ctx] if haystack is None else haystack
+        haystack = self.getCtx(key.state.ctx) if haystack is None else haystack
 
         if type(haystack) in [dict, Ctx]:
             for k,v in haystack.items():
@@ -166,20 +175,71 @@ class ObjectManager:
             if haystack.variable.uuid == key.uuid:
                 return haystack
 
+    def __followParents(self,key):
+        """
+        Input:
+            key = pyObjectManager object to find the parent of
+        Action:
+            Walk up the parent links objects get from the Ctx or List that
+            handed them out, then back down from our own Ctx, looking each
+            step up by uuid. This makes sure we end up with this state's
+            (JIT copied) containers and not stale ones.
+        Returns:
+            Parent object, or None if the links don't lead back to key
+        """
+        chain = []
+        obj = key
+
+        try:
+            while not isinstance(obj, Ctx):
+                obj = obj.parent
+                if obj is None:
+                    return None
+                chain.append(obj)
+
+            if obj.ctx not in self.variables:
+                return None
+
+            parent = self.getCtx(obj.ctx)
+
+            for obj in chain[-2::-1] + [key]:
+                index = parent.index(obj)
+
+                if obj is key:
+                    return parent
+
+                parent = parent[index]
+
+        # Dead weakproxy, or the object isn't there anymore
+        except Exception:
+            return None
 
     def copy(self):
         """
         Return a copy of the Object Manager
         """
 
+        # Both sides share the Ctxs now
+        self.__owned = set()
+
         return ObjectManager(
-            variables = {key:self.variables[key].copy() for key in self.variables},
+            variables = self.variables,
             returnObjects = {key:self.returnObjects[key].copy() for key in self.returnObjects},
         )
 
     def __copy__(self):
         return self.copy()
 
+    def __getstate__(self):
+        state = pickling.get_state(self)
+        # Ctxs may be shared with other pickled ObjectManagers, so nothing is owned after loading
+        del state['__owned']
+        return state
+
+    def __setstate__(self, state):
+        pickling.set_state(self, state)
+        self.__owned = set()
+
     @property
     def state(self):
         """Returns the state assigned to this object."""
@@ -201,5 +261,6 @@ class ObjectManager:
         else:
             self.__state = state
 
-        for ctx in self.variables:
+        # Shared Ctxs get the state when they're copied
+        for ctx in self.__owned:
             self.variables[ctx].state = state
@@ -1,21 +1,39 @@
+import functools
+
+def _resolve(obj):
+    """Returns the object at the end of obj's clone chain."""
+    while obj._clone is not None:
+        obj = obj._clone
+    return obj
+
+def _unwrap(cls, name):
+    """Returns the undecorated function for method name of cls."""
+    func = getattr(cls, name)
+    return getattr(func, '__wrapped__', func)
+
 def as_clone(orig_func):
-    def run_from_clone(self, *args, **kwargs):
-        # Transparently run from clone object if we have one
-        if self._clone is not None:
-            return getattr(self._clone,orig_func.__name__)(*args, **kwargs)
+    name = orig_func.__name__
 
+    @functools.wraps(orig_func)
+    def run_from_clone(self, *args, **kwargs):
         # We're not a clone, run the original
-        else:
+        if self._clone is None:
             return orig_func(self, *args, **kwargs)
 
+        # Transparently run from clone object if we have one. Jump straight to
+        # the end of the chain instead of going through every clone's wrapper.
+        clone = _resolve(self._clone)
+        return _unwrap(type(clone), name)(clone, *args, **kwargs)
+
     return run_from_clone
 
 # TODO: Probably should just make this all one decorator with an arg or something.
 def as_clone_property(orig_func):
+    @functools.wraps(orig_func)
     def run_from_clone(self, *args, **kwargs):
         # Transparently run from clone object if we have one
         if self._clone is not None:
-            return getattr(self._clone,orig_func.__name__)
+            return getattr(_resolve(self._clone),orig_func.__name__)
 
         # We're not a clone, run the original
         else:
@@ -0,0 +1,33 @@
+"""
+Allocates the uuid of pyObjectManager objects.
+
+A uuid only has to be unique among the objects of one exploration, which can
+be spread over worker processes. Each process draws a random tag once and
+hands out that tag plus a counter, so uuids are plain ints that are cheap to
+make and compare.
+"""
+
+import os
+import itertools
+
+# Bits of the counter part of an id
+_COUNTER_BITS = 64
+
+_tag = None
+_counter = None
+
+def reset():
+    """Draw a new tag and restart the counter. Run in every new process."""
+    global _tag, _counter
+    _tag = int.from_bytes(os.urandom(8), 'little') << _COUNTER_BITS
+    _counter = itertools.count()
+
+def next_id():
+    """int: A new uuid."""
+    return _tag | next(_counter)
+
+reset()
+
+# Forked children would otherwise hand out their parent's ids
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset)
@@ -0,0 +1,80 @@
+"""
+Interned z3 expressions for pyObjectManager objects.
+
+Building a z3 constant means formatting its name and making a few ctypes
+calls into z3, and objects ask for theirs over and over (Compare, BinOp,
+canBe, setTo...). Constants are built once per (sort, count, varName, ctx,
+z3 context) and reused. Incrementing an object bumps its count, so it gets a
+fresh constant. Static values are interned the same way.
+"""
+
+import z3
+from collections import OrderedDict
+
+# key -> z3 expression. Least recently used entries are dropped first.
+_cache = OrderedDict()
+_CACHE_SIZE = 65536
+
+def _hit(key):
+    expr = _cache[key]
+    _cache.move_to_end(key)
+    return expr
+
+def _store(key, expr):
+    _cache[key] = expr
+    if len(_cache) > _CACHE_SIZE:
+        _cache.popitem(last=False)
+    return expr
+
+def clear():
+    """Forget every interned expression."""
+    _cache.clear()
+
+def Int(count, varName, ctx, z3_ctx):
+    """z3.ArithRef: Int constant for the given version of a variable."""
+    key = ('Int', count, varName, ctx, z3_ctx)
+    try:
+        return _hit(key)
+    except KeyError:
+        return _store(key, z3.Int("{0}{1}@{2}".format(count, varName, ctx), ctx=z3_ctx))
+
+def Real(count, varName, ctx, z3_ctx):
+    """z3.ArithRef: Real constant for the given version of a variable."""
+    key = ('Real', count, varName, ctx, z3_ctx)
+    try:
+        return _hit(key)
+    except KeyError:
+        return _store(key, z3.Real("{0}{1}@{2}".format(count, varName, ctx), ctx=z3_ctx))
+
+def BitVec(count, varName, ctx, size, z3_ctx):
+    """z3.BitVecRef: BitVec constant for the given version of a variable."""
+    key = ('BitVec', count, varName, ctx, size, z3_ctx)
+    try:
+        return _hit(key)
+    except KeyError:
+        return _store(key, z3.BitVec("{0}{1}@{2}".format(count, varName, ctx), size, ctx=z3_ctx))
+
+def IntVal(value, z3_ctx):
+    """z3.IntNumRef: Int value."""
+    key = ('IntVal', value, z3_ctx)
+    try:
+        return _hit(key)
+    except KeyError:
+        return _store(key, z3.IntVal(value, ctx=z3_ctx))
+
+def RealVal(value, z3_ctx):
+    """z3.RatNumRef: Real value."""
+    # 1 == 1.0, but keep them apart anyway so the value we were given is what's used
+    key = ('RealVal', type(value), value, z3_ctx)
+    try:
+        return _hit(key)
+    except KeyError:
+        return _store(key, z3.RealVal(value, ctx=z3_ctx))
+
+def BitVecVal(value, size, z3_ctx):
+    """z3.BitVecNumRef: BitVec value."""
+    key = ('BitVecVal', value, size, z3_ctx)
+    try:
+        return _hit(key)
+    except KeyError:
+        return _store(key, z3.BitVecVal(value, size, ctx=z3_ctx))
@@ -0,0 +1,49 @@
+"""
+Helpers so that pyObjectManager objects can be pickled.
+
+Objects hold a weakref to their State (and sometimes a weakproxy to their
+parent), neither of which can be pickled. Those are dropped here and put
+back by relink once the State that owns the objects has been loaded.
+"""
+
+# Slots that are never pickled
+_SKIP = ['__weakref__', '__state', 'parent']
+
+def _mangle(cls, slot):
+    if slot.startswith('__') and not slot.endswith('__'):
+        return '_{0}{1}'.format(cls.__name__.lstrip('_'), slot)
+    return slot
+
+def get_state(obj):
+    """Returns a picklable dict of the slots of obj, minus the references that can't be pickled."""
+    cls = type(obj)
+    return {slot: getattr(obj, _mangle(cls, slot)) for slot in cls.__slots__ if slot not in _SKIP and hasattr(obj, _mangle(cls, slot))}
+
+def set_state(obj, state):
+    """Restores obj from the output of get_state. The state will be None until relink is called."""
+    cls = type(obj)
+
+    for slot, value in state.items():
+        setattr(obj, _mangle(cls, slot), value)
+
+    for slot in ['__state', 'parent']:
+        if slot in cls.__slots__:
+            setattr(obj, _mangle(cls, slot), None)
+
+def relink(obj, state):
+    """Recursively sets the state of obj and everything it holds."""
+    if obj is None:
+        return
+
+    obj.state = state
+
+    variables = getattr(obj, 'variables', None)
+    # Ctx and ObjectManager keep theirs in a Hamt
+    if hasattr(variables, 'values'):
+        variables = variables.values()
+
+    for var in variables or []:
+        relink(var, state)
+
+    relink(getattr(obj, 'variable', None), state)
+    relink(getattr(obj, '_clone', None), state)
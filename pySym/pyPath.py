@@ -2,6 +2,8 @@ import z3
 import ast
 import logging
 from .pyState import State
+from .pyState.Stack import Stack
+from .pyState import Solver
 from .Project import Project
 from prettytable import PrettyTable
 import sys
@@ -10,25 +12,73 @@ from random import random
 
 logger = logging.getLogger("Path")
 
+def _model_value(value):
+    """Turns a value from a z3 model into the closest plain python value."""
+    if z3.is_int_value(value) or z3.is_bv_value(value):
+        return value.as_long()
+    if z3.is_true(value) or z3.is_false(value):
+        return z3.is_true(value)
+    if z3.is_string_value(value):
+        return value.as_string()
+    return str(value)
+
+
+class PathSummary():
+    """
+    Lightweight record of where a path ended up. It holds no reference to the
+    path or its state, so keeping it costs next to nothing. See
+    Path.summary and PathGroup.iter_explore.
+    """
+
+    __slots__ = ['lineno', 'error', 'smt2', 'model']
+
+    def __init__(self,lineno=None,error=None,smt2=None,model=None):
+        """
+        (optional) lineno = Line the path is at, or the last line it ran if it's done
+        (optional) error = Error string for errored paths
+        (optional) smt2 = The path's constraints as an SMT-LIB2 benchmark
+        (optional) model = One model of the constraints. Dict of z3 variable name to value. None if there isn't one
+        """
+        self.lineno = lineno
+        self.error = error
+        self.smt2 = smt2
+        self.model = model
+
+    def assertions(self, ctx=None):
+        """
+        Input:
+            (optional) ctx = z3 Context to load the constraints into
+        Action:
+            Parse the SMT-LIB2 constraints back into z3
+        Returns:
+            List of z3 constraints
+        """
+        return Solver.constraints_from_smt2(self.smt2, ctx=ctx)
+
+    def __repr__(self):
+        return "<PathSummary at line {0}>".format(self.lineno)
+
 class Path():
     """
     Defines a path of execution.
     """
 
-    __slots__ = ['backtrace','state','source','error','__weakref__','__project']
+    __slots__ = ['backtrace','state','source','error','forks','__weakref__','__project']
     
-    def __init__(self,path=None,backtrace=None,state=None,source=None,project=None):
+    def __init__(self,path=None,backtrace=None,state=None,source=None,project=None,forks=None):
         """
         (optional) path = list of sequential actions. Derived by ast.parse. Passed to state.
-        (optional) backtrace = list of asts that happened before the current one
+        (optional) backtrace = pyState.Stack.Stack of asts that happened before the current one
         (optional) state = State object for current path
         (optional) source = source code that we're looking at. This can make things prettier
         (optional) project = pySym project file associated with this group. This will be auto-filled.
+        (optional) forks = How many steps on the way to this path returned more than one path
         """
         
         self._project = project
+        self.forks = 0 if forks is None else forks
         path = [] if path is None else path
-        self.backtrace = [] if backtrace is None else backtrace
+        self.backtrace = Stack() if backtrace is None else backtrace
         self.state = State(path=path,project=self._project) if state is None else state
         self.source = source
 
@@ -44,9 +94,12 @@ class Path():
         
         pathList = []
 
+        forks = self.forks + 1 if len(stateList) > 1 else self.forks
+
         for state in stateList:
             # New path. State should already be copied via state.step above.
             path = self.copy(state=state)
+            path.forks = forks
 
             # New state
             #path.state = state
@@ -65,7 +118,7 @@ class Path():
         table = PrettyTable(header=False,border=False,field_names=["lineno","line","element"])
         table.align = 'l'
         
-        for inst in self.state.backtrace[::-1]:
+        for inst in reversed(list(self.state.backtrace)):
             table.add_row([
                 "Line {0}".format(inst.lineno),
                 source[inst.lineno-1] if source != None else " ",
@@ -84,15 +137,55 @@ class Path():
         """
         # TODO: Don't think i need to copy state in this...
         return Path(
-                backtrace=copy(self.backtrace),
+                backtrace=self.backtrace,
                 state=self.state.copy() if state is None else state,
                 source=copy(self.source),
-                project=self._project
+                project=self._project,
+                forks=self.forks
                 )
 
     def __copy__(self):
         return self.copy()
 
+    def summary(self):
+        """
+        Returns:
+            PathSummary of this path: the line it's at, its constraints as
+            SMT-LIB2 and one model of them, if it has any.
+        """
+        state = self.state
+        lineno = state.lineno()
+
+        # Done paths aren't at any line. Say where they finished.
+        if lineno is None and len(state.backtrace) > 0:
+            lineno = getattr(state.backtrace[0], "lineno", None)
+
+        solver = state.solver
+        model = None
+
+        if state.isSat():
+            m = solver.model()
+            # Tracking literals for retractable constraints aren't part of the program
+            model = {d.name(): _model_value(m[d]) for d in m.decls() if not d.name().startswith("__pysym_track_")}
+
+        return PathSummary(
+                lineno=lineno,
+                error=getattr(self, "error", None),
+                smt2=Solver.constraints_to_smt2(solver.assertions(), ctx=solver.ctx),
+                model=model,
+                )
+
+    def __getstate__(self):
+        # The project doesn't get pickled. Whoever loads us should set it again.
+        return {slot: getattr(self, slot) for slot in ['backtrace', 'state', 'source', 'error', 'forks'] if hasattr(self, slot)}
+
+    def __setstate__(self, state):
+        self._project = None
+        self.forks = 0
+
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
     @property
     def _project(self):
         """pySym Project that this is associated with."""
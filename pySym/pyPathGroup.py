@@ -1,29 +1,154 @@
-import random
+import sys
+import time
+import logging
+from collections import deque
+import z3
 from multiprocessing import Pool
 from .pyPath import Path
 from .Project import Project
+from . import Serialize
+from . import Config
+from . import SearchStrategy
+from .pyObjectManager import ids, interning
+from .pyState import Merge
+from .pyState import Subsumption
+from .pyState import Solver
+from .pyState.Stack import Stack
+
+logger = logging.getLogger("PathGroup")
+
+# Project for the paths stepped in this worker process
+_worker_project = None
+# AST nodes the parent process has too. See Serialize.dumps.
+_worker_nodes = Serialize.NodeTable([])
+# Trails of the last paths stepped here. Keeping them lets paths that share them come over without parsing them again.
+_worker_trails = deque(maxlen=1024)
+
+def _init_worker(project, roots=None):
+    """Sets up a worker process for PathGroup. Each worker gets its own z3 context.
+
+    Args:
+        project (pySym.Project): Project for the paths stepped here.
+        roots (list, optional): Roots of the parent's NodeTable for the paths it sends.
+    """
+    global _worker_project, _worker_nodes, _worker_trails
+    _worker_project = project
+    _worker_nodes = Serialize.NodeTable(roots if roots is not None else [])
+    _worker_trails = deque(maxlen=1024)
+    z3.z3._main_ctx = None
+    # Expressions interned before the fork belong to the old context
+    interning.clear()
+    # Object uuids and solver tracking literals both come from here
+    ids.reset()
+
+def _is_feasible(state, feasibility):
+    """Returns False if state is known to be impossible. Only asks the solver when the feasibility mode says to."""
+    if feasibility == "eager" or (feasibility == "lazy" and state.branched):
+        return state.isSat()
+    return True
+
+def _step_worker(args):
+    """Steps a pickled path in a worker process.
+
+    Args:
+        args (tuple): (path pickled with Serialize.dumps, feasibility mode)
+
+    Returns:
+        tuple: (error, paths, solver time) where error is the exception string
+        if the step failed, paths is a list of (pickled path, feasible) for
+        each path the step returned and solver time is how many seconds the
+        step spent in z3.
+    """
+    data, feasibility = args
+    start = Solver.solver_time()
+    path = Serialize.loads(data, _worker_nodes)
+    path._project = path.state._project = _worker_project
+    _worker_trails.append(path.state.solver.trail)
+
+    try:
+        paths_ret = path.step()
+    except Exception as e:
+        return str(e), None, Solver.solver_time() - start
+
+    paths_ret = [(Serialize.dumps(p, _worker_nodes), _is_feasible(p.state, feasibility)) for p in paths_ret]
+    return None, paths_ret, Solver.solver_time() - start
+
+def _memory_usage():
+    """Returns the resident memory of this process in bytes. Falls back to the peak where the current isn't known."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _page_size()
+    except (IOError, OSError, ValueError, IndexError):
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return usage if sys.platform == "darwin" else usage * 1024
+
+def _page_size():
+    import resource
+    return resource.getpagesize()
+
+def _predicate(match, name):
+    """Turns a find/avoid argument (line number or function of a state) into a function of a state."""
+    if match is None or callable(match):
+        return match
+
+    assert type(match) is int, "Invalid {0} of {1}. Expected a line number or a function taking a state.".format(name, match)
+    return lambda state: state.lineno() == match
+
 
 class PathGroup:
 
-    __slots__ = ['active', 'deadended', 'completed', 'errored', 'found',
-                 'ignore_groups', '__weakref__', '__search_strategy', '__project']
+    __slots__ = ['__active', 'deadended', 'completed', 'errored', 'found', 'avoided', 'unexplored', 'stop_reason',
+                 'ignore_groups', '__weakref__', '__search_strategy', '__project',
+                 '__workers', '__pool', '__nodes', '__feasibility', '__merge', '__merge_points',
+                 '__prune', '__prune_points', 'pruned', '__worker_solver_time', '__streaming']
 
-    def __init__(self, path=None, ignore_groups=None, search_strategy=None, project=None):
+    # Names of the lists that paths are stashed in
+    _stashes = ('active', 'deadended', 'completed', 'errored', 'found', 'avoided', 'unexplored')
+
+    def __init__(self, path=None, ignore_groups=None, search_strategy=None, project=None, workers=None, feasibility=None, merge=None, prune=None):
         """
         (optional) path = starting path object for path group
         (optional) discard_groups = List/set of path groups to ignore (i.e.: don't save) as we execute. Defaults to saving everything.
-        (optional) search_strategy = Which paths to step? Valid: depth/breadth/random (default: breadth)
+        (optional) search_strategy = Which paths to step? Name or SearchStrategy subclass, see search_strategy (default: breadth)
         (optional) project = pySym project file associated with this group. This will be auto-filled.
+        (optional) workers = Number of processes to step paths with. Defaults to 1 (step them in this process).
+        (optional) feasibility = When to check that paths are still possible. Valid: eager/lazy/completion (default: Config.PYSYM_FEASIBILITY)
+        (optional) merge = Merge paths that meet at the same point in the program (default: Config.PYSYM_MERGE)
+        (optional) prune = Drop redundant paths. Valid: none/duplicates/subsumption (default: Config.PYSYM_PRUNE)
         """
 
         # Init the groups
+        self.__active = None
+        self.search_strategy = search_strategy
         self.active = [path] if path is not None else []
         self.deadended = []
         self.completed = []
         self.errored = []
         self.found = []
-        self.search_strategy = search_strategy
+        self.avoided = []
+        self.unexplored = []
+        # Why the last explore stopped. See explore.
+        self.stop_reason = None
         self._project = project
+        self.workers = workers
+        self.feasibility = feasibility
+        self.merge = merge
+        # Merge key -> active path at that point in the program
+        self.__merge_points = {}
+        self.prune = prune
+        # Point key -> active paths at that point in the program
+        self.__prune_points = {}
+        # How many paths prune has dropped
+        self.pruned = 0
+        self.__pool = None
+        # NodeTable our worker processes were started with
+        self.__nodes = None
+        # Seconds worker processes have spent in z3 for us
+        self.__worker_solver_time = 0.0
+        # (stash names, summarize, paths not yielded yet) while iter_explore runs
+        self.__streaming = None
         
         if ignore_groups is None:
             self.ignore_groups = set()
@@ -53,34 +178,207 @@ class PathGroup:
             attr.append("{0} errored".format(len(self.errored)))
         if len(self.found) > 0:
             attr.append("{0} found".format(len(self.found)))
+        if len(self.avoided) > 0:
+            attr.append("{0} avoided".format(len(self.avoided)))
+        if len(self.unexplored) > 0:
+            attr.append("{0} unexplored".format(len(self.unexplored)))
+        if self.pruned > 0:
+            attr.append("{0} pruned".format(self.pruned))
         
         return s.format(', '.join(attr))
 
     def __repr__(self):
         return self.__str__()
 
-    def explore(self,find=None):
+    def explore(self, find=None, avoid=None, max_steps=None, max_active=None, timeout=None, solver_time_budget=None, memory_limit=None, on_limit="keep"):
         """
-        Input:
-            (optional) find = input line number to explore to
-        Action:
-            Step through script until line is found
+        Step until there are no active paths, a path is found or a limit is
+        hit. Why it stopped is left in stop_reason:
+           - exhausted: There are no more active paths.
+           - found: A path matched find.
+           - max_steps, max_active, timeout, solver_time, memory_limit: That limit was hit.
+           - closed: iter_explore was closed early, or an exception interrupted
+             it. Paths that were being stepped are back in active, and then
+             on_limit applies as if a limit was hit.
+
+        Limits are checked between steps, so a single step (one long solver
+        query, say) can still overrun them.
+
+        Args:
+            find (int or callable, optional): Line number, or function taking
+                a state and returning True, to explore to. The first path to
+                match is moved to found.
+            avoid (int or callable, optional): Line number, or function taking
+                a state and returning True. Paths that match are moved to
+                avoided and not stepped any further.
+            max_steps (int, optional): Stop after this many calls to step.
+            max_active (int, optional): Stop once there are more active paths than this.
+            timeout (float, optional): Stop after this many seconds.
+            solver_time_budget (float, optional): Stop once this many seconds
+                have been spent in z3, including in worker processes.
+            memory_limit (int, optional): Stop once this process uses this many
+                bytes of memory. Worker processes aren't counted.
+            on_limit (str, optional): What to do with the active paths when a
+                limit is hit. keep (default) leaves them active, so exploring
+                can pick up where it left off. drop throws them away. stash
+                moves them to unexplored.
+
         Returns:
-            True if found, False if not
+            bool: True if a path was found, False if not.
         """
-        assert type(find) in [int,type(None)]
-        
-        while len(self.active) > 0:
-            # Step the things
-            self.step()
-
-            if find:
-                # Check for any path that has made it here
-                for path in self.active:
-                    if path.state.lineno() == find:
+        for _ in self.iter_explore(find=find, avoid=avoid, max_steps=max_steps, max_active=max_active, timeout=timeout,
+                                   solver_time_budget=solver_time_budget, memory_limit=memory_limit, on_limit=on_limit, stashes=()):
+            pass
+
+        return self.stop_reason == "found"
+
+    def iter_explore(self, find=None, avoid=None, max_steps=None, max_active=None, timeout=None, solver_time_budget=None, memory_limit=None, on_limit="keep", stashes=None, summarize=False):
+        """
+        Explore like explore does, yielding each path as soon as it is
+        stashed, instead of only handing them over at the end. Paths are
+        yielded in the order they were stashed. stop_reason is set once the
+        generator is done.
+
+        To keep memory flat over long runs, summarize, and/or put the
+        stashes in ignore_groups so nothing is kept once it's been yielded.
+
+        Closing the generator early counts as hitting a limit, with
+        stop_reason closed. Paths stashed but not yielded yet stay in their
+        stash, unless it's ignored.
+
+        Args:
+            find, avoid, max_steps, max_active, timeout, solver_time_budget,
+                memory_limit, on_limit: As for explore.
+            stashes (iterable, optional): Names of the stashes whose new paths
+                get yielded. Defaults to completed, found and errored.
+            summarize (bool, optional): Yield, and keep in the stash, a
+                pySym.pyPath.PathSummary instead of the path. The path and
+                its state can then be freed right away.
+
+        Yields:
+            pySym.pyPath.Path or pySym.pyPath.PathSummary: Each path that reached one of stashes.
+        """
+        find = _predicate(find, "find")
+        avoid = _predicate(avoid, "avoid")
+        assert on_limit in ["keep", "drop", "stash"], "Invalid on_limit of {}".format(on_limit)
+
+        stashes = set(["completed", "found", "errored"] if stashes is None else stashes)
+        assert stashes.issubset(self._stashes), "Invalid stashes {}".format(stashes)
+        assert self.__streaming is None, "Already exploring this PathGroup"
+
+        pending = deque()
+        self.__streaming = (stashes, summarize, pending)
+
+        start = time.monotonic()
+        solver_start = Solver.solver_time() + self.__worker_solver_time
+        steps = 0
+        self.stop_reason = None
+
+        try:
+            while len(self.active) > 0:
+
+                if max_steps is not None and steps >= max_steps:
+                    self.stop_reason = "max_steps"
+                elif max_active is not None and len(self.active) > max_active:
+                    self.stop_reason = "max_active"
+                elif timeout is not None and time.monotonic() - start >= timeout:
+                    self.stop_reason = "timeout"
+                elif solver_time_budget is not None and Solver.solver_time() + self.__worker_solver_time - solver_start >= solver_time_budget:
+                    self.stop_reason = "solver_time"
+                elif memory_limit is not None and _memory_usage() >= memory_limit:
+                    self.stop_reason = "memory_limit"
+
+                if self.stop_reason is not None:
+                    self.__stop(on_limit)
+                    break
+
+                # Step the things
+                stepped = self.step()
+                steps += 1
+
+                for path in stepped:
+                    if avoid is not None and avoid(path.state):
+                        self.unstash(path,from_stash="active",to_stash="avoided")
+                        continue
+
+                    # Check for any path that has made it here
+                    if find is not None and find(path.state):
+                        if self.__unchecked_infeasible(path):
+                            self.unstash(path,from_stash="active",to_stash="deadended")
+                            continue
                         self.unstash(path,from_stash="active",to_stash="found")
-                        return True
+                        self.stop_reason = "found"
+                        break
+
+                while len(pending) > 0:
+                    yield pending.popleft()
+
+                if self.stop_reason is not None:
+                    break
+
+            else:
+                self.stop_reason = "exhausted"
+
+            while len(pending) > 0:
+                yield pending.popleft()
+
+        finally:
+            # Closed before we got to a stop, or something was raised. Leave things as a limit would.
+            if self.stop_reason is None:
+                self.stop_reason = "closed"
+                self.__stop(on_limit)
+
+            self.__streaming = None
+            self.close()
+
+    # Generator of each path as it finishes. See iter_explore.
+    stream = iter_explore
 
+    def __stop(self, on_limit):
+        """Deal with the active paths left when explore hits a limit."""
+        logger.info("explore: Stopping on {0} with {1} active paths".format(self.stop_reason, len(self.active)))
+
+        if on_limit == "drop":
+            self.active.clear()
+
+        elif on_limit == "stash":
+            for path in list(self.active):
+                self.unstash(path,from_stash="active",to_stash="unexplored")
+
+    def close(self):
+        """
+        Shut down the worker processes, if there are any. They will be
+        started again if we step in parallel again.
+        """
+        if self.__pool is not None:
+            self.__pool.close()
+            self.__pool.join()
+            self.__pool = None
+            self.__nodes = None
+
+
+    def __unchecked_infeasible(self,path):
+        """
+        True if we haven't been checking path's state as we went (see
+        feasibility) and it turns out to be impossible.
+        """
+        return self.feasibility != "eager" and not path.state.isSat()
+
+    def __stash_done(self,path):
+        """Stash a path that has no more steps."""
+        if self.__unchecked_infeasible(path):
+            self.unstash(path=path,to_stash="deadended")
+        else:
+            self.unstash(path=path,to_stash="completed")
+
+    def __stash_error(self,path,error):
+        """Stash a path whose step raised error. Impossible paths can fail in odd ways, so they're deadended instead."""
+        if self.__unchecked_infeasible(path):
+            self.unstash(path=path,to_stash="deadended")
+            return
+
+        path.error = error
+        self.unstash(path=path,to_stash="errored")
 
     def unstash(self,path=None,from_stash=None,to_stash=None):
         """
@@ -90,9 +388,17 @@ class PathGroup:
         assert type(from_stash) in [str, type(None)]
         assert type(to_stash) in [str, type(None)]
 
+        stashed = path
+
+        # Hand it to iter_explore, even if the stash itself is ignored
+        if self.__streaming is not None and to_stash in self.__streaming[0]:
+            if self.__streaming[1]:
+                stashed = path.summary()
+            self.__streaming[2].append(stashed)
+
         if to_stash is not None and to_stash not in self.ignore_groups:
             to_stash = getattr(self,to_stash)
-            to_stash.append(path)
+            to_stash.append(stashed)
 
         if from_stash is not None:
             from_stash = getattr(self,from_stash)
@@ -101,54 +407,414 @@ class PathGroup:
 
     def step(self):
         """
-        Step all active paths one step.
+        Step the active paths the search strategy picks one step.
+
+        Returns:
+            list: The paths this step added to active.
         """
         #with Pool(processes=1) as pool:
 
-        # Search Strategy
-        if self.search_strategy == "breadth":
-            paths = self.active
-        elif self.search_strategy == "depth":
-            paths = [self.active[-1]]
-        # Random
-        else:
-            paths = random.sample(range(len(self.active)), random.randint(1,len(self.active)))
-        
-        for currentPath in paths:
+        # Search Strategy. This takes them out of active.
+        paths = self.active.select()
+
+        # Picked but not stepped yet. If stepping gets interrupted, these go back in active.
+        in_flight = deque(paths)
+
+        try:
+            if self.workers > 1 and len(paths) > 1:
+                stepped = self.__step_parallel(in_flight)
+
+            else:
+                stepped = self.__step_here(in_flight)
+
+        except BaseException:
+            # Stepping copies the state first, so these are still as they were
+            for path in in_flight:
+                self.active.append(path)
+            raise
+
+        if self.prune != "none":
+            stepped = self.__prune_stepped(stepped)
+
+        if self.merge:
+            stepped = self.__merge_stepped(stepped)
+
+        return stepped
+
+    def __step_here(self, paths):
+        """
+        Step the given paths in this process. Each path is taken off the
+        front of paths once it has been stepped.
+
+        Returns:
+            list: The new paths that went into active.
+        """
+        stepped = []
+
+        while len(paths) > 0:
+            currentPath = paths[0]
+
             # It's possible this throws an exception on us
             try:
                 paths_ret = currentPath.step()
-                # Pop it off the block
-                self.unstash(path=currentPath,from_stash="active")
 
             except Exception as e:
-                currentPath.error = str(e)
-                self.unstash(path=currentPath,from_stash="active",to_stash="errored")
+                paths.popleft()
+                self.__stash_error(currentPath, str(e))
                 continue
 
+            paths.popleft()
+
             # If an empty list is returned, this path must be done
             if len(paths_ret) == 0:
-                self.unstash(path=currentPath,to_stash="completed")
+                self.__stash_done(currentPath)
                 continue
         
             # We have some return path
             else:
                 for returnedPath in paths_ret:
                     # Make sure the returned path is possible
-                    if not returnedPath.state.isSat():
+                    if not _is_feasible(returnedPath.state, self.feasibility):
                         self.unstash(path=returnedPath,to_stash="deadended")
                     else:
                         # We found our next step in the path
                         self.unstash(path=returnedPath,to_stash="active")
+                        stepped.append(returnedPath)
+
+        return stepped
+
+    def __step_parallel(self, paths):
+        """
+        Step the given paths across our worker processes. Paths go over to
+        the workers pickled and come back the same way. They are then stashed
+        exactly as step would have. paths is emptied once the workers are done.
+
+        AST nodes go over as their id in a NodeTable the workers were started
+        with, and trail nodes as their key, so paths come back sharing them
+        with the paths here. See Serialize.dumps. Backtraces stay here, so
+        what gets sent doesn't grow with every step.
+
+        Returns:
+            list: The new paths that went into active.
+        """
+        stepped = []
+
+        if self.__pool is None:
+            project = self._project if self._project is not None else paths[0]._project
+            self.__nodes = Serialize.NodeTable.from_paths(list(paths) + list(self.active))
+            self.__pool = Pool(processes=self.workers, initializer=_init_worker, initargs=(project, self.__nodes.roots))
+
+        # Stepping never looks at the backtrace. Workers push onto an empty one, and that goes on top of ours when they're back.
+        sent = []
+        for path in paths:
+            state = path.state.copy()
+            state.backtrace = Stack()
+            sent.append((Serialize.dumps(path.copy(state=state), self.__nodes), self.feasibility))
+
+        results = self.__pool.map(_step_worker, sent)
+        in_flight, paths = paths, list(paths)
+        in_flight.clear()
+
+        for currentPath, (error, paths_ret, solver_time) in zip(paths, results):
+            self.__worker_solver_time += solver_time
+
+            if error is not None:
+                self.__stash_error(currentPath, error)
+                continue
+
+            # If an empty list is returned, this path must be done
+            if len(paths_ret) == 0:
+                self.__stash_done(currentPath)
+                continue
+
+            for data, sat in paths_ret:
+                returnedPath = Serialize.loads(data, self.__nodes)
+                returnedPath._project = returnedPath.state._project = currentPath._project
+
+                backtrace = currentPath.state.backtrace
+                for inst in reversed(list(returnedPath.state.backtrace)):
+                    backtrace = backtrace.push(inst)
+                returnedPath.state.backtrace = backtrace
+
+                if not sat:
+                    self.unstash(path=returnedPath,to_stash="deadended")
+                else:
+                    self.unstash(path=returnedPath,to_stash="active")
+                    stepped.append(returnedPath)
+
+        return stepped
+
+    def __prune_stepped(self, stepped):
+        """
+        Drop each newly stepped path that is redundant with another active
+        path at the same point in the program. See prune.
+
+        Returns:
+            list: The stepped paths that are still active.
+        """
+        points = self.__prune_points
+
+        # Forget paths that aren't active anymore every now and then
+        if len(points) > 2 * len(self.active) + 64:
+            points.clear()
+            new = set(id(path) for path in stepped)
+            for path in self.active:
+                if id(path) in new:
+                    continue
+                key = Subsumption.pointKey(path.state)
+                if key is not None:
+                    points.setdefault(key, []).append(path)
+
+        for path in stepped:
+            if path not in self.active:
+                continue
+
+            key = Subsumption.pointKey(path.state)
+            if key is None:
+                continue
+
+            others = [other for other in points.get(key, []) if other in self.active and other is not path]
+            points[key] = others
+
+            fingerprint = path.state.solver.fingerprint()
+
+            if any(other.state.solver.fingerprint() == fingerprint for other in others):
+                self.__drop(path)
+                continue
+
+            if self.prune == "subsumption":
+                if any(Subsumption.subsumes(other.state, path.state) for other in others):
+                    self.__drop(path)
+                    continue
+
+                for other in list(others):
+                    if Subsumption.subsumes(path.state, other.state):
+                        self.__drop(other)
+                        others.remove(other)
+
+            others.append(path)
+
+        return [path for path in stepped if path in self.active]
+
+    def __drop(self, path):
+        """Drop an active path that prune found to be redundant."""
+        self.active.remove(path)
+        self.pruned += 1
+
+    def __merge_stepped(self, stepped):
+        """
+        Merge each newly stepped path with an active path waiting at the same
+        point in the program, if there is one and it looks worth it. See merge.
+
+        Returns:
+            list: The stepped paths that are still active, and the merged paths that replaced the others.
+        """
+        waiting = self.__merge_points
+        merged_paths = []
+
+        # Forget paths that aren't active anymore every now and then
+        if len(waiting) > 2 * len(self.active) + 64:
+            waiting.clear()
+            for path in self.active:
+                key = Merge.mergeKey(path.state)
+                if key is not None:
+                    waiting[key] = path
+
+        for path in stepped:
+            if path not in self.active:
+                continue
+
+            key = Merge.mergeKey(path.state)
+            if key is None:
+                continue
+
+            other = waiting.get(key)
+
+            if other is None or other is path or other not in self.active:
+                waiting[key] = path
+                continue
+
+            state = Merge.merge(other.state, path.state)
+
+            if state is None:
+                continue
+
+            merged = other.copy(state=state)
+            merged.forks = min(other.forks, path.forks)
+            self.active.remove(other)
+            self.active.remove(path)
+            self.active.append(merged)
+            waiting[key] = merged
+            merged_paths.append(merged)
+
+        return [path for path in stepped if path in self.active] + [path for path in merged_paths if path in self.active]
+
+    def save(self, f):
+        """
+        Save this PathGroup to a file, to be picked up again later with
+        PathGroup.load. The project is not saved.
+
+        Args:
+            f (str or file): File name or file object opened for binary writing.
+        """
+        if type(f) is str:
+            with open(f, "wb") as f:
+                return self.save(f)
+
+        stashes = {stash: list(getattr(self, stash)) for stash in self._stashes}
+        info = {
+            'search_strategy': self.search_strategy,
+            'ignore_groups': list(self.ignore_groups),
+            'workers': self.workers,
+            'feasibility': self.feasibility,
+            'merge': self.merge,
+            'prune': self.prune,
+            'pruned': self.pruned,
+        }
+
+        Serialize.dump(stashes, f, info)
+
+    @staticmethod
+    def load(f, project=None):
+        """
+        Load a PathGroup written by PathGroup.save.
+
+        Args:
+            f (str or file): File name or file object opened for binary reading.
+            project (pySym.Project, optional): Project to associate the group and its paths with.
+
+        Returns:
+            PathGroup: The loaded PathGroup.
+        """
+        if type(f) is str:
+            with open(f, "rb") as f:
+                return PathGroup.load(f, project=project)
+
+        stashes, info = Serialize.load(f, project=project)
+        pruned = info.pop('pruned', 0)
+
+        pg = PathGroup(project=project, **info)
+        pg.pruned = pruned
+
+        for stash, paths in stashes.items():
+            setattr(pg, stash, paths)
+
+        return pg
+
+    @property
+    def workers(self):
+        """int: How many processes to step paths with. 1 means step them all in this process."""
+        return self.__workers
+
+    @workers.setter
+    def workers(self, workers):
+        if workers is None:
+            workers = 1
+        assert type(workers) is int and workers >= 1, "Invalid number of workers {}".format(workers)
+        self.__workers = workers
+
+    @property
+    def feasibility(self):
+        """str: When to ask the solver if paths are still possible.
+
+        Valid options are:
+           - eager: After every step. Impossible paths are deadended right away.
+           - lazy: Only after steps that branched (If, While, Assert, or any
+             step that made more than one path). Straight line code only adds
+             definitions, so this saves most of the solver calls. A path made
+             impossible some other way runs on until its next branch.
+           - completion: Only when a path completes, errors or is found.
+
+        Defaults to Config.PYSYM_FEASIBILITY.
+        """
+        return self.__feasibility
+
+    @feasibility.setter
+    def feasibility(self, feasibility):
+        if feasibility is None:
+            feasibility = Config.PYSYM_FEASIBILITY
+        assert feasibility in ["eager", "lazy", "completion"], "Feasibility mode '{}' is not valid.".format(feasibility)
+        self.__feasibility = feasibility
+
+    @property
+    def merge(self):
+        """bool: Merge paths that reach the same point in the program.
+
+        When a path steps to where another active path is waiting (same next
+        instruction, call stack and variable layout), the two are merged into
+        one path. Variables that differ become z3.If's of the two path
+        conditions. Pairs that look like they'd make solving much harder
+        aren't merged, see pyState.Merge.worthMerging.
+
+        Paths that split at a branch only meet again if the one that's behind
+        gets to catch up, so use this with the program_order search strategy.
+
+        Defaults to Config.PYSYM_MERGE.
+        """
+        return self.__merge
+
+    @merge.setter
+    def merge(self, merge):
+        if merge is None:
+            merge = Config.PYSYM_MERGE
+        assert type(merge) is bool, "Invalid merge setting {}".format(merge)
+        self.__merge = merge
+
+    @property
+    def prune(self):
+        """str: Drop active paths that can't find anything another active path won't.
+
+        Valid options are:
+           - none: Keep every path.
+           - duplicates: Drop a path that is at the same point in the program
+             as another, with the same call stack, every variable bound to the
+             same expression and the same set of constraints. Cheap, no solver
+             calls.
+           - subsumption: Also drop a path whose constraints imply those of
+             another path at the same point with the same variables. Costs a
+             solver query per pair of such paths.
+
+        Dropped paths aren't stashed anywhere, they're only counted in pruned.
+
+        Defaults to Config.PYSYM_PRUNE.
+        """
+        return self.__prune
+
+    @prune.setter
+    def prune(self, prune):
+        if prune is None:
+            prune = Config.PYSYM_PRUNE
+        assert prune in ["none", "duplicates", "subsumption"], "Prune mode '{}' is not valid.".format(prune)
+        self.__prune = prune
+
+    @property
+    def active(self):
+        """SearchStrategy.SearchStrategy: The active paths, held by the search strategy. Can be set to any iterable of paths."""
+        return self.__active
+
+    @active.setter
+    def active(self, paths):
+        strategy = self.search_strategy
+        if type(strategy) is str:
+            strategy = SearchStrategy.strategies[strategy]
+        self.__active = strategy(paths)
 
     @property
     def search_strategy(self):
-        """str: Strategy for searching the paths.
+        """str or SearchStrategy.SearchStrategy subclass: Strategy for searching the paths.
 
         Valid options are:
            - Breadth (default): Traditional searching. Step each path in order.
            - Depth: Drill one path down as far as possible.
-           - Random: Randomize what paths get stepped and what order.
+           - Random: Step one path picked at random.
+           - Random_Path: Step one path picked at random, halving its chance every time it forked.
+           - Coverage: Step paths about to run a line nothing has run yet first.
+           - Constraints: Step the path with the fewest constraints first.
+           - Forks: Step the path that forked the fewest times first.
+           - Program_Order: Step the path furthest behind in the program first. See merge.
+           - Any subclass of SearchStrategy.SearchStrategy.
+
+        Changing it moves the active paths over to the new strategy.
         """
         return self.__search_strategy
 
@@ -156,11 +822,16 @@ class PathGroup:
     def search_strategy(self, search_strategy):
         if search_strategy == None:
             search_strategy = "breadth"
-        else:
+        elif type(search_strategy) is str:
             search_strategy = search_strategy.lower()
-        assert search_strategy in ["breadth", "depth", "random"], "Search strategy '{}' is not valid.".format(search_strategy)
+            assert search_strategy in SearchStrategy.strategies, "Search strategy '{}' is not valid.".format(search_strategy)
+        else:
+            assert isinstance(search_strategy, type) and issubclass(search_strategy, SearchStrategy.SearchStrategy), "Search strategy '{}' is not valid.".format(search_strategy)
         self.__search_strategy = search_strategy
 
+        if self.__active is not None:
+            self.active = list(self.__active)
+
     @property
     def _project(self):
         """pySym Project that this is associated with."""
@@ -1,7 +1,6 @@
 import logging
 import z3, z3.z3util as z3util
 import ast
-import os
 #from . import hasRealComponent, ReturnObject, duplicateSort
 #from pySym import pyState.BinOp, pyState.Call
 from ..pyObjectManager.Int import Int
@@ -10,6 +9,9 @@ from ..pyObjectManager.BitVec import BitVec
 from ..pyObjectManager.List import List
 from ..pyObjectManager.String import String
 from ..pyObjectManager.Char import Char
+from ..pyObjectManager.SeqString import SeqString
+from ..pyObjectManager.Array import Array
+from ..pyObjectManager import ids
 
 logger = logging.getLogger("pyState:Assign")
 
@@ -118,7 +120,7 @@ def _handleAssignString(target,stringObject):
         # Set the new list
         new_obj = stringObject.copy()
         # HACK! Sometimes the string doesn't end up with a new unique uuid... This is a hack around that for now.
-        new_obj.uuid = os.urandom(32) 
+        new_obj.uuid = ids.next_id()
         #parent[index] = stringObject.copy()
         parent[index] = new_obj
         #target.setTo(stringObject.copy(),clear=True)
@@ -132,6 +134,40 @@ def _handleAssignString(target,stringObject):
     return ret
 
 
+def _handleAssignArray(target,values):
+    """
+    Handle assigning to an element of an Array (i.e.: a[i] = 1). The index
+    can be symbolic, in which case this is a single z3 Store rather than a
+    split per possible index.
+    """
+    assert type(target) is ast.Subscript
+
+    ret = []
+
+    for value in values:
+        state = value.state.copy()
+
+        arrays = state.resolveObject(target.value)
+        indexes = state.resolveObject(target.slice.value)
+
+        # Resolve calls if we need to
+        retObjs = [x.state for x in indexes if type(x) is ReturnObject]
+        if len(retObjs) > 0:
+            return retObjs
+
+        if len(arrays) != 1 or len(indexes) != 1:
+            err = "_handleAssignArray: Don't know how to assign to more than one Array element at once"
+            logger.error(err)
+            raise Exception(err)
+
+        array = arrays.pop()
+        array[indexes.pop()] = value
+
+        state.path.pop(0)
+        ret.append(state)
+
+    return ret
+
 def handle(state,element):
     """Attempt to handle the Python Assign element
     
@@ -183,11 +219,16 @@ def handle(state,element):
     if len(retObjs) > 0:
         return retObjs
 
+    # Arrays are written to with a z3 Store
+    if type(target) is ast.Subscript and type(target.slice) is ast.Index:
+        if any(type(x) is Array for x in state.resolveObject(target.value)):
+            return _handleAssignArray(target,values)
+
     ret = []
     
     # For every possible assign value, get the state
     for value in values:
-        if type(value) in [Int, Real, BitVec]:
+        if type(value) in [Int, Real, BitVec, SeqString, Array]:
             ret += _handleAssignNum(target,value)
     
         elif type(value) is List:
@@ -3,11 +3,13 @@ import z3
 import ast
 from . import hasRealComponent, ReturnObject, z3Helpers
 from . import z3Helpers
+from . import BinOp
 from ..pyObjectManager.Int import Int
 from ..pyObjectManager.Real import Real
 from ..pyObjectManager.BitVec import BitVec
 from ..pyObjectManager.String import String
 from ..pyObjectManager.List import List
+from ..pyObjectManager.SeqString import SeqString
 
 logger = logging.getLogger("pyState:AugAssign")
 
@@ -241,6 +243,45 @@ def _handleString(element,oldTarget):
     # Return the state
     return ret
 
+def _handleSeqString(element,oldTarget):
+    """
+    Handle the case where we're AugAssigning SeqStrings
+    """
+    state = oldTarget.state
+
+    # Value is what to set them to
+    value = state.resolveObject(element.value)
+
+    # Normalize the input
+    values = [value] if type(value) is not list else value
+
+    # Check for return object. Return all applicable
+    retObjs = [x.state for x in values if type(x) is ReturnObject]
+    if len(retObjs) > 0:
+        return retObjs
+
+    ret = []
+
+    # Loop through possible old targets
+    for value in values:
+
+        state = value.state.copy()
+        state.path.pop(0)
+
+        parent = state.objectManager.getParent(oldTarget)
+        index = parent.index(oldTarget)
+
+        # Same as the BinOp would be
+        newString = BinOp._handleSeqString(state,oldTarget,value,element.op)[0]
+
+        # Assign the new string
+        parent[index] = newString
+
+        ret.append(state.copy())
+
+    # Return the state
+    return ret
+
 def _handleList(element,oldTarget):
     """
     Handle the case where we're AugAssigning Lists
@@ -360,6 +401,9 @@ def handle(state,element):
         elif type(oldTarget) is String:
             ret += _handleString(element,oldTarget)
 
+        elif type(oldTarget) is SeqString:
+            ret += _handleSeqString(element,oldTarget)
+
         elif type(oldTarget) is List:
             ret += _handleList(element,oldTarget)
 
@@ -7,6 +7,8 @@ from ..pyObjectManager.Real import Real
 from ..pyObjectManager.BitVec import BitVec
 from ..pyObjectManager.String import String
 from ..pyObjectManager.List import List
+from ..pyObjectManager.Char import Char
+from ..pyObjectManager.SeqString import SeqString, toSeq
 from . import z3Helpers
 
 logger = logging.getLogger("pyState:BinOp")
@@ -247,6 +249,49 @@ def _handleStr(state,left,right,op):
 
     return ret
 
+def _handleSeqString(state,left,right,op):
+    """
+    Handle BinOp where either side is a SeqString
+    """
+    strings = [String, Char, SeqString]
+
+    s = state.getVar("tempBinOpSeqString",ctx=1,varType=SeqString)
+    s.increment()
+
+    # Case: "A" + "B"
+    if type(left) in strings and type(right) in strings and type(op) is ast.Add:
+
+        # Don't clutter up z3!
+        if left.isStatic() and right.isStatic():
+            s.setTo(left.getValue() + right.getValue())
+        else:
+            s.setTo(z3.Concat(toSeq(left,ctx=state.solver.ctx), toSeq(right,ctx=state.solver.ctx)))
+
+    elif type(op) is ast.Mult and set([type(left),type(right)]) in [set([SeqString,Int]), set([SeqString,BitVec])]:
+        i = left if type(left) in [Int, BitVec] else right
+        oldStr = left if type(left) is SeqString else right
+
+        if not i.isStatic():
+            err = "_handleSeqString: Don't know how to handle symbolic mult at the moment"
+            logger.error(err)
+            raise Exception(err)
+
+        i = i.getValue()
+
+        if i <= 0:
+            s.setTo("")
+        elif i == 1:
+            s.setTo(oldStr)
+        else:
+            s.setTo(z3.Concat(*[oldStr.getZ3Object()] * i))
+
+    else:
+        err = "_handleSeqString: Don't know how to handle {0} {1} {2}".format(type(left),op,type(right))
+        logger.error(err)
+        raise Exception(err)
+
+    return [s.copy()]
+
 def _handleList(state,left,right,op):
     """
     Handle BinOp for List types
@@ -361,6 +406,9 @@ def handle(state,element,ctx=None):
             if type(l) is List or type(r) is List:
                 ret += _handleList(r.state,l,r,op)
         
+            elif type(l) is SeqString or type(r) is SeqString:
+                ret += _handleSeqString(r.state,l,r,op)
+
             elif type(l) is String or type(r) is String:
                 ret += _handleStr(r.state,l,r,op)
         
@@ -7,10 +7,54 @@ from ..pyObjectManager.Real import Real
 from ..pyObjectManager.BitVec import BitVec
 from ..pyObjectManager.Char import Char
 from ..pyObjectManager.String import String
+from ..pyObjectManager.SeqString import SeqString, toSeq
 
 
 logger = logging.getLogger("pyState:Compare")
 
+def _compareSeqString(state,element,left,right,op):
+    """
+    Input:
+        state = State object for the evaluation of the compare
+        element = ast element object for the compare
+        left = Left String, Char or SeqString
+        right = Right String, Char or SeqString
+        op = ast compare operation
+    Action:
+        Compare two strings, at least one of which is a SeqString. Strings
+        compare lexicographically, the same as in python.
+    Return:
+        List with the created constraint expression for the True state
+    """
+
+    # Don't clutter up z3!
+    if left.isStatic() and right.isStatic():
+        lz3, rz3 = left.getValue(), right.getValue()
+    else:
+        lz3, rz3 = toSeq(left,ctx=state.solver.ctx), toSeq(right,ctx=state.solver.ctx)
+
+    if type(op) == ast.Eq:
+        return [lz3 == rz3]
+
+    elif type(op) == ast.NotEq:
+        return [lz3 != rz3]
+
+    elif type(op) == ast.Lt:
+        return [lz3 < rz3]
+
+    elif type(op) == ast.LtE:
+        return [lz3 <= rz3]
+
+    elif type(op) == ast.Gt:
+        return [lz3 > rz3]
+
+    elif type(op) == ast.GtE:
+        return [lz3 >= rz3]
+
+    err = "_compareSeqString: Don't know how to handle type '{0}' at line {1} column {2}".format(type(op),element.lineno,element.col_offset)
+    logger.error(err)
+    raise Exception(err)
+
 def _handleLeftVarInt(state,element,left):
     """
     Input:
@@ -27,7 +71,7 @@ def _handleLeftVarInt(state,element,left):
     """
 
     # Resolve the z3 object
-    if type(left) in [Int, Real, BitVec, Char]:
+    if type(left) in [Int, Real, BitVec, Char, SeqString]:
         pass
         #left = left.getZ3Object()
     
@@ -35,6 +79,10 @@ def _handleLeftVarInt(state,element,left):
     elif type(left) is String and len(left) == 1:
         #left = left[0].getZ3Object()
         left = left[0]
+
+    # Longer Strings can still be compared to SeqStrings
+    elif type(left) is String:
+        pass
     
     else:
         err = "_handleLeftVar: Don't know how to handle type '{0}'".format(type(left))
@@ -69,6 +117,21 @@ def _handleLeftVarInt(state,element,left):
     # Loop through all the possible states
     for r in right:
 
+        # Anything compared to a SeqString is a string compare
+        if type(left) is SeqString or type(r) is SeqString:
+            if type(left) not in [String, Char, SeqString] or type(r) not in [String, Char, SeqString]:
+                err = "_handleLeftVar: Don't know how to compare types '{0}' and '{1}'".format(type(left),type(r))
+                logger.error(err)
+                raise Exception(err)
+
+            ret += _compareSeqString(state,element,left,r,ops)
+            continue
+
+        if type(left) is String:
+            err = "_handleLeftVar: Don't know how to handle type '{0}'".format(type(left))
+            logger.error(err)
+            raise Exception(err)
+
         if type(r) in [Int, Real, BitVec, Char]:
             pass #r = r.getZ3Object()
 
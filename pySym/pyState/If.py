@@ -8,37 +8,44 @@ logger = logging.getLogger("pyState:If")
 
 
 def _handleConstraints(stateIf,stateElse,trueConstraint,element):
-    # Add the constraints we just got
-    # Optimization to not add extra constraints
-    if type(trueConstraint) is not bool or trueConstraint != True:
-        stateIf.addConstraint(trueConstraint)
-    if type(trueConstraint) is not bool or trueConstraint == True:
-        stateElse.addConstraint(z3.Not(trueConstraint))
-
-    ret_states = [stateIf,stateElse]
-
-    # Check if statement. We'll have at least one instruction here, so treat this as a call
-    # Saving off the current path so we can return to it and pick up at the next instruction
-    cs = copy(stateIf.path)
-    # Only push our stack if it's not empty
-    if len(cs) == 0:
-        cs.append(ast.Pass(lineno=0,col_offset=0))
-    stateIf.pushCallStack(cs,stateIf.ctx,stateIf.retID)
-
-    # Our new path becomes the inside of the if statement
-    stateIf.path = element.body
-    # Once inside the If, we're no longer in a "loop" for this call
-    stateIf.loop = None
-
-    # Update the else's path
-    # Check if there is an else path we need to take
-    if len(element.orelse) > 0:
-        cs = copy(stateElse.path)
-        if len(cs) > 0:
-            stateElse.pushCallStack(cs,stateIf.ctx,stateIf.retID)
-
-        stateElse.path = element.orelse
-        stateElse.loop = None
+    """stateIf or stateElse is None if that side of the branch can't happen."""
+    ret_states = []
+
+    # Add the constraints we just got. The sides we got are already known to be sat.
+    if stateIf is not None:
+        if type(trueConstraint) is not bool:
+            stateIf.addConstraint(trueConstraint,sat=True)
+
+        # Check if statement. We'll have at least one instruction here, so treat this as a call
+        # Saving off the current path so we can return to it and pick up at the next instruction
+        cs = copy(stateIf.path)
+        # Only push our stack if it's not empty
+        if len(cs) == 0:
+            cs.append(ast.Pass(lineno=0,col_offset=0))
+        stateIf.pushCallStack(cs,stateIf.ctx,stateIf.retID)
+
+        # Our new path becomes the inside of the if statement
+        stateIf.path = element.body
+        # Once inside the If, we're no longer in a "loop" for this call
+        stateIf.loop = None
+
+        ret_states.append(stateIf)
+
+    if stateElse is not None:
+        if type(trueConstraint) is not bool:
+            stateElse.addConstraint(z3.Not(trueConstraint),sat=True)
+
+        # Update the else's path
+        # Check if there is an else path we need to take
+        if len(element.orelse) > 0:
+            cs = copy(stateElse.path)
+            if len(cs) > 0:
+                stateElse.pushCallStack(cs,stateElse.ctx,stateElse.retID)
+
+            stateElse.path = element.orelse
+            stateElse.loop = None
+
+        ret_states.append(stateElse)
 
     return ret_states
 
@@ -137,18 +144,24 @@ def handle(state,element):
     if len(retObjs) > 0:
         return retObjs
 
-    # Important to copy after Constraint generation since it may have added to the state!
-    stateElse = state.copy()
-
     # Not waiting on anything, move forward
-    stateIf.path.pop(0)
-    stateElse.path.pop(0)
+    state.path.pop(0)
     
     ret = []
 
-    for tc in trueConstraint:
+    for i, tc in enumerate(trueConstraint):
         logger.debug("handling trueConstraint {0}".format(tc))
-        ret += _handleConstraints(stateIf.copy(),stateElse.copy(),tc,element)
+
+        # Decide both sides before forking, and only fork the ones that can happen
+        takeIf, takeElse = state.feasibleBranches(tc)
+
+        # Important to copy after Constraint generation since it may have added to the state!
+        # The last constraint can have the state itself instead of a copy
+        last = i == len(trueConstraint) - 1
+        stateElse = (state.copy() if takeIf or not last else state) if takeElse else None
+        stateIf = (state if last else state.copy()) if takeIf else None
+
+        ret += _handleConstraints(stateIf,stateElse,tc,element)
     
     return ret
 
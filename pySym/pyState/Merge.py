@@ -0,0 +1,234 @@
+"""
+Merging of states that reached the same point in the program.
+
+Two states that split at a branch and then rejoin (both arms of an If ran and
+fell through to the same next line) are merged into one. Their path
+conditions are or'd together, and any variable that ended up different gets
+a new version that is z3.If(the first state's condition, its value, the
+other's value). Variables that both states still share need nothing: they
+are the same z3 variable, constrained differently on each side of the or.
+
+Merging trades the number of states for harder solver queries, so merge only
+takes pairs that look cheap. See worthMerging.
+"""
+
+import ast
+import logging
+import z3
+from .. import Config
+from . import Solver
+from ..pyObjectManager.List import List
+from ..pyObjectManager.String import String
+from ..pyObjectManager.Array import Array
+
+logger = logging.getLogger("pyState:Merge")
+
+
+class _Unmergeable(Exception):
+    pass
+
+
+def _nodeKey(node):
+    if node is None:
+        return None
+
+    # For loops keep what they have left to iterate over in the node itself
+    if type(node) is ast.For and not isinstance(node.iter, ast.AST):
+        raise _Unmergeable()
+
+    return (type(node), getattr(node, "lineno", None), getattr(node, "col_offset", None))
+
+def _pathKey(path):
+    # Paths are tails of ast bodies, so where the tail starts and how long it is says which one it is
+    for node in path:
+        _nodeKey(node)
+    return (len(path), _nodeKey(path[0]) if len(path) > 0 else None)
+
+def mergeKey(state):
+    """
+    Returns a hashable summary of where state is in the program. States can
+    only be merged if their keys are equal. None if state can't be merged at all.
+    """
+    # In the middle of returning from a call
+    if len(state.objectManager.returnObjects) > 0:
+        return None
+
+    ctx, retID, path, loop = state.ctx, state.retID, state.path, state.loop
+    frames = list(state.callStack)
+
+    # A state that's done with its block is where the frame it'll pop back to is
+    while len(path) == 0 and loop is None and len(frames) > 0:
+        frame = frames.pop(0)
+        ctx, retID, path, loop = frame.ctx, frame.retID, frame.path, frame.loop
+
+    try:
+        return (
+            ctx, retID, state.maxRetID, state.maxCtx,
+            _pathKey(path), _nodeKey(loop),
+            tuple((frame.ctx, frame.retID, _pathKey(frame.path), _nodeKey(frame.loop)) for frame in frames),
+            )
+    except _Unmergeable:
+        return None
+
+def _differences(a, b, differences):
+    """
+    Walks objects a (in the merged state) and b (in the other state) side by
+    side. Appends each pair of numeric variables whose values differ to
+    differences. Raises _Unmergeable if they can't be merged.
+    """
+    if type(a) is not type(b):
+        raise _Unmergeable()
+
+    if type(a) in [List, String]:
+        if len(a) != len(b):
+            raise _Unmergeable()
+        for i in range(len(a)):
+            _differences(a[i], b[i], differences)
+        return
+
+    if type(a) is Array and a.length != b.length:
+        raise _Unmergeable()
+
+    a_z3 = a.getZ3Object()
+    b_z3 = b.getZ3Object()
+
+    if a_z3.eq(b_z3):
+        return
+
+    if a_z3.sort() != b_z3.sort():
+        raise _Unmergeable()
+
+    # Only plain numbers can be switched with a z3.If. Strings etc. have to match.
+    if type(a).__name__ not in ["Int", "Real", "BitVec"]:
+        raise _Unmergeable()
+
+    differences.append((a, b))
+
+def _loopNames(state):
+    """Names read by the tests of the loops state is in."""
+    names = set()
+    loops = [state.loop] + [frame.loop for frame in state.callStack]
+
+    for loop in loops:
+        if type(loop) is ast.While:
+            names.update(node.id for node in ast.walk(loop.test) if type(node) is ast.Name)
+
+    return names
+
+def worthMerging(state, mine, theirs, differences):
+    """
+    Heuristic for whether merging is likely to pay off.
+
+    Args:
+        state (pySym.pyState.State): One of the states being merged.
+        mine (list): Constraints state added since the split.
+        theirs (list): Constraints the other state added since the split.
+        differences (list): (object, object) pairs that would need a z3.If.
+
+    Returns:
+        bool: False if the merge is likely to make queries much more expensive.
+    """
+    # Each difference adds an ite that every later query on it has to split on
+    if len(differences) > Config.PYSYM_MERGE_MAX_VARS:
+        return False
+
+    # Long path conditions get repeated inside the or
+    if len(mine) + len(theirs) > Config.PYSYM_MERGE_MAX_CONSTRAINTS:
+        return False
+
+    # A loop test that reads a merged variable can no longer be decided
+    # concretely, so the loop would fork on every iteration
+    if len(differences) > 0 and any(a.varName in _loopNames(state) for a, b in differences):
+        return False
+
+    return True
+
+def merge(state, other):
+    """
+    Merge two states at the same point in the program.
+
+    Args:
+        state (pySym.pyState.State): First state.
+        other (pySym.pyState.State): Second state.
+
+    Returns:
+        pySym.pyState.State: New state covering both, or None if they can't
+        be merged or it doesn't look worth it.
+    """
+    key = mergeKey(state)
+    if key is None or key != mergeKey(other):
+        return None
+
+    if state.functions.keys() != other.functions.keys() or any(state.functions[f] is not other.functions[f] for f in state.functions):
+        return None
+
+    common = state.solver.common(other.solver)
+    if common is None:
+        return None
+
+    solver, mine, theirs = common
+
+    merged = state.copy()
+    differences = []
+
+    try:
+        om = merged.objectManager
+        other_om = other.objectManager
+
+        if set(om.variables.keys()) != set(other_om.variables.keys()):
+            return None
+
+        for ctx in om.variables.keys():
+            mine_ctx = om.getCtx(ctx)
+            theirs_ctx = other_om.getCtx(ctx)
+
+            if set(mine_ctx) != set(theirs_ctx):
+                return None
+
+            for name in list(mine_ctx):
+                _differences(mine_ctx[name], theirs_ctx[name], differences)
+
+    except _Unmergeable:
+        return None
+
+    # If one side didn't add anything, its condition can't tell the two apart
+    if len(differences) > 0 and (len(mine) == 0 or len(theirs) == 0):
+        return None
+
+    if not worthMerging(state, mine, theirs, differences):
+        return None
+
+    ctx = state.solver.ctx
+    mine = z3.And(*mine) if len(mine) > 0 else z3.BoolVal(True, ctx=ctx)
+    theirs = z3.And(*theirs) if len(theirs) > 0 else z3.BoolVal(True, ctx=ctx)
+
+    if solver.check() != z3.sat:
+        return None
+
+    # z3.If(mine, ...) is only right if no input takes both sides
+    if len(differences) > 0 and solver.is_sat_with(z3.And(mine, theirs)):
+        return None
+
+    merged.solver = solver
+
+    # What state had indexed doesn't match the new solver
+    merged._vars_in_solver = Solver.ConstraintIndex()
+    for constraint in solver.assertions():
+        merged._vars_in_solver.add(constraint)
+
+    merged.addConstraint(z3.Or(mine, theirs))
+
+    for a, b in differences:
+        a_z3 = a.getZ3Object()
+        b_z3 = b.getZ3Object()
+
+        # Both sides' versions are in the or, so the new one has to come after either
+        a.count = max(a.count, b.count)
+        a.increment()
+        merged.addConstraint(a.getZ3Object() == z3.If(mine, a_z3, b_z3))
+
+    merged.branched = True
+
+    logger.debug("merge: Merged states at line {0} with {1} differences".format(merged.lineno(), len(differences)))
+
+    return merged
@@ -0,0 +1,1340 @@
+"""
+Incremental solver backend shared between states.
+
+Every State used to own a full z3 solver and copy it (via translate) on every
+step. Instead, each State now owns a lightweight Solver object that only holds
+a pointer into a persistent (immutable, linked) trail of constraints. Copying a
+Solver is O(1) since the child just points at the same trail node as the
+parent.
+
+The actual solving happens in one incremental z3 solver per z3 context per
+process. Before a check, that solver is synchronized to the constraints being
+checked by popping back to the longest prefix it has in common with the last
+thing it checked and pushing the rest. Sibling states share the common prefix
+of their trails, so they only pay for the constraints that differ.
+
+Queries are also sliced by constraint independence (as KLEE does). The trail
+is partitioned into groups of constraints that transitively share variables.
+When a trail extends one that is already known to be satisfiable, only the
+groups touched by the new constraints are sent to z3. Models for specific
+variables likewise only solve the groups those variables live in.
+
+Each Solver also carries the last full model it knew to satisfy its trail, and
+copies inherit it. Before asking z3 anything, new constraints are evaluated
+under that model. Straight line code mostly adds definitions of fresh variables
+(x_1 == x_0 + 1), which can be satisfied by simply extending the model, so most
+steps never reach the solver at all.
+
+Constraints can also be added as retractable. Those are guarded by a fresh
+tracking literal (Implies(p, c)) and p is passed to z3 as an assumption.
+Removing one just appends a marker to the trail that stops assuming p, so
+nothing has to be re-asserted and the shared prefix stays shared.
+
+Finally, answers are remembered in a process wide QueryCache keyed on the set
+of constraints in the (sliced) query, so the same question asked by sibling
+states, or by isStatic/canBe/mustBe copies of a state, only hits z3 once.
+
+Trail nodes pickle as SMT-LIB2, which each node only renders once. Nodes that
+are sent between processes also carry a key, so a process that already has a
+node (see trail_node) keeps using it rather than making a copy.
+"""
+
+import z3
+import time
+import weakref
+import logging
+from collections import OrderedDict
+from .. import Config
+from ..pyObjectManager import ids
+
+logger = logging.getLogger("pyState:Solver")
+
+
+# (context, expression id) -> (expression, variables). Holding the expression keeps its id from being reused.
+_variables_cache = OrderedDict()
+_VARIABLES_CACHE_SIZE = 8192
+
+def get_variables(expr):
+    """Returns the ids of all uninterpreted constants and functions used in a z3 expression.
+
+    Args:
+        expr (z3.ExprRef): Expression to look through.
+
+    Returns:
+        frozenset: AST ids of the declarations of every variable in expr.
+    """
+    key = (id(expr.ctx), expr.get_id())
+
+    try:
+        variables = _variables_cache[key][1]
+        _variables_cache.move_to_end(key)
+        return variables
+    except KeyError:
+        pass
+
+    variables = _get_variables(expr)
+
+    _variables_cache[key] = (expr, variables)
+    if len(_variables_cache) > _VARIABLES_CACHE_SIZE:
+        _variables_cache.popitem(last=False)
+
+    return variables
+
+def _get_variables(expr):
+    seen = set()
+    variables = set()
+    todo = [expr]
+
+    while todo:
+        e = todo.pop()
+        i = e.get_id()
+
+        if i in seen:
+            continue
+        seen.add(i)
+
+        if z3.is_app(e):
+            decl = e.decl()
+            if decl.kind() == z3.Z3_OP_UNINTERPRETED:
+                variables.add(decl.get_id())
+            todo += e.children()
+
+        elif z3.is_quantifier(e):
+            todo.append(e.body())
+
+    return frozenset(variables)
+
+
+def constraints_to_smt2(constraints, ctx=None):
+    """Serializes z3 boolean expressions as an SMT-LIB2 benchmark.
+
+    Args:
+        constraints (list): z3 boolean expressions.
+        ctx (z3.Context, optional): Context the expressions live in.
+
+    Returns:
+        str: SMT-LIB2 text that constraints_from_smt2 turns back into the same list.
+    """
+    if ctx is None:
+        ctx = constraints[0].ctx if len(constraints) > 0 else z3.main_ctx()
+
+    # What z3.Solver.to_smt2 does, without paying for a solver
+    constraints = list(constraints) if len(constraints) > 0 else [z3.BoolVal(True, ctx=ctx)]
+    assumptions = (z3.Ast * (len(constraints) - 1))(*[c.as_ast() for c in constraints[:-1]])
+    return z3.Z3_benchmark_to_smtlib_string(ctx.ref(), "benchmark generated from python API", "", "unknown", "",
+                                            len(constraints) - 1, assumptions, constraints[-1].as_ast())
+
+def constraints_from_smt2(text, ctx=None):
+    """Inverse of constraints_to_smt2.
+
+    Returns:
+        list: z3 boolean expressions, in the order they were serialized.
+    """
+    return list(z3.parse_smt2_string(text, ctx=ctx))
+
+
+class ConstraintIndex:
+    """
+    Keeps track of which variables are used by which constraints in a state.
+
+    Everything is keyed on z3 AST ids, which are hash-consed, so no
+    expression ever has to be turned into a string. Copies share their maps
+    until one of them changes, at which point it makes its own.
+    """
+
+    __slots__ = ['__constraints', '__counts', '__shared']
+
+    def __init__(self, constraints=None, counts=None):
+        """
+        Args:
+            constraints (dict, optional): Constraint id -> constraint, for every constraint indexed.
+            counts (dict, optional): Variable id -> number of indexed constraints using it.
+        """
+        self.__constraints = {} if constraints is None else constraints
+        self.__counts = {} if counts is None else counts
+        self.__shared = constraints is not None
+
+    def __unshare(self):
+        if self.__shared:
+            self.__constraints = dict(self.__constraints)
+            self.__counts = dict(self.__counts)
+            self.__shared = False
+
+    def add(self, constraint):
+        """Index the given z3 constraint. Adding the same constraint again does nothing."""
+        if constraint.get_id() in self.__constraints:
+            return
+
+        self.__unshare()
+        self.__constraints[constraint.get_id()] = constraint
+
+        counts = self.__counts
+        for var in get_variables(constraint):
+            counts[var] = counts.get(var, 0) + 1
+
+    def remove(self, constraint):
+        """Stop indexing the given z3 constraint.
+
+        Returns:
+            bool: True if it was indexed.
+        """
+        if constraint.get_id() not in self.__constraints:
+            return False
+
+        self.__unshare()
+        del self.__constraints[constraint.get_id()]
+
+        counts = self.__counts
+        for var in get_variables(constraint):
+            counts[var] -= 1
+            if counts[var] == 0:
+                del counts[var]
+
+        return True
+
+    def __contains__(self, constraint):
+        return constraint.get_id() in self.__constraints
+
+    def __len__(self):
+        return len(self.__constraints)
+
+    def uses(self, var, ignore=()):
+        """Checks if any indexed constraint, other than those in ignore, uses the given variable.
+
+        Args:
+            var (z3.ExprRef): Variable to look for.
+            ignore (list, optional): z3 constraints to pretend aren't indexed.
+
+        Returns:
+            bool: True if var is used.
+        """
+        variables = get_variables(var)
+        count = sum(self.__counts.get(v, 0) for v in variables)
+
+        if count == 0:
+            return False
+
+        ignore = set(c.get_id() for c in ignore if z3.is_expr(c) and c.get_id() in self.__constraints and not variables.isdisjoint(get_variables(c)))
+
+        # Every indexed use of var is being ignored
+        if len(ignore) > 0 and count <= sum(len(variables & get_variables(self.__constraints[i])) for i in ignore):
+            return False
+
+        return True
+
+    def copy(self):
+        """Return a copy of this index. This is O(1) until one side changes."""
+        self.__shared = True
+        return ConstraintIndex(self.__constraints, self.__counts)
+
+    def __copy__(self):
+        return self.copy()
+
+    def __getstate__(self):
+        return constraints_to_smt2(list(self.__constraints.values()))
+
+    def __setstate__(self, state):
+        self.__init__()
+        for constraint in constraints_from_smt2(state):
+            self.add(constraint)
+
+
+def evaluate(model, expr):
+    """Evaluates expr in model, with model completion.
+
+    Completing pins the values it picks in the model itself, and models are
+    shared between solvers and the query cache. So it's only ever done on a
+    copy.
+
+    Args:
+        model (z3.ModelRef): Model to evaluate in. Not modified.
+        expr (z3.ExprRef): Expression to evaluate.
+
+    Returns:
+        z3.ExprRef: The value of expr.
+    """
+    return model.__copy__().eval(expr, model_completion=True)
+
+# Key -> trail node, for every node in this process that has been given a key
+_trail_nodes = weakref.WeakValueDictionary()
+
+def trail_node(key, state):
+    """Returns the trail node with the given key in this process, or a new one if there isn't one.
+
+    Args:
+        key (int): TrailNode.key of the node.
+        state (tuple): What TrailNode.__getstate__ returned for it. Only
+            used if the node isn't here yet.
+
+    Returns:
+        TrailNode: The node, without its parent if it's new.
+    """
+    node = _trail_nodes.get(key)
+
+    if node is None:
+        node = TrailNode.__new__(TrailNode)
+        node.__setstate__(state)
+        node.key = key
+
+    # Whatever the other process found out about it holds here too
+    elif node.sat is None:
+        node.sat = state[4]
+
+    return node
+
+def _assumptions(nodes):
+    """list: Tracking literals that are still in effect for the given nodes."""
+    literals = [node.literal for node in nodes if node.literal is not None]
+
+    if len(literals) == 0:
+        return literals
+
+    retracted = set(node.literal.get_id() for node in nodes if node.retract)
+    return [literal for literal in literals if literal.get_id() not in retracted]
+
+class TrailNode:
+    """
+    One immutable link in a constraint trail. Nodes are shared between the
+    trails of every state that descends from the state that created them.
+    """
+
+    __slots__ = ['constraints', 'parent', 'depth', 'literal', 'retract', 'sat', 'memo', '__variables', '__key', '__smt2', '__weakref__']
+
+    def __init__(self, constraints, parent=None, literal=None, retract=False):
+        """
+        Args:
+            constraints (tuple): z3 constraints added at this point in the trail.
+            parent (TrailNode, optional): Previous node in the trail.
+            literal (z3.BoolRef, optional): Tracking literal guarding a retractable constraint.
+            retract (bool, optional): If True, this node has no constraints and retracts literal instead.
+        """
+        self.constraints = constraints
+        self.parent = parent
+        self.literal = literal
+        self.retract = retract
+        self.depth = 1 if parent is None else parent.depth + 1
+        # Known satisfiability of the trail ending here. None if unknown.
+        self.sat = None
+        # Memo for Solver.is_fixed and Solver.is_sat_with, (kind, expression id) -> (expression, answer),
+        # and for Solver.fingerprint, 'fingerprint' -> frozenset
+        self.memo = None
+        self.__variables = None
+        self.__key = None
+        # Our constraints as SMT-LIB2, once we've been pickled
+        self.__smt2 = None
+
+    @property
+    def key(self):
+        """int: Identifies this node across processes. See trail_node."""
+        if self.__key is None:
+            self.key = ids.next_id()
+        return self.__key
+
+    @key.setter
+    def key(self, key):
+        self.__key = key
+        _trail_nodes[key] = self
+
+    @property
+    def variables(self):
+        """frozenset: Ids of the variables used by the constraints of this node."""
+        if self.__variables is None:
+            if self.retract:
+                self.__variables = get_variables(self.literal)
+            else:
+                self.__variables = frozenset().union(*[get_variables(c) for c in self.constraints])
+        return self.__variables
+
+    def __getstate__(self):
+        # Parents are linked back up by Solver. Pickling them here would recurse once per node.
+        if self.__smt2 is None:
+            constraints = list(self.constraints) + ([self.literal] if self.literal is not None else [])
+            self.__smt2 = constraints_to_smt2(constraints)
+
+        return (self.__smt2, self.literal is not None, self.retract, self.depth, self.sat)
+
+    def __setstate__(self, state):
+        text, has_literal, retract, depth, sat = state
+        constraints = constraints_from_smt2(text)
+
+        self.literal = constraints.pop() if has_literal else None
+        self.constraints = tuple(constraints)
+        self.retract = retract
+        self.depth = depth
+        self.sat = sat
+        self.parent = None
+        self.memo = None
+        self.__variables = None
+        self.__key = None
+        self.__smt2 = text
+
+    @property
+    def tracked(self):
+        """z3.BoolRef: The retractable constraint this node adds, or None if it isn't that kind of node."""
+        if self.literal is None or self.retract:
+            return None
+        return self.constraints[0].arg(1)
+
+    def __iter__(self):
+        """Iterate over the nodes in this trail, from the root to this node."""
+        nodes = []
+        node = self
+
+        while node is not None:
+            nodes.append(node)
+            node = node.parent
+
+        return reversed(nodes)
+
+
+class Partition:
+    """
+    Splits a trail into independent groups of nodes that share variables.
+    Partitions are treated as immutable once built. Extending one builds a
+    new Partition and leaves the original alone, so copies can share them.
+    """
+
+    __slots__ = ['trail', 'roots', 'members', 'ground']
+
+    def __init__(self, trail=None, roots=None, members=None, ground=None):
+        """
+        Args:
+            trail (TrailNode, optional): Last node covered by this partition.
+            roots (dict, optional): Union-find parent pointers between variable ids.
+            members (dict, optional): Root variable id to tuple of nodes in that group.
+            ground (tuple, optional): Nodes that have no variables at all.
+        """
+        self.trail = trail
+        self.roots = {} if roots is None else roots
+        self.members = {} if members is None else members
+        self.ground = () if ground is None else ground
+
+    def find(self, var):
+        """Returns the root variable id of the group var is in."""
+        roots = self.roots
+        root = var
+
+        while roots[root] != root:
+            root = roots[root]
+
+        # Path compression. Safe to do in place since it doesn't change the groups.
+        while roots[var] != root:
+            roots[var], var = root, roots[var]
+
+        return root
+
+    def extend(self, nodes):
+        """Returns a new Partition covering the given nodes in addition to ours."""
+        part = Partition(self.trail, dict(self.roots), dict(self.members), self.ground)
+
+        for node in nodes:
+            part.trail = node
+            variables = node.variables
+
+            if len(variables) == 0:
+                part.ground += (node,)
+                continue
+
+            members = (node,)
+            merged = set()
+
+            for var in variables:
+                if var not in part.roots:
+                    part.roots[var] = var
+                    continue
+
+                root = part.find(var)
+                if root not in merged:
+                    merged.add(root)
+                    members += part.members.pop(root)
+
+            root = next(iter(variables))
+            for var in variables:
+                part.roots[var] = root
+            for old_root in merged:
+                part.roots[old_root] = root
+
+            part.members[root] = members
+
+        return part
+
+    def slice(self, variables, extra=()):
+        """Returns the nodes needed to decide anything about the given variables.
+
+        Args:
+            variables (iterable): Variable ids of interest.
+            extra (list, optional): Nodes on the trail after this partition to take into account as well.
+
+        Returns:
+            list: TrailNodes in trail order.
+        """
+        roots = self.roots
+        keys = set(self.find(var) if var in roots else var for var in variables)
+        chosen = []
+        remaining = list(extra)
+
+        # Nodes that aren't in the partition yet may join groups together
+        changed = True
+        while changed:
+            changed = False
+
+            for node in list(remaining):
+                node_keys = set(self.find(var) if var in roots else var for var in node.variables)
+
+                if len(node_keys) == 0 or not keys.isdisjoint(node_keys):
+                    keys |= node_keys
+                    chosen.append(node)
+                    remaining.remove(node)
+                    changed = True
+
+        nodes = list(self.ground) + chosen
+        for key in keys:
+            nodes += self.members.get(key, ())
+
+        nodes.sort(key=lambda node: node.depth)
+        return nodes
+
+
+class QueryCache:
+    """
+    LRU cache of solver answers keyed on the set of constraints asked about.
+
+    Since z3 hash-conses its ASTs, two structurally equal constraints have the
+    same id for as long as either is alive. Entries hold on to their
+    constraints, so the ids in a key can't be reused while it is cached.
+
+    Besides exact matches, the cache reasons about subsets and supersets. If
+    any cached unsat query is a subset of the query, the query is unsat. If
+    any cached sat query is a superset of the query, the query is sat and
+    that query's model (if we have one) satisfies it as well.
+    """
+
+    __slots__ = ['size', 'entries', 'hits', 'misses', '__unsat_index', '__sat_index']
+
+    def __init__(self, size=None):
+        """
+        Args:
+            size (int, optional): Max number of queries to remember. Defaults to Config.PYSYM_QUERY_CACHE_SIZE.
+        """
+        self.size = Config.PYSYM_QUERY_CACHE_SIZE if size is None else size
+        # key -> [result, model, constraints]
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # constraint id -> set of keys. Unsat keys are indexed by their smallest id, sat keys by all of them.
+        self.__unsat_index = {}
+        self.__sat_index = {}
+
+    @staticmethod
+    def key(nodes):
+        """frozenset: Canonical key for the query made up of the given nodes."""
+        key = frozenset(c.get_id() for node in nodes for c in node.constraints)
+        assumptions = _assumptions(nodes)
+
+        if len(assumptions) > 0:
+            key |= frozenset(literal.get_id() for literal in assumptions)
+
+        return key
+
+    def __find(self, key):
+        """Returns the key of a cached entry that decides the given key, or None."""
+        if key in self.entries:
+            return key
+
+        # Any unsat subset makes us unsat
+        for i in key:
+            for other in self.__unsat_index.get(i, ()):
+                if other <= key:
+                    return other
+
+        # Any sat superset makes us sat
+        if len(key) > 0:
+            candidates = min((self.__sat_index.get(i, set()) for i in key), key=len)
+            for other in candidates:
+                if other >= key:
+                    return other
+
+        return None
+
+    def lookup(self, nodes, need_model=False):
+        """Look up the answer for the given nodes.
+
+        Args:
+            nodes (list): TrailNodes making up the query.
+            need_model (bool, optional): Only count sat entries that have a model as a hit.
+
+        Returns:
+            tuple: (result, model) where model may be None, or None if we don't know.
+        """
+        other = self.__find(self.key(nodes))
+
+        if other is None or (need_model and self.entries[other][1] is None and self.entries[other][0] == z3.sat):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(other)
+        result, model, _ = self.entries[other]
+        return result, model
+
+    def store(self, nodes, result, model=None):
+        """Remember the answer for the given nodes. Unknown answers are not cached."""
+        if result not in (z3.sat, z3.unsat) or self.size <= 0:
+            return
+
+        key = self.key(nodes)
+
+        if key in self.entries:
+            entry = self.entries[key]
+            entry[1] = entry[1] if model is None else model
+            self.entries.move_to_end(key)
+            return
+
+        self.entries[key] = [result, model, tuple(c for node in nodes for c in node.constraints) + tuple(_assumptions(nodes))]
+
+        if result == z3.unsat:
+            if len(key) > 0:
+                self.__unsat_index.setdefault(min(key), set()).add(key)
+        else:
+            for i in key:
+                self.__sat_index.setdefault(i, set()).add(key)
+
+        while len(self.entries) > self.size:
+            self.__evict()
+
+    def __evict(self):
+        key, (result, _, _) = self.entries.popitem(last=False)
+
+        if result == z3.unsat:
+            if len(key) > 0:
+                self.__discard(self.__unsat_index, min(key), key)
+        else:
+            for i in key:
+                self.__discard(self.__sat_index, i, key)
+
+    @staticmethod
+    def __discard(index, i, key):
+        keys = index[i]
+        keys.discard(key)
+        if len(keys) == 0:
+            del index[i]
+
+    def clear(self):
+        """Forget everything, including the hit and miss counts."""
+        self.entries.clear()
+        self.__unsat_index.clear()
+        self.__sat_index.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Seconds this process has spent waiting on z3 checks
+_solver_time = 0.0
+
+def solver_time():
+    """Returns the total time this process has spent in z3 checks.
+
+    Returns:
+        float: Seconds, summed over every IncrementalSolver.
+    """
+    return _solver_time
+
+def _fallback_solver(ctx=None):
+    """Generates the non-incremental tactic solver used when the incremental one gives up."""
+    return z3.OrElse('smt', z3.Then("simplify","propagate-ineqs","propagate-values","unit-subsume-simplify","smt","fail-if-undecided"),z3.Then("simplify","propagate-ineqs","propagate-values","unit-subsume-simplify","qfnra-nlsat"),ctx=ctx).solver()
+
+
+class IncrementalSolver:
+    """
+    The one z3 solver per context that all Solver objects in this process
+    check against. Each pushed scope corresponds to exactly one TrailNode.
+    """
+
+    __slots__ = ['ctx', 'solver', 'cache', 'asserted', '__last_result', '__last_model', '__fallback']
+
+    def __init__(self, ctx=None):
+        self.ctx = z3.main_ctx() if ctx is None else ctx
+        self.solver = z3.Solver(ctx=self.ctx)
+        self.cache = QueryCache()
+        # TrailNodes currently pushed onto the solver, in order
+        self.asserted = []
+        self.__last_result = None
+        self.__last_model = None
+        self.__fallback = None
+
+    def sync(self, nodes):
+        """Push and pop the z3 solver so that it holds exactly the given nodes.
+
+        Returns:
+            bool: True if the solver had to change.
+        """
+        asserted = self.asserted
+        common = 0
+
+        for have, want in zip(asserted, nodes):
+            if have is not want:
+                break
+            common += 1
+
+        if common == len(asserted) == len(nodes):
+            return False
+
+        # Nothing in common. Start over rather than dragging along what z3
+        # learned about unrelated constraints, which the string theory
+        # in particular gets slow with.
+        if common == 0 and len(asserted) > 0:
+            self.solver.reset()
+            del asserted[:]
+
+        if len(asserted) > common:
+            self.solver.pop(len(asserted) - common)
+            del asserted[common:]
+
+        for node in nodes[common:]:
+            self.solver.push()
+            self.solver.add(*node.constraints)
+            asserted.append(node)
+
+        return True
+
+    def check(self, nodes):
+        """Checks satisfiability of the given nodes, reusing earlier answers if we can."""
+
+        cached = self.cache.lookup(nodes)
+        if cached is not None:
+            return cached[0]
+
+        result = self.__check(nodes)
+        self.cache.store(nodes, result)
+        return result
+
+    def __check(self, nodes):
+        global _solver_time
+        start = time.perf_counter()
+
+        try:
+            return self.__solve(nodes)
+        finally:
+            _solver_time += time.perf_counter() - start
+
+    def __solve(self, nodes):
+        if not self.sync(nodes) and self.__last_result is not None:
+            return self.__last_result
+
+        assumptions = _assumptions(nodes)
+        self.__fallback = None
+        self.__last_model = None
+        self.__last_result = self.solver.check(*assumptions)
+
+        # The incremental core is weaker on things like non-linear arithmetic. Retry with the tactics.
+        if self.__last_result == z3.unknown:
+            logger.debug("check: incremental solver returned unknown ({0}). Falling back to tactic solver.".format(self.solver.reason_unknown()))
+            self.__fallback = _fallback_solver(ctx=self.ctx)
+            self.__fallback.add(*[c for node in self.asserted for c in node.constraints])
+            self.__fallback.add(*assumptions)
+            self.__last_result = self.__fallback.check()
+
+        return self.__last_result
+
+    def model(self, nodes):
+        """Returns a model for the given nodes. Raises if they are not sat."""
+
+        cached = self.cache.lookup(nodes, need_model=True)
+        if cached is not None and cached[1] is not None:
+            return cached[1]
+
+        if cached is not None or self.__check(nodes) != z3.sat:
+            raise z3.Z3Exception("model is not available")
+
+        if self.__last_model is None:
+            self.__last_model = self.__fallback.model() if self.__fallback is not None else self.solver.model()
+
+        self.cache.store(nodes, z3.sat, self.__last_model)
+        return self.__last_model
+
+
+# One incremental solver per z3 context. Each process gets its own copy of this.
+_backends = {}
+
+def get_backend(ctx=None):
+    """Returns the shared IncrementalSolver for the given z3 context."""
+    ctx = z3.main_ctx() if ctx is None else ctx
+
+    try:
+        return _backends[ctx]
+    except KeyError:
+        backend = _backends[ctx] = IncrementalSolver(ctx)
+        return backend
+
+def get_cache(ctx=None):
+    """Returns the QueryCache for the given z3 context. Look at its hits and misses to size it."""
+    return get_backend(ctx).cache
+
+
+class Solver:
+    """
+    Drop-in replacement for the z3 solver held by State. Holds the state's
+    constraint trail and checks it against the shared IncrementalSolver.
+    """
+
+    __slots__ = ['trail', 'ctx', '__scopes', '__partition', '__model', '__model_trail', '__model_owned', '__tracked', '__weakref__']
+
+    def __init__(self, trail=None, ctx=None, partition=None, model=None, model_trail=None, tracked=None):
+        """
+        Args:
+            trail (TrailNode, optional): Constraint trail to start from. Defaults to no constraints.
+            ctx (z3.Context, optional): z3 context for this solver. Defaults to the main context.
+            partition (Partition, optional): Independence partition of some prefix of trail. Do not set manually.
+            model (z3.ModelRef, optional): Model satisfying the trail up to model_trail. Do not set manually.
+            model_trail (TrailNode, optional): Node of the trail that model is known to satisfy.
+            tracked (dict, optional): Constraint id -> tracking literal for the retractable constraints in effect. Not modified in place.
+        """
+        self.trail = trail
+        self.ctx = z3.main_ctx() if ctx is None else ctx
+        self.__scopes = []
+        self.__partition = Partition() if partition is None else partition
+        self.__model = model
+        self.__model_trail = model_trail
+        # Models are shared between copies until one of them needs to change theirs
+        self.__model_owned = False
+        self.__tracked = {} if tracked is None else tracked
+
+    def add(self, *constraints, retractable=False, sat=None):
+        """Add constraints to this solver. Accepts the same arguments as z3.Solver.add.
+
+        Args:
+            retractable (bool, optional): If True, the constraints can later be
+                taken back out cheaply with remove.
+            sat (bool, optional): Set if the caller already knows whether the
+                solver is sat once these are added, so check doesn't ask again.
+        """
+        flat = []
+
+        for constraint in constraints:
+            if isinstance(constraint, (list, tuple, z3.AstVector)):
+                flat += [c for c in constraint]
+            else:
+                flat.append(constraint)
+
+        flat = tuple(z3.BoolVal(c, ctx=self.ctx) if type(c) is bool else c for c in flat)
+
+        if len(flat) == 0:
+            return
+
+        if not retractable:
+            self.trail = TrailNode(flat, self.trail)
+            self.trail.sat = sat
+            return
+
+        tracked = dict(self.__tracked)
+
+        for constraint in flat:
+            if constraint.get_id() in tracked:
+                continue
+
+            # Named from the process tagged id allocator, so literals made in different workers never clash
+            literal = z3.Bool("__pysym_track_{0}".format(ids.next_id()), ctx=self.ctx)
+            self.trail = TrailNode((z3.Implies(literal, constraint),), self.trail, literal=literal)
+            tracked[constraint.get_id()] = literal
+
+        self.__tracked = tracked
+
+    def remove(self, *constraints):
+        """Remove constraints from this solver.
+
+        Retractable constraints are dropped in O(1). Anything else means
+        rebuilding the trail without them.
+
+        Returns:
+            int: How many constraints were actually removed.
+        """
+        tracked = self.__tracked
+        removed = 0
+        rebuild = set()
+
+        for constraint in constraints:
+            if constraint.get_id() in tracked:
+                if tracked is self.__tracked:
+                    tracked = dict(tracked)
+
+                self.trail = TrailNode((), self.trail, literal=tracked.pop(constraint.get_id()), retract=True)
+                removed += 1
+
+            else:
+                rebuild.add(constraint.get_id())
+
+        self.__tracked = tracked
+
+        if len(rebuild) == 0 or self.trail is None:
+            return removed
+
+        # Start over with what's left
+        old = list(self.trail)
+        retracted = set(node.literal.get_id() for node in old if node.retract)
+        self.trail = None
+        self.__partition = Partition()
+        self.__model = None
+        self.__tracked = {}
+
+        for node in old:
+            if node.retract:
+                continue
+
+            tracked = node.tracked
+
+            if tracked is not None:
+                if node.literal.get_id() not in retracted:
+                    self.add(tracked, retractable=True)
+                continue
+
+            keep = [c for c in node.constraints if c.get_id() not in rebuild]
+            removed += len(node.constraints) - len(keep)
+            self.add(*keep)
+
+        return removed
+
+    def is_tracked(self, constraint):
+        """Checks if constraint is in effect as a retractable constraint. O(1).
+
+        This goes by the solver itself, so it stays right across push/pop,
+        copies and remove.
+        """
+        return constraint.get_id() in self.__tracked
+
+    def common(self, other):
+        """Splits this solver's and other's constraints at the point their trails part.
+
+        Args:
+            other (Solver): Solver whose trail shares some prefix with ours.
+
+        Returns:
+            tuple: (solver, mine, theirs) where solver holds only the shared
+            constraints, and mine and theirs are the constraints each of us
+            added since. None if either added retractable constraints since.
+        """
+        mine = self.trail
+        theirs = other.trail
+        mine_nodes = []
+        theirs_nodes = []
+
+        depth = lambda node: 0 if node is None else node.depth
+
+        while mine is not theirs:
+            if depth(mine) >= depth(theirs):
+                mine_nodes.append(mine)
+                mine = mine.parent
+            else:
+                theirs_nodes.append(theirs)
+                theirs = theirs.parent
+
+        # Retractable constraints are the only ones tracked, so without any since the split we track the same ones
+        if any(node.literal is not None for node in mine_nodes + theirs_nodes):
+            return None
+
+        flatten = lambda nodes: [c for node in reversed(nodes) for c in node.constraints]
+
+        return Solver(trail=mine, ctx=self.ctx, tracked=self.__tracked), flatten(mine_nodes), flatten(theirs_nodes)
+
+    def assertions(self):
+        """list: All constraints in effect in this solver, in the order they were added."""
+        if self.trail is None:
+            return []
+
+        nodes = list(self.trail)
+        retracted = set(node.literal.get_id() for node in nodes if node.retract)
+        assertions = []
+
+        for node in nodes:
+            if node.literal is None:
+                assertions += node.constraints
+            elif not node.retract and node.literal.get_id() not in retracted:
+                assertions.append(node.tracked)
+
+        return assertions
+
+    def fingerprint(self):
+        """frozenset: Ids of the constraints in effect, ignoring their order, repeats and trivially true ones.
+
+        z3 shares structurally equal expressions, so two solvers whose
+        constraints are the same up to order get the same fingerprint, even if
+        they were built separately. The ids are only meaningful while the
+        constraints are alive. For trails without retractable constraints the
+        answer is memoized on each trail node, so it's built incrementally.
+        """
+        if self.trail is None:
+            return frozenset()
+
+        # Walk back to the last node that knows its fingerprint
+        pending = []
+        node = self.trail
+
+        while node is not None and (node.memo is None or 'fingerprint' not in node.memo):
+            if node.literal is not None:
+                return frozenset(c.get_id() for c in self.assertions() if not z3.is_true(c))
+            pending.append(node)
+            node = node.parent
+
+        fingerprint = frozenset() if node is None else node.memo['fingerprint']
+
+        for node in reversed(pending):
+            fingerprint = fingerprint.union(c.get_id() for c in node.constraints if not z3.is_true(c))
+
+            if node.memo is None:
+                node.memo = {}
+            node.memo['fingerprint'] = fingerprint
+
+        return fingerprint
+
+    def push(self):
+        """Open a scope. Constraints added after this are dropped by the matching pop."""
+        self.__scopes.append((self.trail, self.__partition, self.__model, self.__model_trail, self.__tracked))
+        # Don't let anything done in the scope change the model we'll return to
+        self.__model_owned = False
+
+    def pop(self, num=1):
+        """Close the last num scopes."""
+        for _ in range(num):
+            self.trail, self.__partition, self.__model, self.__model_trail, self.__tracked = self.__scopes.pop()
+            self.__model_owned = False
+
+    def num_scopes(self):
+        return len(self.__scopes)
+
+    def __split(self):
+        """Returns (partition, nodes) where nodes are the trail nodes the partition doesn't cover yet."""
+        partition = self.__partition
+        depth = 0 if partition.trail is None else partition.trail.depth
+        extra = []
+        node = self.trail
+
+        while node is not None and node.depth > depth:
+            extra.append(node)
+            node = node.parent
+
+        # Partition is for some other trail. Start over.
+        if node is not partition.trail:
+            partition = self.__partition = Partition()
+            extra = list(self.trail) if self.trail is not None else []
+        else:
+            extra.reverse()
+
+        # Only move our partition forward outside of temporary scopes
+        if len(extra) > 0 and len(self.__scopes) == 0:
+            partition = self.__partition = partition.extend(extra)
+            extra = []
+
+        return partition, extra
+
+    def __model_path(self):
+        """Returns the trail nodes after the one our model is known to satisfy, or None if the model doesn't apply to this trail."""
+        if self.__model is None:
+            return None
+
+        target = self.__model_trail
+        nodes = []
+        node = self.trail
+
+        while node is not None and node.depth > target.depth:
+            nodes.append(node)
+            node = node.parent
+
+        if node is not target:
+            return None
+
+        nodes.reverse()
+        return nodes
+
+    def __own_model(self):
+        if not self.__model_owned:
+            self.__model = self.__model.__copy__()
+            self.__model_owned = True
+
+    def __define(self, constraint):
+        """Extends the model so that constraint holds, if it defines a variable the model has no value for yet.
+
+        Returns:
+            bool: True if the model now satisfies constraint.
+        """
+        if not z3.is_eq(constraint):
+            return False
+
+        model = self.__model
+
+        for var, value in ((constraint.arg(0), constraint.arg(1)), (constraint.arg(1), constraint.arg(0))):
+            if not z3.is_const(var) or var.decl().kind() != z3.Z3_OP_UNINTERPRETED or model.get_interp(var.decl()) is not None:
+                continue
+
+            self.__own_model()
+            model = self.__model
+
+            try:
+                model.update_value(var.decl(), model.eval(value, model_completion=True))
+            except z3.Z3Exception:
+                return False
+
+            return z3.is_true(model.eval(constraint, model_completion=True))
+
+        return False
+
+    def __satisfies(self, nodes):
+        """Checks if our model satisfies all constraints in nodes, extending it with new definitions as needed.
+
+        Evaluation uses model completion, which pins any variable it touches
+        in the model. That way, only variables no earlier constraint has
+        used can ever be defined, and the model stays valid for the trail it
+        was built for.
+        """
+        for node in nodes:
+
+            # The literal of a retracted constraint isn't used anywhere else, so we're free to turn it off.
+            # Tracked constraints need theirs on to mean anything.
+            if node.literal is not None and (node.retract or self.__model.get_interp(node.literal.decl()) is None):
+                self.__own_model()
+                self.__model.update_value(node.literal.decl(), z3.BoolVal(not node.retract, ctx=self.ctx))
+
+            for constraint in node.constraints:
+                if self.__define(constraint):
+                    continue
+
+                # Completing pins values in the model, so it has to be ours
+                self.__own_model()
+
+                if not z3.is_true(self.__model.eval(constraint, model_completion=True)):
+                    return False
+
+        return True
+
+    def __adopt(self, model, nodes):
+        """Use model as our model for the current trail, if it satisfies all of nodes.
+
+        If we already have a model, only the values of variables used in
+        nodes are taken from the new one.
+        """
+        if self.__model is None:
+            self.__model = model.__copy__()
+        else:
+            self.__own_model()
+            variables = frozenset().union(*[node.variables for node in nodes])
+
+            for decl in model.decls():
+                if decl.get_id() not in variables:
+                    continue
+                if decl.arity() != 0:
+                    self.__model = None
+                    return
+                self.__model.update_value(decl, model[decl])
+
+        self.__model_owned = True
+        self.__model_trail = self.trail
+
+        if not self.__satisfies(nodes):
+            self.__model = None
+
+    def check(self):
+        """Check if the constraints in this solver are satisfiable."""
+        trail = self.trail
+
+        if trail is None:
+            return z3.sat
+
+        # Find how much of the trail we already know about
+        new = []
+        node = trail
+        while node is not None and node.sat is None:
+            new.append(node)
+            node = node.parent
+
+        # Retracting can make an unsat trail sat again
+        retracts = [n.depth for n in new if n.retract]
+        if node is not None and node.sat is False and len(retracts) > 0:
+            node = None
+
+        path = self.__model_path() if len(new) > 0 else None
+
+        if node is not None and node.sat is False:
+            result = z3.unsat
+
+        elif len(new) == 0:
+            result = z3.sat
+
+        elif path is not None and self.__satisfies(path):
+            # Our last model still works
+            self.__model_trail = trail
+            result = z3.sat
+
+        elif node is None:
+            # Nothing known to be sat. Check it all.
+            nodes = list(trail)
+            result = get_backend(self.ctx).check(nodes)
+
+            if result == z3.sat:
+                self.__model = None
+                self.__adopt(get_backend(self.ctx).model(nodes), nodes)
+
+        else:
+            # Everything up to node is sat. Only the groups the new nodes touch can change that.
+            partition, extra = self.__split()
+            variables = frozenset().union(*[n.variables for n in new])
+            nodes = partition.slice(variables, extra)
+            result = get_backend(self.ctx).check(nodes)
+
+            # The other groups are independent of these, so our model is still good for them
+            if result == z3.sat and path is not None:
+                self.__adopt(get_backend(self.ctx).model(nodes), sorted(set(nodes + path), key=lambda n: n.depth))
+
+        if result == z3.sat:
+            # Trails that end before a retraction may still be unsat
+            depth = max(retracts) if len(retracts) > 0 else 0
+            for n in new:
+                if n.depth >= depth:
+                    n.sat = True
+        elif result == z3.unsat:
+            trail.sat = False
+
+        return result
+
+    def model(self, variables=None):
+        """Return a model for the constraints in this solver.
+
+        Args:
+            variables (list, optional): z3 variables the caller is interested in.
+                If given, only the constraints those variables depend on are
+                solved, and other variables may not be assigned in the model.
+                The caller should make sure the whole solver is sat first.
+        """
+        if self.trail is None:
+            return get_backend(self.ctx).model([])
+
+        if self.__model is not None and self.__model_trail is self.trail:
+            return self.__model
+
+        if variables is None:
+            return get_backend(self.ctx).model(list(self.trail))
+
+        ids = frozenset().union(*[get_variables(var) for var in variables])
+        partition, extra = self.__split()
+        return get_backend(self.ctx).model(partition.slice(ids, extra))
+
+    def is_fixed(self, expr):
+        """Checks if expr can only take one value. The solver must be sat.
+
+        Answers are memoized on the last trail node that expr depends on, so
+        they are shared with every state that has the same constraints on
+        expr, and are naturally invalidated by constraints that touch it.
+
+        Args:
+            expr (z3.ExprRef): Expression to check.
+
+        Returns:
+            bool: True if expr has exactly one possible value.
+        """
+        variables = get_variables(expr)
+
+        if len(variables) == 0:
+            return True
+
+        partition, extra = self.__split()
+        nodes = partition.slice(variables, extra)
+
+        if len(nodes) == 0:
+            return False
+
+        last = nodes[-1]
+        if last.memo is None:
+            last.memo = {}
+
+        try:
+            return last.memo['fixed', expr.get_id()][1]
+        except KeyError:
+            pass
+
+        value = evaluate(self.model(variables=[expr]), expr)
+        fixed = get_backend(self.ctx).check(nodes + [TrailNode((expr != value,), last)]) == z3.unsat
+
+        last.memo['fixed', expr.get_id()] = (expr, fixed)
+        return fixed
+
+    def is_sat_with(self, expr):
+        """Checks if expr can hold along with the constraints in this solver. The solver must be sat.
+
+        This is one query against only the constraints expr depends on. Like
+        is_fixed, the answer is memoized on the last trail node expr depends
+        on, so asking again before those constraints change is free.
+
+        Args:
+            expr (z3.BoolRef): Expression to check.
+
+        Returns:
+            bool: True if the constraints and expr are sat together.
+        """
+        partition, extra = self.__split()
+        nodes = partition.slice(get_variables(expr), extra)
+        last = nodes[-1] if len(nodes) > 0 else None
+
+        if last is not None:
+            if last.memo is None:
+                last.memo = {}
+
+            try:
+                return last.memo['sat', expr.get_id()][1]
+            except KeyError:
+                pass
+
+        # Our model may already say yes
+        sat = z3.is_true(evaluate(self.model(variables=[expr]), expr))
+
+        if not sat:
+            sat = get_backend(self.ctx).check(nodes + [TrailNode((expr,), last)]) == z3.sat
+
+        if last is not None:
+            last.memo['sat', expr.get_id()] = (expr, sat)
+
+        return sat
+
+    def translate(self, ctx):
+        """Returns a standalone z3 solver in the given context with these assertions."""
+        solver = _fallback_solver(ctx=ctx)
+        solver.add(*[c.translate(ctx) if ctx is not self.ctx else c for c in self.assertions()])
+        return solver
+
+    def copy(self):
+        """Return a copy of this solver. This is O(1) as the trail is shared."""
+        self.__model_owned = False
+        return Solver(trail=self.trail, ctx=self.ctx, partition=self.__partition, model=self.__model, model_trail=self.__model_trail, tracked=self.__tracked)
+
+    def __copy__(self):
+        return self.copy()
+
+    def __getstate__(self):
+        if len(self.__scopes) > 0:
+            err = "Cannot pickle a solver with {0} open scopes".format(len(self.__scopes))
+            logger.error(err)
+            raise Exception(err)
+
+        # Flattened so that pickling a long trail doesn't recurse. Nodes shared between solvers are only pickled once.
+        return list(self.trail) if self.trail is not None else []
+
+    def __setstate__(self, nodes):
+        parent = None
+
+        for node in nodes:
+            node.parent = parent
+            parent = node
+
+        self.__init__(trail=parent)
+
+        # Put back which constraints we can retract
+        tracked = {}
+        for node in nodes:
+            if node.retract:
+                tracked = {key: literal for key, literal in tracked.items() if not literal.eq(node.literal)}
+            elif node.literal is not None:
+                tracked[node.tracked.get_id()] = node.literal
+
+        self.__tracked = tracked
+
+    def __str__(self):
+        return str(self.assertions())
+
+    def __repr__(self):
+        return self.__str__()
@@ -0,0 +1,102 @@
+"""
+Persistent stacks for the call stack and backtrace of a State.
+
+Both used to be lists that every step copied (the call stack frame by frame),
+making each step O(depth + steps so far). They are now immutable linked lists.
+Pushing makes a new head that points at the old stack, so copying a State just
+shares its stacks with the parent and a step only adds one node.
+"""
+
+import logging
+
+logger = logging.getLogger("pyState:Stack")
+
+
+def _from_items(items):
+    """Rebuilds a Stack from its items, top first. Used for unpickling."""
+    stack = Stack()
+    for item in reversed(items):
+        stack = stack.push(item)
+    return stack
+
+
+class Stack:
+    """
+    Immutable linked list stack. Iterating goes from the top (the most
+    recently pushed item) down.
+    """
+
+    __slots__ = ['head', 'tail', '__len']
+
+    def __init__(self, head=None, tail=None):
+        """
+        Args:
+            head (object, optional): Item on top of the stack.
+            tail (Stack, optional): Rest of the stack. Without one, this is the empty stack.
+        """
+        self.head = head
+        self.tail = tail
+        self.__len = 0 if tail is None else len(tail) + 1
+
+    def push(self, item):
+        """Returns a new Stack with item on top of this one."""
+        return Stack(item, self)
+
+    def __len__(self):
+        return self.__len
+
+    def __iter__(self):
+        stack = self
+        while len(stack) > 0:
+            yield stack.head
+            stack = stack.tail
+
+    def __getitem__(self, index):
+        """Index into the stack. 0 is the top."""
+        if type(index) is not int:
+            err = "__getitem__: Unsupported index type {0}".format(type(index))
+            logger.error(err)
+            raise Exception(err)
+
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError("Stack index out of range")
+
+        stack = self
+        for _ in range(index):
+            stack = stack.tail
+        return stack.head
+
+    def __repr__(self):
+        return "Stack({0})".format(list(self))
+
+    def __reduce__(self):
+        # Pickle flat so that deep stacks don't hit the recursion limit
+        return (_from_items, (list(self),))
+
+
+class Frame:
+    """
+    One entry in the call stack. Holds what the State should go back to
+    running once its current path is done.
+    """
+
+    __slots__ = ['path', 'ctx', 'retID', 'loop']
+
+    def __init__(self, path, ctx, retID, loop):
+        """
+        Args:
+            path (tuple): Instructions left to run in this frame.
+            ctx (int): Context of this frame.
+            retID (int): Return ID of this frame.
+            loop (ast.AST): Loop this frame is in, if any.
+        """
+        self.path = tuple(path)
+        self.ctx = ctx
+        self.retID = retID
+        self.loop = loop
+
+    def __repr__(self):
+        return "<Frame ctx={0} retID={1} path={2} loop={3}>".format(self.ctx, self.retID, list(self.path), self.loop)
@@ -7,6 +7,9 @@ from ..pyObjectManager.Real import Real
 from ..pyObjectManager.BitVec import BitVec
 from ..pyObjectManager.List import List
 from ..pyObjectManager.String import String
+from ..pyObjectManager.Char import Char
+from ..pyObjectManager.SeqString import SeqString
+from ..pyObjectManager.Array import Array
 import itertools
 from copy import copy
 
@@ -14,9 +17,78 @@ logger = logging.getLogger("pyState:Subscript")
 
 from .. import Config
 
+def _indexSeqString(sub_object,sub_index):
+    """
+    Index into a SeqString. The index can be symbolic, since z3 can index
+    into the string itself. Python would raise IndexError for an out of range
+    index, so the index is constrained to be in range.
+    """
+    state = sub_object.state
+
+    # Static all the way through. Just do it.
+    if sub_object.value is not None and sub_index.isStatic():
+        return sub_object[sub_index.getValue()]
+
+    length = sub_object.length()
+    index = sub_index.getValue() if sub_index.isStatic() else sub_index.getZ3Object()
+
+    state.addConstraint(z3.And(index < length, index >= -length))
+
+    newString = state.getVar("tempSeqStringIndex",ctx=1,varType=SeqString)
+    newString.increment()
+    newString.setTo(z3.SubString(sub_object.getZ3Object(), z3.If(index < 0, length + index, index), 1))
+
+    return newString.copy()
+
+def _sliceSeqString(sub_object,lower,upper,step):
+    """
+    Slice a SeqString. Bounds can be out of range or negative, but not symbolic.
+    """
+    bounds = []
+
+    for bound in [lower, upper, step]:
+        if type(bound) not in [int, type(None)]:
+            if not bound.isStatic():
+                err = "_sliceSeqString: Don't know how to handle symbolic slice integers at the moment"
+                logger.error(err)
+                raise Exception(err)
+            bound = bound.getValue()
+        bounds.append(bound)
+
+    lower, upper, step = bounds
+
+    return sub_object[lower:upper:step]
+
+def _indexList(sub_object,sub_index):
+    """
+    Symbolic index into a List whose elements are all the same type. The
+    elements are put into a z3 Array and the index is a single Select,
+    instead of asking the solver about every index.
+    """
+    length = len(sub_object)
+    varType, kwargs = pyState.duplicateSort(sub_object[0])
+
+    elements = [var.getZ3Object() for var in sub_object]
+    array = z3.K(z3.IntSort(ctx=elements[0].ctx), elements[0])
+    for i in range(1, length):
+        array = z3.Store(array, i, elements[i])
+
+    # Python would raise IndexError for anything out of range
+    index = sub_index.getZ3Object() if type(sub_index) is not BitVec else z3.BV2Int(sub_index.getZ3Object())
+    in_range = z3.And(index >= -length, index < length)
+
+    # Create a dummy variable to return
+    tmpRetVar = sub_index.state.getVar("tmpSymbolicIndexVar",varType=varType,kwargs=kwargs,ctx=1,softFail=True)
+    # Make sure we're not clobbering something
+    tmpRetVar.increment()
+
+    tmpRetVar.state.addConstraint(z3.And(in_range, tmpRetVar.getZ3Object() == z3.Select(array, z3.If(index < 0, index + length, index))))
+
+    return tmpRetVar
+
 def _handleIndex(state,sub_object,sub_slice):
 
-    if type(sub_object) not in [List, String]:
+    if type(sub_object) not in [List, String, SeqString, Array]:
         err = "handleIndex: Don't know how to subscript type {0}".format(type(sub_object))
         logger.error(err)
         raise Exception(err)
@@ -37,6 +109,15 @@ def _handleIndex(state,sub_object,sub_slice):
 
     for sub_index in sub_indexs:
 
+        if type(sub_object) is SeqString:
+            ret.append(_indexSeqString(sub_object,sub_index))
+            continue
+
+        # Arrays take symbolic indexes directly
+        if type(sub_object) is Array:
+            ret.append(sub_object[sub_index])
+            continue
+
         # Example: array[1] -- 1 is static, or x = 1; array[x] -- x can only have 1 value
         if sub_index.isStatic():
             index = sub_index.getValue()
@@ -45,56 +126,12 @@ def _handleIndex(state,sub_object,sub_slice):
         # Truly symbolic index. Example: array[x] where x can be multiple values at that point
         else:
 
-            # Because Z3 needs to know var type, we can only offload this onto z3 if all the valid vars inside this list are of the same type!
-            varCount = 0
-            varAllSameType = False
-            oldVarType = None
-
-            # Loop through all values of list, check to see if they could be returned as well as their type
-            for i in range(len(sub_object)):
-                if sub_index.canBe(i):
-                    varCount += 1
-                    varType, kwargs = pyState.duplicateSort(sub_object[i])
-                    # If we might return different types of objects, we can't use this optimization
-                    if oldVarType != None and varType != oldVarType:
-                        break
-                    oldVarType = varType
-            else:
-                # If we get here, we must have all of the same types we can return
-                varAllSameType = True
-
-            # If we have nothing valid to return, just move on
-            if varCount == 0:
-                continue
-
-            # We can only use z3 this way if the types are all the same
-            if varAllSameType:
-    
-                # Create a dummy variable to return
-                tmpRetVar = sub_index.state.getVar("tmpSymbolicIndexVar",varType=varType,kwargs=kwargs,ctx=1,softFail=True)
-                # Make sure we're not clobbering something
-                tmpRetVar.increment()
-
-                # Hopefully we never hit this....
-                expr = z3.Bool(False)
-
-                # Build the z3 if then else statement in reverse
-                for i in range(len(sub_object)):
-                    # Can we be this value?
-                    if sub_index.canBe(i):
-                        # Add it to our z3 expression
-                        expr = z3.If(
-                                sub_index.getZ3Object() == i,
-                                tmpRetVar.getZ3Object() == sub_object[i].getZ3Object(),
-                                expr
-                            )
-
-                # Add the constraints we just generated
-                tmpRetVar.state.addConstraint(expr)
-
-                # Add our var to the return object list
-                ret.append(tmpRetVar)
+            # Because z3 needs to know the var type, we can only offload this onto z3 if all the vars
+            # inside this list are of the same type. That's just a look at the types, no solver needed.
+            sorts = [pyState.duplicateSort(var) for var in sub_object] if type(sub_object) is List else []
 
+            if len(sorts) > 0 and sorts[0][0] in [Int, Real, BitVec, Char] and all(sort == sorts[0] for sort in sorts):
+                ret.append(_indexList(sub_object,sub_index))
 
             # If we might return different variable types, we can't use Z3 directly, we need to state split. This sucks :-(
             else:
@@ -131,7 +168,7 @@ def _handleIndex(state,sub_object,sub_slice):
 
 def _handleSlice(state,sub_object,sub_slice):
 
-    if type(sub_object) not in [List, String]:
+    if type(sub_object) not in [List, String, SeqString]:
         err = "handleIndex: Don't know how to subscript type {0}".format(sub_object)
         logger.error(err)
         raise Exception(err)
@@ -169,6 +206,10 @@ def _handleSlice(state,sub_object,sub_slice):
 
     for upper,lower,step in itertools.product(uppers,lowers,steps):
 
+        if type(sub_object) is SeqString:
+            ret.append(_sliceSeqString(sub_object,lower,upper,step))
+            continue
+
         ##################
         # Lower Concrete #
         ##################
@@ -0,0 +1,105 @@
+"""
+Finding states that are redundant with another state.
+
+Two states at the same point in the program, with the same call stack and
+every variable bound to the same z3 expression, will do exactly the same
+thing from here on for any input both of them allow. So:
+
+- If their path conditions are the same set of constraints, they are
+  duplicates and one of them can be dropped. See fingerprint.
+- If one's path condition implies the other's, every input the first allows
+  is also allowed by the second, and the first can be dropped. Finding that
+  takes a solver query. See subsumes.
+"""
+
+import logging
+import z3
+from . import Merge
+from ..pyObjectManager.List import List
+from ..pyObjectManager.String import String
+from ..pyObjectManager.Array import Array
+
+logger = logging.getLogger("pyState:Subsumption")
+
+
+def _binding(obj):
+    if type(obj) in [List, String]:
+        return (type(obj), tuple(_binding(obj[i]) for i in range(len(obj))))
+
+    if type(obj) is Array:
+        return (Array, obj.length, obj.getZ3Object().get_id())
+
+    return (type(obj), obj.getZ3Object().get_id())
+
+def pointKey(state):
+    """
+    Returns a hashable summary of where state is in the program and what its
+    variables are bound to. States can only be duplicates of or subsume each
+    other if their point keys are equal. None if state can't be compared.
+
+    z3 expressions are summarized by their ids, so keys are only meaningful
+    while state is alive.
+    """
+    key = Merge.mergeKey(state)
+    if key is None:
+        return None
+
+    functions = tuple(sorted((name, id(function)) for name, function in state.functions.items()))
+
+    om = state.objectManager
+    bindings = []
+
+    for ctx in sorted(om.variables.keys()):
+        variables = om.getCtx(ctx)
+        bindings.append((ctx, tuple((name, _binding(variables[name])) for name in sorted(variables))))
+
+    return (key, functions, tuple(bindings))
+
+def fingerprint(state):
+    """
+    Returns a hashable fingerprint of state: its point key and the set of
+    constraints on it. States with the same fingerprint are duplicates. None
+    if state can't be compared.
+    """
+    key = pointKey(state)
+    if key is None:
+        return None
+
+    return (key, state.solver.fingerprint())
+
+def subsumes(state, other):
+    """
+    Checks if every input that reaches other also reaches state. Both must
+    have the same point key, in which case other can be dropped if this is
+    True.
+
+    Args:
+        state (pySym.pyState.State): The state that would be kept.
+        other (pySym.pyState.State): The state that would be dropped.
+
+    Returns:
+        bool: True if other's path condition implies state's. False if it
+        doesn't, or if the two can't be compared.
+    """
+    common = state.solver.common(other.solver)
+    if common is None:
+        return False
+
+    solver, mine, theirs = common
+
+    # Everything state asks for, other asks for too
+    if len(mine) == 0:
+        return True
+
+    solver.add(*theirs)
+
+    # Nothing reaches other
+    if solver.check() != z3.sat:
+        return True
+
+    subsumed = not solver.is_sat_with(z3.Not(z3.And(*mine)))
+
+    if subsumed:
+        logger.debug("subsumes: State at line {0} subsumes another".format(state.lineno()))
+
+    return subsumed
@@ -8,38 +8,48 @@ import pickle
 logger = logging.getLogger("pyState:While")
 
 def _handle(stateIf,stateElse,element,ifConstraint):
-    # Add the constraints
-    if type(ifConstraint) is not bool or ifConstraint != True:
-        stateIf.addConstraint(ifConstraint)
-    if type(ifConstraint) is not bool or ifConstraint == True:
-        stateElse.addConstraint(z3.Not(ifConstraint))
+    """stateIf or stateElse is None if that side of the loop test can't happen."""
+    ret_states = []
 
-    # Check if statement. We'll have at least one instruction here, so treat this as a call
-    # Saving off the current path so we can return to it and pick up at the next instruction
-    cs = copy(stateIf.path)
-    # Only push our stack if it's not empty
-    if len(cs) > 0:
-        stateIf.pushCallStack(path=cs)
+    # Add the constraints. The sides we got are already known to be sat.
+    if stateIf is not None:
+        if type(ifConstraint) is not bool:
+            stateIf.addConstraint(ifConstraint,sat=True)
 
-    # Our new path becomes the inside of the if statement
-    stateIf.path = element.body
+        # Check if statement. We'll have at least one instruction here, so treat this as a call
+        # Saving off the current path so we can return to it and pick up at the next instruction
+        cs = copy(stateIf.path)
+        # Only push our stack if it's not empty
+        if len(cs) > 0:
+            stateIf.pushCallStack(path=cs)
 
-    # If state should get a copy of the loop we're now in
-    stateIf.loop = copy(element)
+        # Our new path becomes the inside of the if statement
+        stateIf.path = element.body
 
-    # Update the else's path
-    # Check if there is an else path we need to take
-    #if len(element.orelse) > 0:
-    cs = copy(stateElse.path)
-    if len(cs) > 0:
-        stateElse.pushCallStack(path=cs)
+        # If state should get a copy of the loop we're now in
+        stateIf.loop = copy(element)
 
-    # else side should be done with the loop
-    stateElse.loop = None
+        ret_states.append(stateIf)
 
-    stateElse.path = element.orelse
+    if stateElse is not None:
+        if type(ifConstraint) is not bool:
+            stateElse.addConstraint(z3.Not(ifConstraint),sat=True)
 
-    return [stateIf, stateElse]
+        # Update the else's path
+        # Check if there is an else path we need to take
+        #if len(element.orelse) > 0:
+        cs = copy(stateElse.path)
+        if len(cs) > 0:
+            stateElse.pushCallStack(path=cs)
+
+        # else side should be done with the loop
+        stateElse.loop = None
+
+        stateElse.path = element.orelse
+
+        ret_states.append(stateElse)
+
+    return ret_states
 
 
 def handle(state,element):
@@ -97,8 +107,16 @@ def handle(state,element):
     stateIf.path.pop(0)
 
     # Loop through possible constraints
-    for constraint in ifConstraint:
-        
-        ret += _handle(stateIf.copy(),stateIf.copy(),element,constraint)
+    for i, constraint in enumerate(ifConstraint):
+
+        # Decide both sides before forking, and only fork the ones that can happen
+        takeIf, takeElse = stateIf.feasibleBranches(constraint)
+
+        # The last constraint can have the state itself instead of a copy
+        last = i == len(ifConstraint) - 1
+        stateElse = (stateIf.copy() if takeIf or not last else stateIf) if takeElse else None
+        stateBody = (stateIf if last else stateIf.copy()) if takeIf else None
+
+        ret += _handle(stateBody,stateElse,element,constraint)
 
     return ret
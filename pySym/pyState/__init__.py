@@ -16,6 +16,9 @@ from ..pyObjectManager.List import List
 from ..pyObjectManager.Ctx import Ctx
 from ..pyObjectManager.String import String
 from ..pyObjectManager.Char import Char
+from ..pyObjectManager.SeqString import SeqString, fromSeq
+from ..pyObjectManager.Array import Array
+from ..pyObjectManager import pickling
 from ..Project import Project
 
 # Override z3 __copy__ so i can just use "copy()"
@@ -68,6 +71,13 @@ class ReturnObject:
 
     def __copy__(self):
         return ReturnObject(self.retID)
+
+    def __getstate__(self):
+        # Same as copying, the state doesn't come along
+        return self.retID
+
+    def __setstate__(self, retID):
+        self.__init__(retID)
     
     def copy(self):
         """Copies ReturnObject into an identical instance
@@ -188,7 +198,7 @@ def duplicateSort(obj):
             return Int, {'value': obj.n}
         return Real, {'value': obj.n}
 
-    if type(obj) in [Int, Real, Char]:
+    if type(obj) in [Int, Real, Char, SeqString]:
         return type(obj), None
 
     if type(obj) is BitVec:
@@ -200,6 +210,9 @@ def duplicateSort(obj):
 
     if type(obj) is List:
         return type(obj), None
+
+    if type(obj) is Array:
+        return type(obj), {'length': obj.length, 'elementType': obj.elementType, 'size': obj.size}
     
     if type(obj) in [z3.IntNumRef,z3.RatNumRef,z3.ArithRef, z3.BitVecRef, z3.BitVecNumRef]:
         kind = obj.sort_kind()
@@ -224,6 +237,9 @@ def duplicateSort(obj):
 
     elif kind is z3.Z3_BV_SORT:
         return BitVec, {'size': obj.size()}
+
+    elif kind is z3.Z3_SEQ_SORT:
+        return SeqString, None
     
     else:
         err = "duplicateSort: unable to determine object sort '{0}'".format(obj)
@@ -299,13 +315,15 @@ class State:
             'path', 'ctx', 'objectManager', 'solver', '__vars_in_solver',
             'functions', 'simFunctions', 'retVar', 'callStack', 'backtrace',
             'retID', 'loop', 'maxRetID', 'maxCtx', '__weakref__', '__project',
+            'branched',
             ]
 
     def __init__(self,path=None,solver=None,ctx=None,functions=None,simFunctions=None,retVar=None,callStack=None,backtrace=None,retID=None,loop=None,maxRetID=None,maxCtx=None,objectManager=None,vars_in_solver=None,project=None):
         """
         (optional) path = list of sequential actions. Derived by ast.parse. Passed to state.
-        (optional) backtrace = list of asts that happened before the current one
-        (optional) vars_in_solver = dict of list of variable strings that are in the solver. Do not set this manually.
+        (optional) callStack = Stack.Stack of Stack.Frame to return to, innermost first
+        (optional) backtrace = Stack.Stack of asts that happened before the current one, most recent first
+        (optional) vars_in_solver = Solver.ConstraintIndex of the constraints in the solver. Do not set this manually.
         (optional) project = pySym project file associated with this group. This will be auto-filled.
         """
 
@@ -315,15 +333,17 @@ class State:
         self.objectManager = objectManager if objectManager is not None else ObjectManager(state=self)
         self.solver = self.__new_solver() if solver is None else solver
         #self.solver.set("timeout", 60000) # 1 minute (in miliseconds) timeout for the solver
-        self._vars_in_solver = vars_in_solver if vars_in_solver is not None else dict()
+        self._vars_in_solver = vars_in_solver if vars_in_solver is not None else Solver.ConstraintIndex()
         self.functions = {} if functions is None else functions
         self.simFunctions = {} if simFunctions is None else simFunctions
         self.retVar = self.getVar('ret',ctx=1,varType=Int) if retVar is None else retVar
-        self.callStack = [] if callStack is None else callStack
-        self.backtrace = [] if backtrace is None else backtrace
+        self.callStack = Stack.Stack() if callStack is None else callStack
+        self.backtrace = Stack.Stack() if backtrace is None else backtrace
         # Keep track of what our return ID is
         self.retID = retID
         self.loop = loop
+        # Did the step that made this state branch? See PathGroup.feasibility
+        self.branched = False
 
         # Keeps track of what retIDs and Ctxs have been used
         self.maxRetID = 0 if maxRetID is None else maxRetID
@@ -338,8 +358,8 @@ class State:
         _temporary_refs.add(self)
 
     def __new_solver(self):
-        """Generates a new solver."""
-        return z3.OrElse('smt', z3.Then("simplify","propagate-ineqs","propagate-values","unit-subsume-simplify","smt","fail-if-undecided"),z3.Then("simplify","propagate-ineqs","propagate-values","unit-subsume-simplify","qfnra-nlsat")).solver()
+        """Generates a new solver. See pyState.Solver for how these share work."""
+        return Solver.Solver()
 
 
     def setVar(self,varName,var,ctx=None):
@@ -367,13 +387,13 @@ class State:
         if type(var) is ReturnObject:
             return var
 
-        assert type(var) in [Int, Real, BitVec, List, String, Char], "Unexpected var type of {}".format(type(var))
+        assert type(var) in [Int, Real, BitVec, List, String, Char, SeqString, Array], "Unexpected var type of {}".format(type(var))
         assert type(varName) in [type(None), str], "Unexpected varName type of {}".format(type(varName))
 
         ctx = ctx if ctx is not None else 1
         varName = "tempRecursiveCopy" if varName is None else varName
         
-        if type(var) in [Int, Real, BitVec, Char]:
+        if type(var) in [Int, Real, BitVec, Char, SeqString, Array]:
             t, kwargs = duplicateSort(var)
             newVar = self.getVar(varName,ctx=ctx,varType=t,kwargs=kwargs)
             newVar.increment()
@@ -420,12 +440,12 @@ class State:
             return self.loop.body[0].lineno
         
         # Check up the call tree for instruction
-        for cs in self.callStack[::-1]:
-            if len(cs['path']) > 0:
-                return cs['path'][0].lineno
+        for frame in self.callStack:
+            if len(frame.path) > 0:
+                return frame.path[0].lineno
             # If we're returning to start the loop anew
-            if cs['loop']:
-                return cs['loop'].lineno
+            if frame.loop:
+                return frame.loop.lineno
         
         # Looks like we're done with the program
         return None
@@ -446,22 +466,6 @@ class State:
         if logger.getEffectiveLevel() == logging.DEBUG:
             logger.debug("step:\n\tpath = {0}\n\tcallStack = {1}\n\tctx = {2}\n\tretID = {3}\n\tsolver = {4}\n\tloop = {5}\n".format(self.path,self.callStack,self.ctx,self.retID,self.solver,self.loop))
 
-        # More cleanly resolve instructions
-        # TODO: Move this somewhere else... Moving it to the top of State introduced "include hell" :-(
-        instructions = {
-            ast.Assign: Assign,
-            ast.AugAssign: AugAssign,
-            ast.FunctionDef: FunctionDef,
-            ast.Expr: Expr,
-            ast.Pass: Pass,
-            ast.Return: Return,
-            ast.If: If,
-            ast.While: While,
-            ast.Break: Break,
-            ast.For: For,
-            ast.Assert: Assert,
-            }
-
         # Return initial return state
         state = self.copy()
         
@@ -482,23 +486,26 @@ class State:
             self._project._hooks[inst.lineno](state)
 
         # Generically handle any instruction we know about
-        if type(inst) in instructions:
-            ret_states = instructions[type(inst)].handle(state,inst)
+        if type(inst) in _instructions:
+            ret_states = _instructions[type(inst)].handle(state,inst)
 
         else:
             err = "step: Unhandled element of type {0} at Line {1} Col {2}".format(type(inst),inst.lineno,inst.col_offset)
             logger.error(err)
             raise Exception(err)
 
+        # Branch points are where paths can become impossible
+        branched = type(inst) in [ast.If, ast.While, ast.Assert] or len(ret_states) > 1
+
         # Move instruction to the done pile :-)
         for state in ret_states:
-            state.backtrace.insert(0,inst)
+            state.backtrace = state.backtrace.push(inst)
+            state.branched = branched
 
         # Assert we haven't changed
         assert h == hash(self)
 
-        # TODO: This will likely break if I implement multi-processing...
-        # Clean up any temporary references
+        # Clean up any temporary references. These are per process, so workers each have their own.
         _temporary_refs = set()
         
         # Return the paths
@@ -593,8 +600,8 @@ class State:
             #dest_arg = self.getVar(func.args.args[i].arg,varType=varType,kwargs=kwargs)
             #parent = self.objectManager.getParent(dest_arg)
             #index = parent.index(dest_arg)
-            self.objectManager.variables[self.ctx][func.args.args[i].arg] = self.recursiveCopy(caller_arg,varName=func.args.args[i].arg)
-            logger.debug("Call: Setting argument {0} = {1}".format(type(self.objectManager.variables[self.ctx][func.args.args[i].arg]),type(caller_arg)))
+            self.objectManager.getCtx(self.ctx)[func.args.args[i].arg] = self.recursiveCopy(caller_arg,varName=func.args.args[i].arg)
+            logger.debug("Call: Setting argument {0} = {1}".format(type(self.objectManager.getCtx(self.ctx)[func.args.args[i].arg]),type(caller_arg)))
 
         # Grab any unset vars
         unsetArgs = func.args.args[len(call.args):]
@@ -687,12 +694,12 @@ class State:
         Save the call stack with given variables
         Defaults to current variables if none given
         """
-        self.callStack.append({
-            'path': path if path is not None else self.path,
-            'ctx': ctx if ctx is not None else self.ctx,
-            'retID': retID if retID is not None else self.retID,
-            'loop': loop if loop is not None else self.loop,
-        })
+        self.callStack = self.callStack.push(Stack.Frame(
+            path=path if path is not None else self.path,
+            ctx=ctx if ctx is not None else self.ctx,
+            retID=retID if retID is not None else self.retID,
+            loop=loop if loop is not None else self.loop,
+        ))
 
     def popCallStack(self):
         """
@@ -708,36 +715,17 @@ class State:
         if len(self.callStack) == 0:
             return False
 
-        # Pop the callStack back on to the run queue
-        cs = self.callStack.pop()
-        self.path = cs["path"]
-        self.ctx = cs["ctx"]
-        self.retID = cs["retID"]
-        self.loop = cs["loop"]
+        # Pop the callStack back on to the run queue. Frames are shared with
+        # other states, so take our own copies of what we'll be changing.
+        frame = self.callStack.head
+        self.callStack = self.callStack.tail
+        self.path = list(frame.path)
+        self.ctx = frame.ctx
+        self.retID = frame.retID
+        self.loop = copy(frame.loop)
         
         return True
 
-    def copyCallStack(self):
-        """
-        Make a copy of the call stack, avoiding deepcopy
-        Returns a copy of the current call stack
-        """
-        # TODO: Maybe make CallStack an Object/Class??
-
-        ret = []
-
-        # Loop through, copying each call stack
-        for c in self.callStack:
-            ret.append({
-                'path': copy(c['path']),
-                'ctx': c['ctx'],
-                'retID': c['retID'],
-                'loop': copy(c['loop'])
-            })
-
-        return ret
-        
-
     ########################
     # End Call Stack Stuff #
     ########################
@@ -1103,7 +1091,7 @@ class State:
         t = type(obj)
 
         # If the object is already resolved, just return it
-        if t in [Int, Real, BitVec, List, Ctx, String, Char]:
+        if t in [Int, Real, BitVec, List, Ctx, String, Char, SeqString, Array]:
             return [obj]
         
         if t == ast.Name:
@@ -1117,8 +1105,8 @@ class State:
                 return [var]
             
             # If we failed to resolve this variable, python will look upwards in the call tree
-            for call in self.callStack[::-1]:
-                var = self.getVar(obj.id,ctx=call['ctx'],varType=varType,kwargs=kwargs,softFail=True)
+            for frame in self.callStack:
+                var = self.getVar(obj.id,ctx=frame.ctx,varType=varType,kwargs=kwargs,softFail=True)
                 
                 # Did we find it in this context?
                 if var is not None:
@@ -1244,43 +1232,28 @@ class State:
         if type(constraints) not in [list, tuple]:
             constraints = [constraints]
 
-        new_constraints = [assertion for assertion in self.solver.assertions() if assertion not in constraints]
-
-        # If we have less, then we successfully removed at least one thing
-        ret_code = len(self.solver.assertions()) - len(new_constraints)
+        solver = self.solver
+        constraints = [constraint for constraint in constraints if type(constraint) is not bool and (constraint in self._vars_in_solver or solver.is_tracked(constraint))]
 
-        # Removing is costly. Don't rebuild solver if we don't have to.
-        if ret_code == 0:
+        if constraints == []:
             return 0
 
-        self.solver = self.__new_solver()
-        self.addConstraint(*new_constraints)
+        # Cheap for retractable constraints. Otherwise the solver has to rebuild itself.
+        ret_code = self.solver.remove(*constraints)
 
-        # Remove the vars from our set tracker
+        # Remove them from our index
         for constraint in constraints:
-            if type(constraint) is bool:
-                continue
-
-            for var in set(get_all(constraint)):
-                if type(var) not in [z3.z3.IntNumRef, z3.z3.BitVecNumRef]:
-                    var = str(var)
-
-                    if var in self._vars_in_solver:
-                        try:
-                            self._vars_in_solver[var].remove(str(constraint))
-                            if self._vars_in_solver[var] == set():
-                                self._vars_in_solver.pop(var)
-                        except KeyError:
-                            # Ignoring attempt to remove constraint that isn't tracked.
-                            pass
+            self._vars_in_solver.remove(constraint)
 
         return ret_code
 
 
-    def addConstraint(self,*constraints):
+    def addConstraint(self,*constraints,retractable=False,sat=None):
         """
         Input:
             constraints = Any number of z3 expressions to use as a constraint
+            (optional) retractable = True if these will likely be removed later with remove_constraints. Makes removing them cheap.
+            (optional) sat = True/False if it's already known whether this state is sat with these constraints added
         Action:
             Add constraint given
         Returns:
@@ -1299,7 +1272,7 @@ class State:
             return constraints
 
         # Add our new constraint to the solver
-        self.solver.add(*constraints)
+        self.solver.add(*constraints,retractable=retractable,sat=sat)
 
         # Record that they are now in the solver somewhere
         for constraint in constraints:
@@ -1307,17 +1280,7 @@ class State:
             if type(constraint) is bool:
                 continue
 
-            for var in set(get_all(constraint)):
-
-                # Don't keep track of plain numbers. Only vars
-                if type(var) not in [z3.z3.IntNumRef, z3.z3.BitVecNumRef]:
-                    var = str(var)
-
-                    # Init the dict if need be
-                    if var not in self._vars_in_solver:
-                        self._vars_in_solver[var] = set()
-                        
-                    self._vars_in_solver[var].add(str(constraint))
+            self._vars_in_solver.add(constraint)
 
 
     def isSat(self,extra_constraints=None):
@@ -1343,29 +1306,41 @@ class State:
         # Deal with extra constraints
         #
 
-        # Determine if we can push and pop
-        try:
-            solver.push()
-            pushed = True
-        except:
-            pushed = False
+        if solver.check() != z3.sat:
+            return False
 
-        # Prefer push/pop
-        if pushed:
-            # Add in the constraints
-            solver.add(*extra_constraints)
-            ret = solver.check() == z3.sat
-            # Pop off the constraints
-            solver.pop()
-            return ret
+        # Python bools can be answered right here
+        if all(type(constraint) is bool for constraint in extra_constraints):
+            return all(extra_constraints)
 
-        # Use translate method
-        else:
-            solver = solver.translate(solver.ctx)
-            solver.add(*extra_constraints)
-            return solver.check() == z3.sat
+        # One query for all of them, against just the constraints they touch
+        return solver.is_sat_with(z3.And(*extra_constraints))
         
 
+    def feasibleBranches(self,constraint):
+        """
+        Input:
+            constraint = z3 constraint or python bool to branch on
+        Action:
+            Decide which sides of a branch on constraint are possible from this
+            state, before forking it
+        Returns:
+            tuple (bool, bool) of whether constraint and Not(constraint) can hold
+        """
+        if type(constraint) is bool:
+            return constraint, not constraint
+
+        solver = self.solver
+
+        if solver.check() != z3.sat:
+            return False, False
+
+        # We're sat, so at least one side has to be
+        if not solver.is_sat_with(constraint):
+            return False, True
+
+        return True, solver.is_sat_with(z3.Not(constraint))
+
     def printVars(self):
         """
         Input:
@@ -1407,7 +1382,7 @@ class State:
             # No valid ints
             return None
 
-        if type(var) is not List:
+        if type(var) not in [List, Array]:
             # Make sure the variable exists
             try:
                 self.getVar(var,ctx=ctx)
@@ -1420,6 +1395,9 @@ class State:
         else:
             listObject = var
  
+        if type(listObject) is Array:
+            return self.__any_array(listObject)
+
         if type(listObject) is not List:
             logger.warning("any_list: var '{0}' not of type List".format(var))
             return None
@@ -1435,7 +1413,7 @@ class State:
                 out.append(self.any_list(elm,ctx=ctx))
             elif type(elm) is Char:
                 out.append(self.any_char(elm,ctx=ctx))
-            elif type(elm) is String:
+            elif type(elm) in [String, SeqString]:
                 out.append(self.any_str(elm,ctx=ctx))
             else:
                 err = "any_list: unable to resolve object '{0}'".format(elm)
@@ -1444,6 +1422,29 @@ class State:
         
         return out
 
+    def __any_array(self,array):
+        """
+        Input:
+            array = Array object
+        Action:
+            Resolve a possible value for every element in one model
+        Return:
+            list of the values
+        """
+        m = self.solver.model(variables=[array.getZ3Object()])
+
+        out = []
+
+        for i in range(len(array)):
+            value = Solver.evaluate(m, array._select(i))
+
+            if array.elementType is Real:
+                out.append(float(value.as_decimal(10).replace('?','')) if type(value) is z3.AlgebraicNumRef else float(eval(value.as_string())))
+            else:
+                out.append(value.as_long())
+
+        return out
+
     def any_n_int(self,var,n,ctx=None):
         """
         Input:
@@ -1499,6 +1500,9 @@ class State:
         except:
             pushed = False
 
+        # Anything indexed inside the scope (Char bounds, say) goes away with it
+        index = copy(self._vars_in_solver)
+
         s = self
         varZ3Object = s.getVar(var,ctx=ctx).getZ3Object() if type(var) is str else var.getZ3Object()
         out = []
@@ -1524,6 +1528,7 @@ class State:
                 solver.add(varZ3Object != myInt)
 
             solver.pop()
+            self._vars_in_solver = index
 
         #
         # Fall back to other method TODO: Update this to use translate instead.
@@ -1549,6 +1554,34 @@ class State:
 
         return out
 
+    def is_fixed(self,var,ctx=None):
+        """
+        Input:
+            var = variable name. i.e.: "x" --or-- ObjectManager object (i.e.: Int)
+            (optional) ctx = context if not current one
+        Action:
+            Determine if this variable can only be one value. This is a single
+            solver query, and the answer is remembered until new constraints
+            touch the variable.
+        Return:
+            True if var has exactly one possible value, False otherwise
+            (including if the state is not sat)
+        """
+        # Grab appropriate ctx
+        ctx = ctx if ctx is not None else self.ctx
+
+        if not self.isSat():
+            logger.debug("is_fixed: No valid model found")
+            return False
+
+        if type(var) is str and self.getVar(var,ctx=ctx) == None:
+            logger.debug("is_fixed: var '{0}' not in known variables".format(var))
+            return False
+
+        varZ3Object = self.getVar(var,ctx=ctx).getZ3Object() if type(var) is str else var.getZ3Object()
+
+        return self.solver.is_fixed(varZ3Object)
+
     def any_n_real(self,var,n,ctx=None):
         """
         Input:
@@ -1582,7 +1615,7 @@ class State:
                 break
 
             out.append(myInt)
-            s.addConstraint(varZ3Object != s.solver.model().eval(varZ3Object))
+            s.addConstraint(varZ3Object != s.solver.model(variables=[varZ3Object]).eval(varZ3Object))
 
         return out
 
@@ -1650,9 +1683,6 @@ class State:
             logger.debug("any_char: No valid model found")
             return None
 
-        # Get model
-        m = self.solver.model()
-
         # Return a possible string
         #return chr(m.eval(var.getZ3Object(),model_completion=True).as_long())
         return chr(int(var))
@@ -1668,7 +1698,7 @@ class State:
         Return:
             Discovered variable or None if none found
         """
-        assert type(var) in [str, String]
+        assert type(var) in [str, String, SeqString]
 
         # Grab appropriate ctx
         ctx = ctx if ctx is not None else self.ctx
@@ -1678,9 +1708,6 @@ class State:
             logger.debug("any_str: No valid model found")
             return None
 
-        # Get model
-        m = self.solver.model()
-
         # Check if we have it in our variable
         if type(var) is str and self.getVar(var,ctx=ctx) == None:
             logger.debug("any_str: var '{0}' not in known variables".format(var))
@@ -1689,9 +1716,21 @@ class State:
 
         # Resolve the variable
         var = self.getVar(var,ctx=ctx) if type(var) is str else var
+
+        if type(var) is SeqString:
+            if var.value is not None:
+                return var.value
+            string = var.getZ3Object()
+            m = self.solver.model(variables=[string])
+            return fromSeq(Solver.evaluate(m, string))
+
+        chars = [c.getZ3Object() for c in var]
+
+        # Get model. Only need to solve for the constraints these chars depend on.
+        m = self.solver.model(variables=chars)
         
         # Return a possible string
-        return ''.join([chr(m.eval(c.getZ3Object(),model_completion=True).as_long()) for c in var])
+        return ''.join([chr(Solver.evaluate(m, c).as_long()) for c in chars])
         
 
 
@@ -1715,6 +1754,13 @@ class State:
             # No valid ints
             return None
 
+        # Check if we have it in our localVars
+        if type(var) is str and self.getVar(var,ctx=ctx) == None:
+            logger.debug("any_int: var '{0}' not in known variables".format(var))
+            return None
+
+        var = self.getVar(var,ctx=ctx).getZ3Object() if type(var) is str else var.getZ3Object()
+
         # If we're adding temporary constraints, create a temporary solver
         if extra_constraints is not None:
             # Normalize it to a tuple if need be
@@ -1740,23 +1786,18 @@ class State:
                     solver.pop()
                 return None
 
-            m = solver.model()
-
             if pushed:
+                m = solver.model(variables=[var])
                 solver.pop()
+            else:
+                m = solver.model()
         
         else:
-            m = self.solver.model()
-        
-        # Check if we have it in our localVars
-        if type(var) is str and self.getVar(var,ctx=ctx) == None:
-            logger.debug("any_int: var '{0}' not in known variables".format(var))
-            return None
-
-        var = self.getVar(var,ctx=ctx).getZ3Object() if type(var) is str else var.getZ3Object()
+            # Only need to solve for the constraints this var depends on
+            m = self.solver.model(variables=[var])
         
         # Try getting the value
-        value = m.eval(var,model_completion=True)
+        value = Solver.evaluate(m, var)
         
         # Check if we have a known solution
         # Assuming local for now
@@ -1820,9 +1861,6 @@ class State:
             # No valid ints
             return None
 
-        # Get model
-        m = self.solver.model()
-
         if type(var) is str:
             try:
                 self.getVar(var,ctx=ctx)
@@ -1832,8 +1870,11 @@ class State:
         
         var = self.getVar(var,ctx=ctx).getZ3Object() if type(var) is str else var.getZ3Object()
 
+        # Get model
+        m = self.solver.model(variables=[var])
+
         # Try getting the value
-        value = m.eval(var,model_completion=True)
+        value = Solver.evaluate(m, var)
 
         # Check if we have a known solution
         # Assuming local for now
@@ -1858,26 +1899,15 @@ class State:
     def var_in_solver(self, var, ignore=None):
         """Checks if the variable given is in the z3 solver."""
         assert z3Helpers.isZ3Object(var), "Expected var to be z3 object, got type {} instead".format(type(var))
-        var = str(var)
-        
-        # No constraints for this var
-        if var not in self._vars_in_solver or self._vars_in_solver[var] is set():
-            return False
 
-        # If we're ignoring, do the filter
-        if ignore is not None:
+        # Standardize ignore
+        if ignore is None:
+            ignore = []
 
-            # Standardize ignore
-            if type(ignore) not in [list, tuple]:
-                ignore = [ignore]
+        elif type(ignore) not in [list, tuple]:
+            ignore = [ignore]
 
-            ignore = [str(i) for i in ignore]
-            constraints = set([constraint for constraint in self._vars_in_solver[var] if constraint not in ignore])
-
-        else:
-            constraints = self._vars_in_solver[var]
-
-        return constraints != set()
+        return self._vars_in_solver.uses(var, ignore=ignore)
 
     def copy(self):
         """
@@ -1899,16 +1929,18 @@ class State:
             functions=self.functions,
             simFunctions=self.simFunctions,
             retVar=self.retVar,
-            callStack=self.copyCallStack(),
-            path=[copy(x) for x in self.path],
-            backtrace=copy(self.backtrace),
+            callStack=self.callStack,
+            # Handlers only rewrite the instruction they're stepping, so only
+            # that one needs its own copy. The rest of the ast is shared.
+            path=[copy(self.path[0])] + self.path[1:] if len(self.path) > 0 else [],
+            backtrace=self.backtrace,
             retID=copy(self.retID),
-            loop=copy(self.loop),
+            # Loops get copied when they're stepped again, see step
+            loop=self.loop,
             maxRetID=self.maxRetID,
             maxCtx=self.maxCtx,
             objectManager=self.objectManager.copy(),
-            #vars_in_solver=deepcopy(self._vars_in_solver),
-            vars_in_solver={key:copy(self._vars_in_solver[key]) for key in self._vars_in_solver.keys()},
+            vars_in_solver=copy(self._vars_in_solver),
             project=self._project
             )
 
@@ -1920,18 +1952,61 @@ class State:
     def __copy__(self):
         return self.copy()
 
+    def __getstate__(self):
+        """
+        States pickle everything except for the project, which whoever loads
+        them should set again. simFunctions are pickled by name.
+        """
+        state = {slot: getattr(self, slot) for slot in ['path', 'ctx', 'objectManager', 'solver', 'functions', 'retVar', 'callStack', 'backtrace', 'retID', 'loop', 'maxRetID', 'maxCtx']}
+        state['simFunctions'] = list(self.simFunctions)
+
+        # The index is nearly always just what's in the solver. Then it's rebuilt from the solver instead.
+        index = self._vars_in_solver
+        assertions = self.solver.assertions()
+        if len(index) == len(set(c.get_id() for c in assertions)) and all(c in index for c in assertions):
+            state['vars_in_solver'] = None
+        else:
+            state['vars_in_solver'] = index
+
+        return state
+
+    def __setstate__(self, state):
+        self._project = None
+        self.branched = False
+        index = state.pop('vars_in_solver')
+
+        if index is None:
+            index = Solver.ConstraintIndex()
+            for constraint in state['solver'].assertions():
+                index.add(constraint)
+
+        self._vars_in_solver = index
+        self.simFunctions = {name: importlib.import_module('pySym.pyState.functions.' + name) for name in state.pop('simFunctions')}
+
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
+        # Objects lost their weakrefs to us on the way
+        self.objectManager.state = self
+        pickling.relink(self.retVar, self)
+        for ctx in self.objectManager.variables.values():
+            pickling.relink(ctx, self)
+        for objs in self.objectManager.returnObjects.values():
+            for obj in objs:
+                pickling.relink(obj, self)
+
     ##############
     # Properties #
     ##############
 
     @property
     def _vars_in_solver(self):
-        """dict: Dict of sets of string representations of all the vars in the solver."""
+        """Solver.ConstraintIndex: Index of the vars used by the constraints in the solver."""
         return self.__vars_in_solver
 
     @_vars_in_solver.setter
     def _vars_in_solver(self, vars):
-        assert issubclass(type(vars), dict), "Unhandled _vars_in_solver type of {}".format(type(vars))
+        assert isinstance(vars, Solver.ConstraintIndex), "Unhandled _vars_in_solver type of {}".format(type(vars))
 
         self.__vars_in_solver = vars
 
@@ -1946,4 +2021,22 @@ class State:
         self.__project = project
         
 from . import BinOp, Pass, While, Break, Subscript, For, ListComp, UnaryOp, GeneratorExp, Assign, AugAssign, FunctionDef, Expr, Return, If, Assert
+
+# Handler for each ast statement type step knows about. Lives down here since
+# the handlers import us.
+_instructions = {
+    ast.Assign: Assign,
+    ast.AugAssign: AugAssign,
+    ast.FunctionDef: FunctionDef,
+    ast.Expr: Expr,
+    ast.Pass: Pass,
+    ast.Return: Return,
+    ast.If: If,
+    ast.While: While,
+    ast.Break: Break,
+    ast.For: For,
+    ast.Assert: Assert,
+    }
 from . import z3Helpers
+from . import Solver
+from . import Stack
@@ -0,0 +1,73 @@
+import logging
+import z3
+from ....pyObjectManager.Int import Int
+from ....pyObjectManager.Char import Char
+from ....pyObjectManager.String import String
+from ....pyObjectManager.SeqString import SeqString, toSeq
+from .... import pyState
+
+logger = logging.getLogger("pyState:SimFunction:SeqString.index")
+
+
+def handle(state,call,sub,start=None,end=None,ctx=None):
+    """
+    Determine location of a substring in a SeqString. Rather than trying
+    every position, this is a single z3 IndexOf.
+    """
+    ctx = ctx if ctx is not None else state.ctx
+
+    # The root (i.e.: "s" in s.index())
+    root = state.resolveObject(call.func.value,ctx=ctx)
+
+    assert len(root) == 1
+
+    root = root.pop()
+
+    assert type(root) is SeqString
+
+    # Resolve the vars
+    subs = state.resolveObject(sub,ctx=ctx)
+
+    # Resolve calls if we need to
+    retObjs = [x for x in subs if type(x) is pyState.ReturnObject]
+    if len(retObjs) > 0:
+        return retObjs
+
+    start = state.resolveObject(start,ctx=ctx).pop() if start is not None else None
+    end = state.resolveObject(end,ctx=ctx).pop() if end is not None else None
+
+    for bound in [start, end]:
+        if bound is not None and not bound.isStatic():
+            err = "handle: Don't know how to handle symbolic start or end"
+            logger.error(err)
+            raise Exception(err)
+
+    start = start.getValue() if start is not None else 0
+    end = end.getValue() if end is not None else None
+
+    ret = []
+
+    for sub in subs:
+
+        if type(sub) not in [String, Char, SeqString]:
+            err = "handle: Don't know how to find type {0}".format(type(sub))
+            logger.error(err)
+            raise Exception(err)
+
+        state = sub.state
+        length = root.length()
+
+        # Search in s[:end], starting at start, the same as python
+        haystack = root._slice(upper=end)
+        offset = start if start >= 0 else z3.If(length + start < 0, 0, length + start)
+
+        i = state.getVar('tempStrIndex',ctx=1,varType=Int)
+        i.increment()
+        i.setTo(z3.IndexOf(haystack, toSeq(sub,ctx=state.solver.ctx), offset))
+
+        # Python raises ValueError if it isn't there
+        state.addConstraint(i.getZ3Object() >= 0)
+
+        ret.append(i.copy())
+
+    return ret
@@ -0,0 +1,83 @@
+import logging
+import z3
+from ....pyObjectManager.List import List
+from ....pyObjectManager.Char import Char
+from ....pyObjectManager.String import String
+from ....pyObjectManager.SeqString import SeqString, toSeq
+from .... import pyState
+
+logger = logging.getLogger("pyState:SimFunction:SeqString.join")
+
+
+def join(root,elem):
+    """
+    Input:
+        root = String, Char or SeqString to join with
+        elem = List of String, Char or SeqString to join
+    Action:
+        Join elem with root as one z3 Concat
+    Returns:
+        SeqString of the joined strings
+    """
+    state = elem.state
+    parts = []
+
+    for item in elem:
+        if type(item) not in [String, Char, SeqString]:
+            err = "join: Don't know how to handle type {0}".format(type(item))
+            logger.error(err)
+            raise Exception(err)
+
+        parts += [item, root]
+
+    # No separator after the last one
+    parts = [toSeq(part,ctx=state.solver.ctx) for part in parts[:-1]]
+
+    newString = state.getVar('tempStrJoin',ctx=1,varType=SeqString)
+    newString.increment()
+
+    if len(parts) == 0:
+        newString.setTo("")
+    elif len(parts) == 1:
+        newString.setTo(parts[0])
+    else:
+        newString.setTo(z3.Concat(*parts))
+
+    return newString.copy()
+
+def handle(state,call,elem,ctx=None):
+    """
+    Simulate Python's join string method
+    """
+    ctx = ctx if ctx is not None else state.ctx
+
+    # The root (i.e.: "s" in s.join())
+    root = state.resolveObject(call.func.value,ctx=ctx)
+
+    assert len(root) == 1
+    root = root.pop()
+
+    assert type(root) is SeqString
+
+    # Resolve the elem
+    elems = state.resolveObject(elem,ctx=ctx)
+
+    elems = elems if type(elems) is list else [elems]
+
+    # If we're waiting on a symbolic call, return
+    retObjs = [x for x in elems if type(x) is pyState.ReturnObject]
+    if len(retObjs) > 0:
+        return retObjs
+
+    ret = []
+
+    for elem in elems:
+
+        if type(elem) is not List:
+            err = "handle: Don't know how to handle non-List join iterators"
+            logger.error(err)
+            raise Exception(err)
+
+        ret.append(join(root,elem))
+
+    return ret
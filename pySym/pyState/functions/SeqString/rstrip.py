@@ -0,0 +1,100 @@
+import logging
+import string
+import z3
+from ....pyObjectManager.Char import Char
+from ....pyObjectManager.String import String
+from ....pyObjectManager.SeqString import SeqString, toSeq
+from .... import pyState
+
+logger = logging.getLogger("pyState:SimFunction:SeqString.rstrip")
+
+
+def _rstrip(root,chars):
+    """
+    Input:
+        root = SeqString to strip
+        chars = str of characters to strip
+    Action:
+        Strip chars off the end of root. Rather than splitting on every
+        character, root is constrained to be the stripped string followed by
+        any number of chars, where the stripped string doesn't end in one.
+    Returns:
+        SeqString of the stripped string
+    """
+    state = root.state
+
+    newString = state.getVar('temprStripStr',ctx=1,varType=SeqString)
+    newString.increment()
+
+    # Don't clutter up z3!
+    if root.isStatic():
+        newString.setTo(root.getValue().rstrip(chars))
+        return newString.copy()
+
+    if len(chars) == 0:
+        newString.setTo(root)
+        return newString.copy()
+
+    ctx = state.solver.ctx
+    charset = z3.Union(*[z3.Re(toSeq(c,ctx=ctx)) for c in sorted(set(chars))])
+
+    stripped = newString.getZ3Object()
+
+    tail = state.getVar('temprStripTail',ctx=1,varType=SeqString)
+    tail.increment()
+    tail = tail.getZ3Object()
+
+    state.addConstraint(root.getZ3Object() == z3.Concat(stripped, tail))
+    state.addConstraint(z3.InRe(tail, z3.Star(charset)))
+    state.addConstraint(z3.Or(z3.Length(stripped) == 0, z3.Not(z3.InRe(z3.SubString(stripped, z3.Length(stripped) - 1, 1), charset))))
+
+    return newString.copy()
+
+def handle(state,call,chars=None,ctx=None):
+    """
+    Simulate Python's rstrip string method
+    """
+    ctx = ctx if ctx is not None else state.ctx
+
+    # The root (i.e.: "s" in s.rstrip())
+    roots = state.resolveObject(call.func.value,ctx=ctx)
+
+    charsOrig = chars
+
+    ret = []
+
+    for root in roots:
+
+        assert type(root) is SeqString
+
+        # Use the root item's state
+        state = root.state
+
+        # Resolve the chars. By default, python strips whitespace.
+        charsl = state.resolveObject(charsOrig,ctx=ctx) if charsOrig is not None else [string.whitespace]
+
+        # Resolve calls if we need to
+        retObjs = [x for x in charsl if type(x) is pyState.ReturnObject]
+        if len(retObjs) > 0:
+            return retObjs
+
+        for chars in charsl:
+
+            if type(chars) is not str:
+
+                # According to the docs, this should be String or None
+                if type(chars) not in [String, Char, SeqString]:
+                    err = "handle: Invalid argument type {0}".format(type(chars))
+                    logger.error(err)
+                    raise Exception(err)
+
+                if not chars.isStatic():
+                    err = "handle: Don't know how to handle symbolic chars"
+                    logger.error(err)
+                    raise Exception(err)
+
+                chars = chars.getValue()
+
+            ret.append(_rstrip(root,chars))
+
+    return ret
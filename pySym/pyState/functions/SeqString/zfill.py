@@ -0,0 +1,66 @@
+import logging
+import z3
+from ....pyObjectManager.SeqString import SeqString, toSeq
+from .... import pyState
+
+logger = logging.getLogger("pyState:SimFunction:SeqString.zfill")
+
+
+def handle(state,call,width,ctx=None):
+    """
+    Simulate Python's zfill string method
+    """
+    ctx = ctx if ctx is not None else state.ctx
+
+    # The root (i.e.: "s" in s.zfill())
+    root = state.resolveObject(call.func.value,ctx=ctx)
+
+    assert len(root) == 1
+    root = root.pop()
+
+    assert type(root) is SeqString
+
+    # Resolve the width
+    widths = state.resolveObject(width,ctx=ctx)
+
+    # Resolve calls if we need to
+    retObjs = [x for x in widths if type(x) is pyState.ReturnObject]
+    if len(retObjs) > 0:
+        return retObjs
+
+    ret = []
+
+    for width in widths:
+
+        # TODO: Add symbolic width capability
+        if not width.isStatic():
+            err = "handle: Don't know how to handle non static width"
+            logger.error(err)
+            raise Exception(err)
+
+        width = width.getValue()
+
+        # Get new str
+        newString = width.state.getVar('tempZfillStr',ctx=1,varType=SeqString) if hasattr(width,'state') else state.getVar('tempZfillStr',ctx=1,varType=SeqString)
+        newString.increment()
+
+        if root.isStatic():
+            newString.setTo(root.getValue().zfill(width))
+            ret.append(newString.copy())
+            continue
+
+        # Pad with "0"s up to width, after any sign. zfill will not truncate.
+        s = root.getZ3Object()
+        length = z3.Length(s)
+        ctx = state.solver.ctx
+        pad = z3.SubString(toSeq("0" * width,ctx=ctx), 0, width - length)
+        signed = z3.Or(z3.PrefixOf(toSeq("+",ctx=ctx), s), z3.PrefixOf(toSeq("-",ctx=ctx), s))
+
+        newString.setTo(z3.If(length >= width, s,
+            z3.If(signed,
+                z3.Concat(z3.SubString(s, 0, 1), pad, z3.SubString(s, 1, length - 1)),
+                z3.Concat(pad, s))))
+
+        ret.append(newString.copy())
+
+    return ret
@@ -5,6 +5,7 @@ from ....pyObjectManager.Real import Real
 from ....pyObjectManager.BitVec import BitVec
 from ....pyObjectManager.Char import Char
 from ....pyObjectManager.String import String
+from ....pyObjectManager.SeqString import SeqString
 import ast
 from .... import pyState
 
@@ -44,7 +45,11 @@ def handle(state,call,elem,ctx=None):
             logger.error(err)
             raise Exception(err)
 
-    
+        # Symbolic length items can't be flattened into Chars
+        if any(type(item) is SeqString for item in elem):
+            ret.append(SeqStringJoin.join(root,elem))
+            continue
+
         # Get new string
         newString = state.getVar('tempStrJoin',ctx=1,varType=String)
         newString.increment()
@@ -68,3 +73,4 @@ def handle(state,call,elem,ctx=None):
 
     return ret
 
+from ..SeqString import join as SeqStringJoin
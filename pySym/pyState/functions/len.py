@@ -1,4 +1,5 @@
 from ...pyObjectManager.Int import Int
+from ...pyObjectManager.SeqString import SeqString
 from ... import pyState
 
 def handle(state,call,obj,ctx=None):
@@ -24,8 +25,13 @@ def handle(state,call,obj,ctx=None):
     
     for obj in objs:
     
+        # SeqStrings can have symbolic length
+        if type(obj) is SeqString and obj.value is None:
+            l = obj.length()
+
         # Just calling the length function on the object..
-        l = len(obj)
+        else:
+            l = len(obj)
     
         i = state.getVar("tmpLenValue",ctx=1, varType=Int)
         i.increment()
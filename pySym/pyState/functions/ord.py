@@ -4,6 +4,7 @@ from ...pyObjectManager.BitVec import BitVec
 from ...pyObjectManager.String import String
 from ...pyObjectManager.List import List
 from ...pyObjectManager.Char import Char
+from ...pyObjectManager.SeqString import SeqString
 import logging
 from ... import pyState
 
@@ -33,7 +34,7 @@ def handle(state,call,obj,ctx=None):
     for obj in objs:
 
         # This is probably a script problem, not us
-        if (type(obj) not in [String, Char]) or (type(obj) is String and len(obj) != 1):
+        if (type(obj) not in [String, Char, SeqString]) or (type(obj) is String and len(obj) != 1):
             err = "handle: Invalid param for ord type {0}".format(type(obj))
             logger.error(err)
             raise Exception(err)
@@ -46,8 +47,16 @@ def handle(state,call,obj,ctx=None):
         if type(obj) is String:
             obj = obj[0]
 
+        if type(obj) is SeqString:
+            if obj.value is not None:
+                ret.setTo(ord(obj.value))
+            else:
+                # ord only takes one character
+                ret.state.addConstraint(obj.length() == 1)
+                ret.setTo(z3.StrToCode(obj.getZ3Object()))
+
         # Simple case, it's static
-        if obj.isStatic():
+        elif obj.isStatic():
             ret.setTo(ord(obj.getValue()))
 
         # If it's symbolic, we need help from z3
@@ -0,0 +1,90 @@
+import logging
+logger = logging.getLogger("pyState:functions:pyState:Array")
+
+import ast
+from ....pyObjectManager.Int import Int
+from ....pyObjectManager.Real import Real
+from ....pyObjectManager.BitVec import BitVec
+from ....pyObjectManager.Char import Char
+from ....pyObjectManager.List import List
+from ....pyObjectManager.Array import Array
+from .... import pyState
+
+def _elementType(l, size):
+    """Figure out what type of Array can hold everything in List l."""
+    if size is not None:
+        return BitVec, size
+
+    types = set(type(x) for x in l)
+
+    if not types.issubset([Int, Real, BitVec, Char]):
+        err = "_elementType: Array can't hold types {0}".format(types)
+        logger.error(err)
+        raise Exception(err)
+
+    if BitVec in types:
+        sizes = set(x.size for x in l if type(x) is BitVec)
+        if len(sizes) != 1 or types != {BitVec}:
+            err = "_elementType: Array needs all BitVecs to be the same size"
+            logger.error(err)
+            raise Exception(err)
+        return BitVec, sizes.pop()
+
+    if Real in types:
+        return Real, None
+
+    return Int, None
+
+def handle(state,call,value,size=None,ctx=None):
+    """
+    Returns an Array object. This is a List where every element is the same
+    type, kept in a single z3 Array. Indexing it, or assigning into it, with
+    a symbolic index doesn't split the state. Use it for lookup tables.
+        x = pyState.Array([1,2,3])       # Array holding these Ints
+        x = pyState.Array(16)            # 16 symbolic Ints
+        x = pyState.Array(16, 8)         # 16 symbolic 8-bit BitVecs
+    """
+    ctx = ctx if ctx is not None else state.ctx
+
+    assert type(size) in [ast.Num,int,type(None)]
+    size = size.n if type(size) is ast.Num else size
+
+    values = state.resolveObject(value,ctx=ctx)
+
+    # Resolve calls if we need to
+    retObjs = [x for x in values if type(x) is pyState.ReturnObject]
+    if len(retObjs) > 0:
+        return retObjs
+
+    ret = []
+
+    for value in values:
+        state = value.state
+
+        if type(value) is List:
+            elementType, elementSize = _elementType(value, size)
+            length = len(value)
+
+        elif type(value) is Int:
+            if not value.isStatic():
+                err = "handle: Don't know how to make an Array of symbolic length"
+                logger.error(err)
+                raise Exception(err)
+
+            elementType, elementSize = (BitVec, size) if size is not None else (Int, None)
+            length = value.getValue()
+
+        else:
+            err = "handle: Don't know how to make an Array from type {0}".format(type(value))
+            logger.error(err)
+            raise Exception(err)
+
+        array = state.getVar('tempArray',ctx=1,varType=Array,kwargs={'length': length, 'elementType': elementType, 'size': elementSize})
+        array.increment()
+
+        if type(value) is List:
+            array.setTo(value)
+
+        ret.append(array.copy())
+
+    return ret
@@ -1,20 +1,35 @@
-
 import z3
 import ast
 from ...z3Helpers import Z3_MAX_STRING_LENGTH
 from ....pyObjectManager.String import String
+from ....pyObjectManager.SeqString import SeqString
+from .... import Config
 
-def handle(state,call,length=ast.Num(Z3_MAX_STRING_LENGTH),ctx=None):
+def handle(state,call,length=None,ctx=None):
     """
     Returns a String object. This is helpful if we want to manually state what type a variable should be.
     Create a completely symbolic array of default max length:
         x = pyState.String()
+
+    With the "seq" string backend (see Project.string_backend), this is a
+    single z3 String. Without a length, its length is symbolic, up to the
+    default max length.
     """
     ctx = ctx if ctx is not None else state.ctx
 
-    assert type(length) in [ast.Num,int]
+    assert type(length) in [ast.Num,int,type(None)]
     length = length.n if type(length) is ast.Num else length
-    
+
+    backend = state._project.string_backend if state._project is not None else Config.PYSYM_STRING_BACKEND
+
+    if backend == "seq":
+        string = state.getVar('pyStateStringTemp',ctx=1,varType=SeqString)
+        string.increment()
+        string._add_bounds(length)
+        return [string.copy()]
+
+    length = Z3_MAX_STRING_LENGTH if length is None else length
+
     string = state.getVar('pyStateStringTemp',ctx=1,varType=String,kwargs={'length': length})
     string.increment()
 
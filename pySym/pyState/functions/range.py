@@ -58,7 +58,7 @@ def handle(state,call,a,b=None,c=None,ctx=None):
                 a = a.getValue()
 
             # Check if it's a variable that only has one possibility
-            elif type(a) in [Int, BitVec] and len(state.any_n_int(a,2)) == 1:
+            elif type(a) in [Int, BitVec] and state.is_fixed(a):
                 a = state.any_int(a)
 
             else:
@@ -75,7 +75,7 @@ def handle(state,call,a,b=None,c=None,ctx=None):
                 b = b.getValue()
 
             # Check if it's a variable that only has one possibility
-            elif type(b) in [Int, BitVec] and len(state.any_n_int(b,2)) == 1:
+            elif type(b) in [Int, BitVec] and state.is_fixed(b):
                 b = state.any_int(b)
     
             else:
@@ -93,7 +93,7 @@ def handle(state,call,a,b=None,c=None,ctx=None):
                 c = c.getValue()
     
             # Check if it's a variable that only has one possibility
-            elif type(c) in [Int, BitVec] and len(state.any_n_int(c,2)) == 1:
+            elif type(c) in [Int, BitVec] and state.is_fixed(c):
                 lower = state.any_int(c)
     
             else:
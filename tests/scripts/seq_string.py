@@ -0,0 +1,7 @@
+s = pyState.String()
+t = s + "abc"
+l = len(t)
+if s[1:3] == "hi":
+    x = 1
+else:
+    x = 2
@@ -34,14 +34,12 @@ def test_ifReturn():
     b = ast_parse.parse(testIfReturn).body
     p = Path(b,source=testIfReturn)
     p = p.step()[0].step()[0]
-    ifSide,elseSide = p.step()
+    # Else side isn't a possible path, so we only get the if side back
+    ifSide, = p.step()
     ifSide = ifSide.step()[0].step()[0]
-    elseSide = elseSide.step()[0].step()[0]
     
     assert ifSide.state.any_int('x') == 2
     assert ifSide.state.any_real('y') == 2.2
-    assert elseSide.state.any_int('x') == None
-    assert elseSide.state.any_real('y') == None # Else side is wonky because it's not a possible path
 
 
 def test_basicPathStep():
@@ -74,26 +72,21 @@ def test_simpleIf():
     p = p.step()[0]
     p = p.step()[0]
     p2 = p.step()
-    ifSide = p2[0]
-    elseSide = p2[1]
+
+    # If side isn't possible, so only the else side comes back
+    assert len(p2) == 1
+    elseSide = p2[0]
     
-    # ifSide's path should now be inside, meaning only the print statement
-    assert len(ifSide.state.path) == 1
     # Else should be in the else statement
     assert len(elseSide.state.path) == 2
     
-    # Neither have anything to do after the if statement
-    assert len(ifSide.state.callStack) == 1
+    # Nothing to do after the if statement
     assert len(elseSide.state.callStack) == 0
     
-    # If side should not be possible
-    assert not ifSide.state.isSat()
     assert elseSide.state.isSat()
     
     # Track expected number of assertions
-    #assert len(ifSide.state.solver.assertions()) == 3
     #assert len(elseSide.state.solver.assertions()) == 3
     
     # Make sure the answer makes sense
-    assert ifSide.state.any_int('x') == None
     assert elseSide.state.any_int('x') == 1
@@ -39,19 +39,19 @@ def test_pyObjectManager_uuid():
     s = pg.completed[0].state.copy()
     l = s.getVar('l')
     for elm in l:
-        assert type(elm.uuid) is bytes
-    assert type(l.uuid) is bytes
+        assert type(elm.uuid) is int
+    assert type(l.uuid) is int
 
     st = s.getVar('s')
-    assert type(st.uuid) is bytes
+    assert type(st.uuid) is int
     for elm in st:
-        assert type(elm.uuid) is bytes
+        assert type(elm.uuid) is int
     
     i = s.getVar('i')
-    assert type(i.uuid) is bytes
+    assert type(i.uuid) is int
 
     bvs = s.getVar('bvs')
-    assert type(bvs.uuid) is bytes
+    assert type(bvs.uuid) is int
 
 
 def test_pyObjectManager_getParent():
@@ -75,3 +75,36 @@ def test_pyObjectManager_getParent():
     assert pg.completed[0].state.objectManager.getParent(i) == q[2]
 
 
+
+def test_pyObjectManager_getParent_copy():
+    b = ast_parse.parse(test1).body
+    p = Path(b,source=test1)
+    pg = PathGroup(p)
+
+    pg.explore()
+    assert len(pg.completed) == 1
+
+    s = pg.completed[0].state
+    i = s.getVar('q')[2][0]
+
+    s2 = s.copy()
+    i2 = s2.getVar('q')[2][0]
+    assert i2.uuid == i.uuid
+
+    # Each state gets its own, current containers back
+    assert s2.objectManager.getParent(i2) is s2.getVar('q')[2]
+    assert s2.objectManager.getParent(i2).state is s2
+    assert s.objectManager.getParent(i) is s.getVar('q')[2]
+    assert s.objectManager.getParent(i).state is s
+    assert s.objectManager.getParent(s.getVar('q')) is s.objectManager.getCtx(s.ctx)
+
+def test_pyObjectManager_ids():
+    from pySym.pyObjectManager import ids
+
+    new = [ids.next_id() for _ in range(1000)]
+    assert len(set(new)) == 1000
+    assert new == sorted(new)
+
+    # A new process gets a new tag
+    ids.reset()
+    assert ids.next_id() not in new
@@ -0,0 +1,134 @@
+import sys, os
+myPath = os.path.dirname(os.path.abspath(__file__))
+
+import logging
+from pySym import Colorer
+logging.basicConfig(level=logging.DEBUG,format='%(name)s - %(levelname)s - %(message)s', datefmt='%m/%d/%Y %I:%M:%S %p')
+
+import pickle
+from pySym import ast_parse
+import z3
+from pySym.pyPath import Path
+from pySym.pyPathGroup import PathGroup
+import pytest
+from pySym.pyObjectManager.Int import Int
+from pySym.pyObjectManager.BitVec import BitVec
+from pySym.pyObjectManager.Array import Array
+
+test1 = """
+sbox = pyState.Array([5, 3, 7, 1, 9, 2])
+i = pyState.Int()
+x = sbox[i]
+sbox[i] = 100
+y = sbox[2]
+l = len(sbox)
+if sbox[-1] == 100:
+    z = 1
+else:
+    z = 0
+"""
+
+test2 = """
+a = pyState.Array(4, 8)
+b = a
+a[0] = 1
+c = a[0]
+d = b[0]
+"""
+
+test3 = """
+l = [10, 20, 30, 40]
+i = pyState.Int()
+x = l[i]
+"""
+
+test4 = """
+a = pyState.Array([1, 2, 3])
+y = a[3]
+"""
+
+def test_pyObjectManager_Array_symbolic_index():
+    b = ast_parse.parse(test1).body
+    p = Path(b,source=test1)
+    pg = PathGroup(p)
+
+    pg.explore()
+
+    # No splitting on the symbolic index
+    assert len(pg.completed) == 2
+
+    for p in pg.completed:
+        state = p.state
+        sbox = state.getVar('sbox')
+        x = state.getVar('x')
+        y = state.getVar('y')
+        i = state.getVar('i')
+
+        assert type(sbox) is Array
+        assert state.any_int('l') == 6
+
+        if state.any_int('z') == 1:
+            assert set(state.any_n_int(i, 10)) == set([5, -1])
+            assert x.mustBe(2)
+            assert y.mustBe(7)
+            continue
+
+        assert set(state.any_n_int(x, 10)) == set([5, 3, 7, 1, 9])
+        assert not i.canBe(6)
+        assert not i.canBe(-7)
+
+        x.setTo(7)
+        assert y.mustBe(100)
+        assert state.any_list(sbox) == [5, 3, 100, 1, 9, 2]
+
+        # Pickles with the state
+        state2 = pickle.loads(pickle.dumps(state))
+        assert state2.any_list('sbox') == [5, 3, 100, 1, 9, 2]
+
+def test_pyObjectManager_Array_BitVec():
+    b = ast_parse.parse(test2).body
+    p = Path(b,source=test2)
+    pg = PathGroup(p)
+
+    pg.explore()
+    assert len(pg.completed) == 1
+
+    state = pg.completed[0].state
+    a = state.getVar('a')
+    c = state.getVar('c')
+    d = state.getVar('d')
+
+    assert a.elementType is BitVec and a.size == 8
+    assert type(c) is BitVec
+    assert c.mustBe(1)
+    assert not d.isStatic()
+    assert state.any_list(a)[0] == 1
+    assert not a.isStatic()
+
+    d.setTo(200)
+    assert state.any_list('b')[0] == 200
+
+def test_pyObjectManager_Array_List_symbolic_index():
+    b = ast_parse.parse(test3).body
+    p = Path(b,source=test3)
+    pg = PathGroup(p)
+
+    pg.explore()
+    assert len(pg.completed) == 1
+
+    state = pg.completed[0].state
+    x = state.getVar('x')
+    i = state.getVar('i')
+
+    assert set(state.any_n_int(x, 10)) == set([10, 20, 30, 40])
+
+    x.setTo(40)
+    assert set(state.any_n_int(i, 10)) == set([3, -1])
+
+def test_pyObjectManager_Array_out_of_range():
+    b = ast_parse.parse(test4).body
+    p = Path(b,source=test4)
+    pg = PathGroup(p)
+
+    pg.explore()
+    assert len(pg.errored) == 1
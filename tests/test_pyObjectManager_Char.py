@@ -139,3 +139,29 @@ def test_pyObjectManager_Char_isStatic():
     
     assert not d.isStatic()
 
+
+test5 = """
+a = pyState.String(2)
+b = ord(a[1])
+z = 1
+"""
+
+def test_pyObjectManager_Char_bounds_kept():
+    b = ast_parse.parse(test5).body
+    pg = PathGroup(Path(b,source=test5))
+    pg.explore()
+    assert len(pg.completed) == 1
+
+    s = pg.completed[0].state
+    o = s.getVar('b')
+
+    # Bounds added inside any_n_int's scope go away with it. They must come back.
+    assert len(s.any_n_int('b',3)) == 3
+    assert not s.isSat([o.getZ3Object() > 255])
+
+    # Same once they're removed outright
+    c = s.getVar('a')[1]
+    bounds = z3.And(c.getZ3Object() <= 0xff, c.getZ3Object() >= 0)
+    s.remove_constraints(bounds)
+    assert not s.isSat([o.getZ3Object() > 255])
+    assert not s.isSat([c.getZ3Object() < 0])
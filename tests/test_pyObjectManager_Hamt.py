@@ -0,0 +1,121 @@
+import sys, os
+myPath = os.path.dirname(os.path.abspath(__file__))
+#sys.path.insert(0, myPath + '/../')
+
+import logging
+from pySym import Colorer
+logging.basicConfig(level=logging.DEBUG,format='%(name)s - %(levelname)s - %(message)s', datefmt='%m/%d/%Y %I:%M:%S %p')
+
+from pySym import ast_parse
+import pickle
+import pytest
+from pySym.pyPath import Path
+from pySym.pyPathGroup import PathGroup
+from pySym.pyObjectManager.Hamt import Hamt
+
+test1 = """
+x = 1
+y = 2
+z = 3
+"""
+
+
+class Collide:
+    """Keys that all land in the same bucket."""
+
+    def __init__(self, i):
+        self.i = i
+
+    def __hash__(self):
+        return 1337
+
+    def __eq__(self, other):
+        return isinstance(other, Collide) and other.i == self.i
+
+    def __repr__(self):
+        return "Collide({0})".format(self.i)
+
+
+def test_pyObjectManager_Hamt():
+    h = Hamt()
+    assert len(h) == 0
+    assert 'x' not in h
+
+    h1 = h.set('x', 1)
+    h2 = h1.set('y', 2)
+    h3 = h2.set('x', 3)
+
+    # Setting never changes the original
+    assert 'x' not in h
+    assert dict(h1.items()) == {'x': 1}
+    assert dict(h2.items()) == {'x': 1, 'y': 2}
+    assert dict(h3.items()) == {'x': 3, 'y': 2}
+    assert len(h3) == 2
+
+    with pytest.raises(KeyError):
+        h3['z']
+    assert h3.get('z', 5) == 5
+
+    h4 = h3.delete('x')
+    assert dict(h4.items()) == {'y': 2}
+    assert h3['x'] == 3
+    with pytest.raises(KeyError):
+        h4.delete('x')
+
+    # Enough keys for a few levels
+    d = {i: str(i) for i in range(5000)}
+    h = Hamt(d)
+    assert len(h) == 5000
+    assert dict(h.items()) == d
+    assert sorted(h) == sorted(d)
+
+    for i in range(0, 5000, 2):
+        h = h.delete(i)
+    assert len(h) == 2500
+    assert all(h[i] == str(i) for i in range(1, 5000, 2))
+    assert all(i not in h for i in range(0, 5000, 2))
+
+    h = pickle.loads(pickle.dumps(h))
+    assert len(h) == 2500
+    assert h[4999] == '4999'
+
+
+def test_pyObjectManager_Hamt_collisions():
+    h = Hamt()
+    for i in range(5):
+        h = h.set(Collide(i), i)
+    h = h.set(Collide(2), 20).set('x', 'x')
+
+    assert len(h) == 6
+    assert h[Collide(2)] == 20
+    assert h['x'] == 'x'
+
+    h = h.delete(Collide(0)).delete(Collide(1)).delete(Collide(2)).delete(Collide(3))
+    assert dict(h.items()) == {Collide(4): 4, 'x': 'x'}
+    assert len(h.delete(Collide(4)).delete('x')) == 0
+
+
+def test_pyObjectManager_Hamt_state_copy():
+    b = ast_parse.parse(test1).body
+    p = Path(b,source=test1)
+    pg = PathGroup(p)
+
+    pg.explore()
+    assert len(pg.completed) == 1
+
+    s = pg.completed[0].state
+    s2 = s.copy()
+
+    # Copying shares the variables until one side writes
+    assert s2.objectManager.variables is s.objectManager.variables
+
+    x = s2.getVar('x')
+    x.increment()
+    x.setTo(5)
+
+    assert s2.objectManager.variables is not s.objectManager.variables
+    assert s.getVar('y').state is s
+    assert s2.getVar('y').state is s2
+    assert s.getVar('x').getValue() == 1
+    assert s2.getVar('x').getValue() == 5
+    assert s.getVar('y') is not s2.getVar('y')
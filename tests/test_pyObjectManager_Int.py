@@ -138,3 +138,35 @@ def test_pyObjectManager_Int_isStatic():
     assert x.getValue() == 1
 
 
+
+def test_pyObjectManager_Int_getZ3Object_interned():
+    b = ast_parse.parse(test2).body
+    p = Path(b,source=test2)
+    pg = PathGroup(p)
+
+    pg.explore()
+    assert len(pg.completed) == 1
+
+    s = pg.completed[0].state.copy()
+    x = s.getVar('x')
+    y = s.getVar('y')
+
+    # Same version of the variable gives the same z3 object, even from a copy
+    z3_x = x.getZ3Object()
+    assert x.getZ3Object() is z3_x
+    assert x.copy().getZ3Object() is z3_x
+    assert y.getZ3Object() is y.copy().getZ3Object()
+    assert y.getZ3Object().as_long() == 5
+
+    # Incrementing gives a new one
+    x.increment()
+    assert x.getZ3Object() is not z3_x
+    assert not x.getZ3Object().eq(z3_x)
+
+    # Clones resolve straight to the end of the chain
+    a = Int('a',0,state=s)
+    b = Int('b',0,state=s)
+    c = Int('c',0,state=s)
+    b._clone = c
+    a._clone = b
+    assert a.getZ3Object() is c.getZ3Object()
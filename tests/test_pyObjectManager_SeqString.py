@@ -0,0 +1,144 @@
+import sys, os
+myPath = os.path.dirname(os.path.abspath(__file__))
+
+import logging
+from pySym import Colorer
+logging.basicConfig(level=logging.DEBUG,format='%(name)s - %(levelname)s - %(message)s', datefmt='%m/%d/%Y %I:%M:%S %p')
+
+import pickle
+from pySym import ast_parse
+from pySym import Config
+import z3
+from pySym.pyPath import Path
+from pySym.pyPathGroup import PathGroup
+import pytest
+from pySym.pyObjectManager.Int import Int
+from pySym.pyObjectManager.SeqString import SeqString
+import pySym
+
+test1 = """
+s = pyState.String(5)
+t = s + "abc"
+u = t * 2
+c = ord(s[1])
+"""
+
+test2 = """
+s = pyState.String()
+i = s.index("test")
+j = "-".join([s, "x"])
+r = s.rstrip("ab")
+z = s.zfill(6)
+"""
+
+test3 = """
+s = pyState.String(4)
+s2 = s.rstrip()
+if s > "m":
+    x = 1
+else:
+    x = 2
+"""
+
+@pytest.fixture
+def seq_backend(monkeypatch):
+    monkeypatch.setattr(Config, "PYSYM_STRING_BACKEND", "seq")
+
+def test_pyObjectManager_SeqString_project():
+    proj = pySym.Project(os.path.join(myPath, "scripts", "seq_string.py"), string_backend="seq")
+    pg = proj.factory.path_group()
+    pg.explore()
+
+    assert len(pg.completed) == 2
+
+    for p in pg.completed:
+        s = p.state.getVar('s')
+        l = p.state.getVar('l')
+        x = p.state.getVar('x')
+
+        assert type(s) is SeqString
+        # Length is symbolic
+        assert not l.isStatic()
+        assert l.canBe(3 + 12)
+
+        if x.getValue() == 1:
+            assert s.getValue()[1:3] == "hi"
+            assert not l.canBe(3)
+        else:
+            assert s.getValue()[1:3] != "hi"
+            assert l.canBe(3)
+
+    with pytest.raises(AssertionError):
+        pySym.Project(os.path.join(myPath, "scripts", "seq_string.py"), string_backend="blerg").string_backend
+
+def test_pyObjectManager_SeqString_basic(seq_backend):
+    b = ast_parse.parse(test1).body
+    p = Path(b,source=test1)
+    pg = PathGroup(p)
+
+    pg.explore()
+    assert len(pg.completed) == 1
+
+    state = pg.completed[0].state
+    s = state.getVar('s')
+    t = state.getVar('t')
+    u = state.getVar('u')
+    c = state.getVar('c')
+
+    assert type(s) is SeqString
+    assert len(s) == 5
+    assert len(t) == 8
+    assert len(u) == 16
+    assert t.canBe(str(s) + "abc")
+    assert not t.canBe("abc")
+
+    c.setTo(ord('X'))
+    assert state.any_str(s)[1] == "X"
+    assert state.any_str(u)[1] == "X"
+    assert state.any_str(u)[5:11] == "abc" + state.any_str(s)[:3]
+
+    # Pickles with the state
+    state2 = pickle.loads(pickle.dumps(state))
+    assert state2.any_str('s')[1] == "X"
+
+def test_pyObjectManager_SeqString_functions(seq_backend):
+    b = ast_parse.parse(test2).body
+    p = Path(b,source=test2)
+    pg = PathGroup(p)
+
+    pg.explore()
+    assert len(pg.completed) == 1
+
+    state = pg.completed[0].state
+    s = state.getVar('s')
+    i = state.getVar('i')
+    j = state.getVar('j')
+    r = state.getVar('r')
+    z = state.getVar('z')
+
+    # index forces "test" to be in there
+    assert "test" in state.any_str(s)
+    assert i.canBe(0)
+    assert not i.canBe(-1)
+
+    i.setTo(2)
+    s_val = state.any_str(s)
+    assert s_val.index("test") == 2
+    assert state.any_str(j) == s_val + "-x"
+    assert state.any_str(r) == s_val.rstrip("ab")
+    assert state.any_str(z) == s_val.zfill(6)
+
+def test_pyObjectManager_SeqString_compare(seq_backend):
+    b = ast_parse.parse(test3).body
+    p = Path(b,source=test3)
+    pg = PathGroup(p)
+
+    pg.explore()
+    assert len(pg.completed) == 2
+
+    for p in pg.completed:
+        state = p.state
+        s = state.any_str('s')
+        assert len(s) == 4
+        assert state.any_str('s2') == s.rstrip()
+        assert (s > "m") == (state.any_int('x') == 1)
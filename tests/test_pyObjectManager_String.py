@@ -72,6 +72,15 @@ def test_pyObjectManager_String_canBe_mustBe_String():
     assert g.canBe(s)
     assert not g.mustBe(s)
     assert g.canBe(f)
+    assert s.mustBe(d)
+    assert not s.mustBe(f)
+
+    # Once every char is pinned down, g must be s
+    state = pg.completed[0].state
+    for c, v in zip(g, "abcd"):
+        state.addConstraint(c.getZ3Object() == ord(v))
+    assert g.mustBe(s)
+    assert not g.canBe(f)
 
 
 def test_pyObjectMAnager_String_mustBe():
@@ -127,3 +136,40 @@ def test_pyObjectManager_String_Assign():
     assert pg.completed[0].state.any_str('s') == "Test"
 
 
+
+test5 = """
+s = pyState.String(64)
+"""
+
+def test_pyObjectManager_String_copy_on_write():
+    b = ast_parse.parse(test5).body
+    p = Path(b,source=test5)
+    pg = PathGroup(p)
+
+    pg.explore()
+    assert len(pg.completed) == 1
+
+    state = pg.completed[0].state
+    s = state.getVar('s')
+
+    state2 = state.copy()
+    s2 = state2.getVar('s')
+
+    # Nothing copied until touched
+    assert s2._String__variables is s._String__variables
+
+    s2[3].setTo("A")
+    assert s2._String__variables is not s._String__variables
+    assert s2[3].mustBe("A")
+    assert not s[3].isStatic()
+    assert s2[4].state is state2
+    assert s[4].state is state
+
+    # Chars share their Int until set
+    c = s[5]
+    c2 = c.copy()
+    assert c2.variable is c.variable
+    c2.state = state2
+    c2.setTo("B")
+    assert c2.variable is not c.variable
+    assert not c.isStatic()
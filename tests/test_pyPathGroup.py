@@ -9,6 +9,9 @@ from pySym import ast_parse
 import z3
 from pySym.pyPath import Path
 from pySym.pyPathGroup import PathGroup
+from pySym import Serialize
+from pySym.pyState import Solver
+import pytest
 
 test1 = """
 def test2():
@@ -60,6 +63,22 @@ for c in s:
         q = 2
 """
 
+test6 = """
+x = pyState.Int()
+if x > 5:
+    y = 1
+else:
+    y = 2
+a = y + 1
+b = a * 2
+if x < 3:
+    z = 1
+else:
+    z = 2
+assert x > 6
+c = b + z
+"""
+
 def test_pyPathGroup_ignore_paths():
     b = ast_parse.parse(test4).body
     p = Path(b,source=test4)
@@ -83,7 +102,8 @@ def test_pyPathGroup_exploreFunctionCompare():
     assert len(pg.active) == 0
     assert len(pg.completed) == 0
     assert len(pg.errored) == 0
-    assert len(pg.deadended) == 1
+    # The else side can't happen, so it's never forked
+    assert len(pg.deadended) == 0
     assert len(pg.found) == 1
 
     assert pg.found[0].state.any_int('x') == 1
@@ -100,7 +120,8 @@ def test_pyPathGroup_exploreWithIf():
     assert len(pg.active) == 0
     assert len(pg.completed) == 0
     assert len(pg.errored) == 0
-    assert len(pg.deadended) == 2
+    # Both Ifs are concrete, so the sides that can't happen are never forked
+    assert len(pg.deadended) == 0
     assert len(pg.found) == 1
 
     assert pg.found[0].state.any_int('x') == 1337
@@ -139,3 +160,616 @@ def test_pyPath_stepThroughProgram():
     assert pg.completed[0].state.any_int('x') == 10
     assert pg.completed[0].state.any_int('z') == 1
 
+
+test5 = """
+x = pyState.Int()
+w = pyState.Int()
+s = pyState.String(2)
+l = [1,2,3]
+
+if x > 5:
+    y = 1
+else:
+    y = 2
+
+if w == 3:
+    l.append(y)
+
+s = s + "c"
+
+z = 1
+"""
+
+def test_pyPathGroup_workers():
+    b = ast_parse.parse(test5).body
+    p = Path(b,source=test5)
+    pg = PathGroup(p,workers=2)
+
+    pg.explore()
+
+    assert len(pg.completed) == 4
+    assert set([p.state.any_int('y') for p in pg.completed]) == set([1,2])
+    assert sorted([len(p.state.any_list('l')) for p in pg.completed]) == [3,3,4,4]
+
+    for p in pg.completed:
+        # Things that came back from the workers still work
+        x = p.state.getVar('x')
+        assert x.canBe(6) != x.canBe(5)
+        assert p.state.any_int('z') == 1
+        assert p.state.any_str('s')[-1] == "c"
+
+    # Same answers as stepping in process
+    b = ast_parse.parse(test5).body
+    pg2 = PathGroup(Path(b,source=test5))
+    pg2.explore()
+    assert str(pg2) == str(pg)
+
+
+test11 = """
+def f(a):
+    return a + 1
+
+x = pyState.Int()
+y = 0
+if x > 1:
+    y = 1
+else:
+    y = 2
+z = f(y)
+"""
+
+def test_pyPathGroup_workers_merge_prune():
+    b = ast_parse.parse(test11).body
+
+    # Paths come back from the workers with the same functions, so they can still be merged
+    pg = PathGroup(Path(b,source=test11),merge=True,workers=2)
+    pg.explore()
+    pg.close()
+    assert len(pg.completed) == 1
+    assert set(pg.completed[0].state.any_n_int('z', 10)) == set([2, 3])
+
+    def group(prune, workers):
+        p = Path(b,source=test11).step()[0].step()[0]
+        x = p.state.getVar('x').getZ3Object()
+
+        same = p.copy(state=p.state.copy())
+        more = p.copy(state=p.state.copy())
+        more.state.addConstraint(x > 5)
+
+        pg = PathGroup(prune=prune,workers=workers)
+        pg.active = [p, same, more]
+        pg.explore()
+        pg.close()
+        return pg
+
+    for prune in ["duplicates", "subsumption"]:
+        pg = group(prune, 2)
+        assert pg.pruned > 0
+        assert str(pg) == str(group(prune, 1))
+
+test12 = """
+x = pyState.Int()
+if x > 0:
+    y = 1
+else:
+    y = 2
+i = 0
+while i < 40:
+    i += 1
+    x = x + y
+"""
+
+def test_pyPathGroup_workers_long_loop(monkeypatch):
+    rendered = []
+    to_smt2 = Solver.constraints_to_smt2
+
+    def counting(constraints, ctx=None):
+        rendered.append(len(constraints))
+        return to_smt2(constraints, ctx=ctx)
+
+    monkeypatch.setattr(Solver, "constraints_to_smt2", counting)
+
+    b = ast_parse.parse(test12).body
+    pg = PathGroup(Path(b,source=test12),workers=2)
+    pg.explore()
+    pg.close()
+
+    pg2 = PathGroup(Path(b,source=test12))
+    pg2.explore()
+    assert str(pg) == str(pg2)
+    assert sorted(len(p.state.backtrace) for p in pg.completed) == sorted(len(p.state.backtrace) for p in pg2.completed)
+
+    # Constraints are rendered once per trail node, not once per node per step
+    nodes = set(node for p in pg.completed for node in p.state.solver.trail)
+    assert len(nodes) > 80
+    assert len(rendered) <= len(nodes)
+
+def test_pyPathGroup_save_load(tmpdir):
+    b = ast_parse.parse(test5).body
+    pg = PathGroup(Path(b,source=test5),search_strategy="depth")
+
+    for _ in range(6):
+        pg.step()
+
+    f = str(tmpdir.join("pg.pysym"))
+    pg.save(f)
+    pg2 = PathGroup.load(f)
+
+    assert str(pg2) == str(pg)
+    assert pg2.search_strategy == "depth"
+    assert [p.state.lineno() for p in pg2.active] == [p.state.lineno() for p in pg.active]
+
+    # Each AST node is only numbered once
+    table = Serialize.NodeTable.from_paths(pg.active)
+    assert len(table.nodes) == len(set(map(id, table.nodes)))
+    assert table.index[id(pg.active[0].state.path[0])] < len(table.nodes)
+
+    pg.explore()
+    pg2.explore()
+    assert str(pg2) == str(pg)
+    assert set([p.state.any_int('y') for p in pg2.completed]) == set([1,2])
+    assert sorted([len(p.state.any_list('l')) for p in pg2.completed]) == [3,3,4,4]
+
+    for p in pg2.completed:
+        assert p.state.any_str('s')[-1] == "c"
+
+
+def test_pyPathGroup_feasibility(monkeypatch):
+    from pySym.pyState import State
+
+    checks = []
+    isSat = State.isSat
+
+    def counting_isSat(self, *args, **kwargs):
+        if len(args) == 0 and len(kwargs) == 0:
+            checks.append(self)
+        return isSat(self, *args, **kwargs)
+
+    monkeypatch.setattr(State, "isSat", counting_isSat)
+
+    counts = {}
+    for feasibility in ["eager", "lazy", "completion"]:
+        del checks[:]
+        b = ast_parse.parse(test6).body
+        pg = PathGroup(Path(b,source=test6),feasibility=feasibility)
+        assert pg.feasibility == feasibility
+
+        pg.explore()
+
+        # x > 5 and x < 3 can't both happen, so that If never forks. The
+        # assert kills two more paths, however late we notice
+        assert len(pg.completed) == 1
+        assert len(pg.deadended) == 2
+        assert (pg.completed[0].state.any_int('y'), pg.completed[0].state.any_int('z')) == (1,2)
+        counts[feasibility] = len(checks)
+
+    assert counts["lazy"] < counts["eager"]
+    assert counts["completion"] < counts["lazy"]
+
+
+def test_pyPathGroup_search_strategy():
+    from pySym import SearchStrategy
+
+    answers = None
+    for strategy in sorted(SearchStrategy.strategies):
+        b = ast_parse.parse(test6).body
+        pg = PathGroup(Path(b,source=test6),search_strategy=strategy)
+        assert pg.search_strategy == strategy
+        assert type(pg.active) is SearchStrategy.strategies[strategy]
+
+        pg.explore()
+
+        # Order changes, what we find doesn't
+        got = (len(pg.completed), len(pg.deadended), sorted(p.state.any_int('z') for p in pg.completed))
+        assert answers is None or got == answers
+        answers = got
+
+    # Forks only picks a path that forked more once nothing else is left
+    class Recorder(SearchStrategy.Forks):
+        __slots__ = ['picked']
+
+        def __init__(self, paths=None):
+            self.picked = []
+            super(Recorder, self).__init__(paths)
+
+        def selected(self, path):
+            self.picked.append(path.forks)
+
+    b = ast_parse.parse(test6).body
+    pg = PathGroup(Path(b,source=test6),search_strategy=Recorder)
+    strategy = pg.active
+    pg.explore()
+    assert strategy.picked == sorted(strategy.picked)
+    assert strategy.picked[-1] == 2
+
+    # Switching strategy keeps the active paths
+    b = ast_parse.parse(test6).body
+    pg = PathGroup(Path(b,source=test6))
+    while len(pg.active) < 2:
+        pg.step()
+    active = list(pg.active)
+    pg.search_strategy = "depth"
+    assert type(pg.active) is SearchStrategy.Depth
+    assert list(pg.active) == active
+
+    with pytest.raises(Exception):
+        pg.search_strategy = "nope"
+
+    with pytest.raises(Exception):
+        pg.search_strategy = int
+
+
+def test_pyPathGroup_SearchStrategy_heap():
+    from pySym import SearchStrategy
+    import random
+
+    class Weighted(SearchStrategy.SearchStrategy):
+        __slots__ = []
+
+        def priority(self, path):
+            return path.forks
+
+    paths = []
+    for _ in range(200):
+        p = Path()
+        p.forks = random.randint(0,10)
+        paths.append(p)
+
+    s = Weighted(paths)
+    assert len(s) == 200
+    assert list(s) == paths
+    assert s[0] is paths[0]
+
+    removed = paths[::3]
+    for p in removed:
+        s.remove(p)
+    assert paths[0] not in s
+    assert paths[1] in s
+
+    with pytest.raises(ValueError):
+        s.remove(paths[0])
+
+    with pytest.raises(Exception):
+        s.append(paths[1])
+
+    # Lowest priority first, ties in the order they were added
+    left = [p for p in paths if p not in removed]
+    popped = [s.pop() for _ in range(len(s))]
+    assert popped == sorted(left, key=lambda p: (p.forks, left.index(p)))
+
+    with pytest.raises(IndexError):
+        s.pop()
+
+test7 = """
+x = pyState.Int()
+s = "ab"
+y = 0
+if x > 1:
+    y += 1
+if x > 2:
+    y += 2
+else:
+    y += 5
+if x > 4:
+    y += 4
+z = y * 2
+"""
+
+def test_pyPathGroup_merge():
+    b = ast_parse.parse(test7).body
+    pg = PathGroup(Path(b,source=test7))
+    pg.explore()
+
+    assert len(pg.completed) == 4
+    zs = set(z for p in pg.completed for z in p.state.any_n_int('z', 10))
+    assert zs == set([10, 6, 12, 14])
+
+    pg = PathGroup(Path(b,source=test7),merge=True,search_strategy="program_order")
+    assert pg.merge
+    pg.explore()
+
+    assert len(pg.completed) == 1
+    assert len(pg.deadended) == 0
+    assert set(pg.completed[0].state.any_n_int('z', 10)) == zs
+
+    # The merged state still knows which input took which side
+    state = pg.completed[0].state
+    x = state.getVar('x').getZ3Object()
+    z = state.getVar('z').getZ3Object()
+    assert state.isSat(extra_constraints=[x == 3, z == 6])
+    assert not state.isSat(extra_constraints=[x == 3, z != 6])
+
+test10 = """
+x = pyState.Int()
+w = pyState.Int()
+z = 1
+"""
+
+def test_pyPathGroup_merge_index():
+    from pySym.pyState import Merge
+
+    p = Path(ast_parse.parse(test10).body,source=test10).step()[0].step()[0]
+    x = p.state.getVar('x').getZ3Object()
+    w = p.state.getVar('w').getZ3Object()
+
+    a = p.state.copy()
+    a.addConstraint(x > 1)
+    b = p.state.copy()
+    b.addConstraint(x <= 1, w > 3)
+
+    # Only b constrained w, whichever side the merged state comes from
+    for state, other in [(a, b), (b, a)]:
+        merged = Merge.merge(state, other)
+        assert merged is not None
+        assert merged.var_in_solver(w)
+        assert merged.getVar('w').is_constrained
+
+        # The index covers exactly what's in the solver
+        assertions = merged.solver.assertions()
+        assert all(c in merged._vars_in_solver for c in assertions)
+        assert len(merged._vars_in_solver) == len(assertions)
+
+test8 = """
+x = pyState.Int()
+y = 0
+if x > 1:
+    y = 1
+z = y + 1
+"""
+
+def test_pyPathGroup_prune(tmpdir):
+
+    def group(prune):
+        p = Path(ast_parse.parse(test8).body,source=test8).step()[0]
+        x = p.state.getVar('x').getZ3Object()
+
+        # Same as p, so a duplicate
+        same = p.copy(state=p.state.copy())
+
+        # Constrained more than p, and the same as each other up to how it's written
+        more = p.copy(state=p.state.copy())
+        more.state.addConstraint(x > 5)
+        equivalent = p.copy(state=p.state.copy())
+        equivalent.state.addConstraint(x >= 6)
+
+        pg = PathGroup(prune=prune)
+        pg.active = [p, same, more, equivalent]
+        return pg
+
+    pg = group("none")
+    pg.explore()
+    assert len(pg.completed) == 6
+    assert pg.pruned == 0
+    assert "pruned" not in str(pg)
+
+    pg = group("duplicates")
+    pg.explore()
+    assert len(pg.completed) == 4
+    assert pg.pruned == 1
+    assert str(pg) == "<PathGroup with 4 completed, 1 pruned>"
+
+    pg = group("subsumption")
+    pg.explore()
+    assert len(pg.completed) == 2
+    assert pg.pruned == 3
+    assert set(p.state.any_int('z') for p in pg.completed) == set([1, 2])
+
+    f = str(tmpdir.join("pg.pysym"))
+    pg.save(f)
+    pg2 = PathGroup.load(f)
+    assert pg2.prune == "subsumption"
+    assert str(pg2) == str(pg)
+
+    with pytest.raises(AssertionError):
+        PathGroup(prune="all")
+
+def test_pyPathGroup_prune_merge():
+    # Pruning doesn't get in the way of merging, and leaves sibling paths alone
+    b = ast_parse.parse(test7).body
+    pg = PathGroup(Path(b,source=test7),merge=True,prune="subsumption",search_strategy="program_order")
+    pg.explore()
+
+    assert len(pg.completed) == 1
+    assert pg.pruned == 0
+    assert set(pg.completed[0].state.any_n_int('z', 10)) == set([10, 6, 12, 14])
+
+test9 = """
+x = pyState.Int()
+i = 0
+while i < x:
+    i += 1
+z = i
+"""
+
+def test_pyPathGroup_explore_limits():
+    b = ast_parse.parse(test9).body
+    new = lambda: PathGroup(Path(b,source=test9))
+
+    pg = new()
+    assert not pg.explore(max_steps=5)
+    assert pg.stop_reason == "max_steps"
+    assert len(pg.active) > 0
+
+    # Picks up where it left off
+    assert not pg.explore(max_steps=5, on_limit="stash")
+    assert pg.stop_reason == "max_steps"
+    assert len(pg.active) == 0
+    assert len(pg.unexplored) > 0
+    assert "unexplored" in str(pg)
+
+    pg = new()
+    assert not pg.explore(max_active=1, on_limit="drop")
+    assert pg.stop_reason == "max_active"
+    assert len(pg.active) == 0
+    assert len(pg.unexplored) == 0
+
+    pg = new()
+    assert not pg.explore(timeout=0.5)
+    assert pg.stop_reason == "timeout"
+
+    pg = new()
+    assert not pg.explore(solver_time_budget=0.05)
+    assert pg.stop_reason == "solver_time"
+
+    pg = new()
+    assert not pg.explore(memory_limit=1)
+    assert pg.stop_reason == "memory_limit"
+    assert len(pg.completed) == 0
+
+    # Predicates over states
+    pg = new()
+    assert pg.explore(find=lambda state: state.lineno() == 6 and state.any_int('i') == 3, avoid=lambda state: state.lineno() == 6 and state.any_int('i') == 1)
+    assert pg.stop_reason == "found"
+    assert pg.found[0].state.any_int('i') == 3
+    assert len(pg.avoided) == 1
+    assert pg.avoided[0].state.any_int('i') == 1
+
+    pg = new()
+    assert not pg.explore(avoid=5, max_steps=50)
+    assert pg.stop_reason == "exhausted"
+    assert len(pg.avoided) == 1
+    assert len(pg.completed) == 1
+    assert pg.completed[0].state.any_int('z') == 0
+
+    with pytest.raises(AssertionError):
+        pg.explore(on_limit="forget")
+
+def test_pyPathGroup_iter_explore(tmpdir):
+    from pySym.pyPath import PathSummary
+
+    b = ast_parse.parse(test9).body
+
+    # Paths come out while there is still more to explore
+    pg = PathGroup(Path(b,source=test9))
+    it = pg.iter_explore()
+    first = next(it)
+    assert type(first) is Path
+    assert first.state.any_int('z') == 0
+    assert len(pg.active) > 0
+    it.close()
+    assert pg.stop_reason == "closed"
+    assert len(pg.active) > 0
+
+    # Breaking out leaves the group usable
+    assert not pg.explore(max_steps=10)
+    assert pg.stop_reason == "max_steps"
+
+    # Nothing kept, only summaries handed out
+    pg = PathGroup(Path(b,source=test9),ignore_groups="completed")
+    summaries = list(pg.stream(summarize=True, max_steps=60))
+    assert pg.stop_reason == "max_steps"
+    assert len(pg.completed) == 0
+    assert len(summaries) > 5
+    assert all(type(s) is PathSummary for s in summaries)
+    assert all(s.lineno == 6 for s in summaries)
+
+    # Each summary's constraints load back into z3 and its model satisfies them
+    for s in summaries:
+        assert s.error is None
+        assert len(s.model) > 0
+        solver = z3.Solver()
+        solver.add(*s.assertions())
+        solver.add(*[z3.Int(name) == value for name, value in s.model.items()])
+        assert solver.check() == z3.sat
+
+    # Summaries are kept in the stash instead of paths, and can be saved
+    pg = PathGroup(Path(b,source=test9))
+    summaries = list(pg.iter_explore(summarize=True, max_steps=30, on_limit="stash"))
+    assert pg.completed == summaries
+    assert len(pg.unexplored) > 0
+
+    f = str(tmpdir.join("pg.pysym"))
+    pg.save(f)
+    pg2 = PathGroup.load(f)
+    assert [s.smt2 for s in pg2.completed] == [s.smt2 for s in summaries]
+    assert len(pg2.unexplored) == len(pg.unexplored)
+
+    # Errors stream too
+    pg = PathGroup(Path(ast_parse.parse(test9 + "w = y\n").body,source=test9))
+    s = next(pg.iter_explore(stashes=["errored"], summarize=True))
+    assert s.error is not None
+
+def test_pyPathGroup_SearchStrategy_random():
+    from pySym import SearchStrategy
+    import random
+    random.seed(1337)
+
+    def picks(strategy, forks, rounds=6000):
+        paths = []
+        for f in forks:
+            p = Path()
+            p.forks = f
+            paths.append(p)
+
+        s = strategy(paths)
+        counts = [0] * len(paths)
+
+        # Put every pick straight back, so each round picks from all of them again
+        for _ in range(rounds):
+            path, = s.select()
+            counts[paths.index(path)] += 1
+            s.append(path)
+
+        return [count / rounds for count in counts]
+
+    for share in picks(SearchStrategy.Random, [0, 0, 0, 0]):
+        assert abs(share - 0.25) < 0.03
+
+    # Each fork halves the chance
+    for share, expected in zip(picks(SearchStrategy.RandomPath, [0, 1, 2]), [4/7, 2/7, 1/7]):
+        assert abs(share - expected) < 0.03
+
+    # Weights are relative, however deep the paths are
+    for share, expected in zip(picks(SearchStrategy.RandomPath, [3000, 3001, 2000, 4000]), [0, 0, 1, 0]):
+        assert share == expected
+
+    for share, expected in zip(picks(SearchStrategy.RandomPath, [3000, 3001]), [2/3, 1/3]):
+        assert abs(share - expected) < 0.03
+
+    # Removing a path moves another into its slot
+    paths = [Path() for _ in range(50)]
+    for i, p in enumerate(paths):
+        p.forks = i % 3
+    s = SearchStrategy.RandomPath(paths)
+    for p in paths[::2]:
+        s.remove(p)
+    assert list(s) == paths[1::2]
+    assert sorted(id(p) for _ in range(len(s)) for p in s.select()) == sorted(id(p) for p in paths[1::2])
+    assert len(s) == 0
+
+    with pytest.raises(IndexError):
+        SearchStrategy.Random().select()
+
+def test_pyPathGroup_iter_explore_closed(monkeypatch):
+    b = ast_parse.parse(test9).body
+
+    # Closing counts as a limit, so on_limit applies
+    pg = PathGroup(Path(b,source=test9))
+    for path in pg.iter_explore(on_limit="stash"):
+        break
+    assert pg.stop_reason == "closed"
+    assert len(pg.active) == 0
+    assert len(pg.unexplored) > 0
+
+    # Paths being stepped when something is raised go back in active
+    pg = PathGroup(Path(b,source=test9))
+    pg.explore(max_steps=10)
+    active = set(map(id, pg.active))
+    assert len(active) == 2
+
+    def interrupted(self):
+        raise KeyboardInterrupt()
+
+    monkeypatch.setattr(Path, "step", interrupted)
+
+    with pytest.raises(KeyboardInterrupt):
+        list(pg.iter_explore())
+
+    assert pg.stop_reason == "closed"
+    assert set(map(id, pg.active)) == active
+
+    monkeypatch.undo()
+
+    # And exploring picks up from there
+    assert not pg.explore(max_steps=10)
+    assert pg.stop_reason == "max_steps"
@@ -131,6 +131,28 @@ s = "test"
 s *= 3
 """
 
+test20 = """
+a = {0}
+b = {0}
+y = {0}
+y += a
+y += b
+if b == 5:
+    z = 2
+else:
+    z = 3
+"""
+
+def test_pySym_AugAssign_Symbolic_Chain():
+    # Each update needs a new version of y, or the second one would say y == y + b
+    for var in ["pyState.Int()", "pyState.Real()", "pyState.BVS(32)"]:
+        b = ast_parse.parse(test20.format(var)).body
+        pg = PathGroup(Path(b,source=test20.format(var)))
+        pg.explore()
+
+        assert len(pg.completed) == 2
+        assert set(p.state.any_int('z') for p in pg.completed) == set([2, 3])
+
 def test_pySym_AugAssign_MultString():
     b = ast_parse.parse(test19).body
     p = Path(b,source=test19)
@@ -341,7 +363,7 @@ def test_pySym_AugAssign_MixedTypes():
     # Step through program
     p = p.step()[0]
     p = p.step()[0]
-    ifSide,elseSide = p.step()
+    elseSide, = p.step()
     elseSide = elseSide.step()[0]
 
     assert elseSide.state.isSat()
@@ -359,7 +381,7 @@ def test_pySym_AugAssign():
     # Step through program
     p = p.step()[0]
     p = p.step()[0]
-    ifSide,elseSide = p.step()
+    elseSide, = p.step()
     elseSide = elseSide.step()[0]
     
     assert elseSide.state.isSat()
@@ -373,7 +395,7 @@ def test_pySym_AugAssign():
     # Step through program
     p = p.step()[0]
     p = p.step()[0]
-    ifSide,elseSide = p.step()
+    elseSide, = p.step()
     elseSide = elseSide.step()[0]
 
     assert elseSide.state.isSat()
@@ -387,7 +409,7 @@ def test_pySym_AugAssign():
     # Step through program
     p = p.step()[0]
     p = p.step()[0]
-    ifSide,elseSide = p.step()
+    elseSide, = p.step()
     elseSide = elseSide.step()[0]
 
     assert elseSide.state.isSat()
@@ -401,7 +423,7 @@ def test_pySym_AugAssign():
     # Step through program
     p = p.step()[0]
     p = p.step()[0]
-    ifSide,elseSide = p.step()
+    elseSide, = p.step()
     elseSide = elseSide.step()[0]
 
     assert elseSide.state.isSat()
@@ -415,7 +437,7 @@ def test_pySym_AugAssign():
     # Step through program
     p = p.step()[0]
     p = p.step()[0]
-    ifSide,elseSide = p.step()
+    elseSide, = p.step()
     elseSide = elseSide.step()[0]
 
     assert elseSide.state.isSat()
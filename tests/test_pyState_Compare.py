@@ -67,19 +67,17 @@ def test_pySym_Compare():
     p = p.step()[0]
     p = p.step()[0]
     p2 = p.step()
-    ifSide = p2[0]
-    elseSide = p2[1]
+    assert len(p2) == 1
+    elseSide = p2[0]
+    assert elseSide.state.lineno() == 7
 
-    # If side should not be possible
-    assert not ifSide.state.isSat()
+    # Only the else side is possible
     assert elseSide.state.isSat()
 
     # Track expected number of assertions
-    #assert len(ifSide.state.solver.assertions()) == 3
     #assert len(elseSide.state.solver.assertions()) == 3
 
     # Make sure the answer makes sense
-    assert ifSide.state.any_int('x') == None
     assert elseSide.state.any_int('x') == 1
 
     #########################
@@ -91,20 +89,18 @@ def test_pySym_Compare():
     p = p.step()[0]
     p = p.step()[0]
     p2 = p.step()
+    assert len(p2) == 1
     ifSide = p2[0]
-    elseSide = p2[1]
+    assert ifSide.state.lineno() == 5
 
-    # If side should be correct
+    # Only the if side is possible
     assert ifSide.state.isSat()
-    assert not elseSide.state.isSat()
 
     # Track expected number of assertions
     #assert len(ifSide.state.solver.assertions()) == 3
-    #assert len(elseSide.state.solver.assertions()) == 3
 
     # Make sure the answer makes sense
     assert ifSide.state.any_int('x') == 2
-    assert elseSide.state.any_int('x') == None
 
     #############
     # Less Than #
@@ -115,20 +111,18 @@ def test_pySym_Compare():
     p = p.step()[0]
     p = p.step()[0]
     p2 = p.step()
+    assert len(p2) == 1
     ifSide = p2[0]
-    elseSide = p2[1]
+    assert ifSide.state.lineno() == 5
 
-    # If side should be correct
+    # Only the if side is possible
     assert ifSide.state.isSat()
-    assert not elseSide.state.isSat()
 
     # Track expected number of assertions
     #assert len(ifSide.state.solver.assertions()) == 3
-    #assert len(elseSide.state.solver.assertions()) == 3
 
     # Make sure the answer makes sense
     assert ifSide.state.any_int('x') == 1
-    assert elseSide.state.any_int('x') == None
 
     ######################
     # Less Than Or Equal #
@@ -139,20 +133,18 @@ def test_pySym_Compare():
     p = p.step()[0]
     p = p.step()[0]
     p2 = p.step()
+    assert len(p2) == 1
     ifSide = p2[0]
-    elseSide = p2[1]
+    assert ifSide.state.lineno() == 5
     
-    # If side should be correct
+    # Only the if side is possible
     assert ifSide.state.isSat()
-    assert not elseSide.state.isSat()
 
     # Track expected number of assertions
     #assert len(ifSide.state.solver.assertions()) == 3
-    #assert len(elseSide.state.solver.assertions()) == 3
 
     # Make sure the answer makes sense
     assert ifSide.state.any_int('x') == 3
-    assert elseSide.state.any_int('x') == None
 
     #########
     # Equal #
@@ -163,19 +155,17 @@ def test_pySym_Compare():
     p = p.step()[0]
     p = p.step()[0]
     p2 = p.step()
-    ifSide = p2[0]
-    elseSide = p2[1]
+    assert len(p2) == 1
+    elseSide = p2[0]
+    assert elseSide.state.lineno() == 7
 
-    # If side should not be correct
-    assert not ifSide.state.isSat()
+    # Only the else side is possible
     assert elseSide.state.isSat()
 
     # Track expected number of assertions
-    #assert len(ifSide.state.solver.assertions()) == 3
     #assert len(elseSide.state.solver.assertions()) == 3
 
     # Make sure the answer makes sense
-    assert ifSide.state.any_int('x') == None
     assert elseSide.state.any_int('x') == 1
 
     #############
@@ -187,20 +177,18 @@ def test_pySym_Compare():
     p = p.step()[0]
     p = p.step()[0]
     p2 = p.step()
+    assert len(p2) == 1
     ifSide = p2[0]
-    elseSide = p2[1]
+    assert ifSide.state.lineno() == 5
 
-    # If side should be correct
+    # Only the if side is possible
     assert ifSide.state.isSat()
-    assert not elseSide.state.isSat()
 
     # Track expected number of assertions
     #assert len(ifSide.state.solver.assertions()) == 3
-    #assert len(elseSide.state.solver.assertions()) == 3
 
     # Make sure the answer makes sense
     assert ifSide.state.any_int('x') == 1
-    assert elseSide.state.any_int('x') == None
 
 
 def test_unhandled_input():
@@ -233,20 +221,17 @@ def test_pySym_CompareRightNum():
     p = p.step()[0]
     print(p.state.solver)
     p2 = p.step()
-    ifSide = p2[0]
-    elseSide = p2[1]
-    print(ifSide.state.solver)
+    assert len(p2) == 1
+    elseSide = p2[0]
+    assert elseSide.state.lineno() == 7
     print(elseSide.state.solver)
-    # If side should not be possible
-    assert not ifSide.state.isSat()
+    # Only the else side is possible
     assert elseSide.state.isSat()
 
     # Track expected number of assertions
-    #assert len(ifSide.state.solver.assertions()) == 3
     #assert len(elseSide.state.solver.assertions()) == 3
 
     # Make sure the answer makes sense
-    assert ifSide.state.any_int('x') == None
     assert elseSide.state.any_int('x') == 1
 
     #########################
@@ -258,20 +243,18 @@ def test_pySym_CompareRightNum():
     p = p.step()[0]
     p = p.step()[0]
     p2 = p.step()
+    assert len(p2) == 1
     ifSide = p2[0]
-    elseSide = p2[1]
+    assert ifSide.state.lineno() == 5
 
-    # If side should be correct
+    # Only the if side is possible
     assert ifSide.state.isSat()
-    assert not elseSide.state.isSat()
 
     # Track expected number of assertions
     #assert len(ifSide.state.solver.assertions()) == 3
-    #assert len(elseSide.state.solver.assertions()) == 3
 
     # Make sure the answer makes sense
     assert ifSide.state.any_int('x') == 2
-    assert elseSide.state.any_int('x') == None
 
     #############
     # Less Than #
@@ -282,20 +265,18 @@ def test_pySym_CompareRightNum():
     p = p.step()[0]
     p = p.step()[0]
     p2 = p.step()
+    assert len(p2) == 1
     ifSide = p2[0]
-    elseSide = p2[1]
+    assert ifSide.state.lineno() == 5
 
-    # If side should be correct
+    # Only the if side is possible
     assert ifSide.state.isSat()
-    assert not elseSide.state.isSat()
 
     # Track expected number of assertions
     #assert len(ifSide.state.solver.assertions()) == 3
-    #assert len(elseSide.state.solver.assertions()) == 3
 
     # Make sure the answer makes sense
     assert ifSide.state.any_int('x') == 1
-    assert elseSide.state.any_int('x') == None
 
     ######################
     # Less Than Or Equal #
@@ -306,20 +287,18 @@ def test_pySym_CompareRightNum():
     p = p.step()[0]
     p = p.step()[0]
     p2 = p.step()
+    assert len(p2) == 1
     ifSide = p2[0]
-    elseSide = p2[1]
+    assert ifSide.state.lineno() == 5
     
-    # If side should be correct
+    # Only the if side is possible
     assert ifSide.state.isSat()
-    assert not elseSide.state.isSat()
 
     # Track expected number of assertions
     #assert len(ifSide.state.solver.assertions()) == 3
-    #assert len(elseSide.state.solver.assertions()) == 3
 
     # Make sure the answer makes sense
     assert ifSide.state.any_int('x') == 3
-    assert elseSide.state.any_int('x') == None
 
     #########
     # Equal #
@@ -330,19 +309,17 @@ def test_pySym_CompareRightNum():
     p = p.step()[0]
     p = p.step()[0]
     p2 = p.step()
-    ifSide = p2[0]
-    elseSide = p2[1]
+    assert len(p2) == 1
+    elseSide = p2[0]
+    assert elseSide.state.lineno() == 7
 
-    # If side should not be correct
-    assert not ifSide.state.isSat()
+    # Only the else side is possible
     assert elseSide.state.isSat()
 
     # Track expected number of assertions
-    #assert len(ifSide.state.solver.assertions()) == 3
     #assert len(elseSide.state.solver.assertions()) == 3
 
     # Make sure the answer makes sense
-    assert ifSide.state.any_int('x') == None
     assert elseSide.state.any_int('x') == 1
 
     #############
@@ -354,20 +331,18 @@ def test_pySym_CompareRightNum():
     p = p.step()[0]
     p = p.step()[0]
     p2 = p.step()
+    assert len(p2) == 1
     ifSide = p2[0]
-    elseSide = p2[1]
+    assert ifSide.state.lineno() == 5
 
-    # If side should be correct
+    # Only the if side is possible
     assert ifSide.state.isSat()
-    assert not elseSide.state.isSat()
 
     # Track expected number of assertions
     #assert len(ifSide.state.solver.assertions()) == 3
-    #assert len(elseSide.state.solver.assertions()) == 3
 
     # Make sure the answer makes sense
     assert ifSide.state.any_int('x') == 1
-    assert elseSide.state.any_int('x') == None
 
 
 def test_pySym_CompareLeftNum():
@@ -380,19 +355,17 @@ def test_pySym_CompareLeftNum():
     p = p.step()[0]
     p = p.step()[0]
     p2 = p.step()
+    assert len(p2) == 1
     ifSide = p2[0]
-    elseSide = p2[1]
-    # If side should be right
+    assert ifSide.state.lineno() == 5
+    # Only the if side is possible
     assert ifSide.state.isSat()
-    assert not elseSide.state.isSat()
 
     # Track expected number of assertions
     #assert len(ifSide.state.solver.assertions()) == 3
-    #assert len(elseSide.state.solver.assertions()) == 3
 
     # Make sure the answer makes sense
     assert ifSide.state.any_int('x') == 1
-    assert elseSide.state.any_int('x') == None
 
     #########################
     # Greater Than Or Equal #
@@ -403,20 +376,18 @@ def test_pySym_CompareLeftNum():
     p = p.step()[0]
     p = p.step()[0]
     p2 = p.step()
+    assert len(p2) == 1
     ifSide = p2[0]
-    elseSide = p2[1]
+    assert ifSide.state.lineno() == 5
 
-    # If side should be correct
+    # Only the if side is possible
     assert ifSide.state.isSat()
-    assert not elseSide.state.isSat()
 
     # Track expected number of assertions
     #assert len(ifSide.state.solver.assertions()) == 3
-    #assert len(elseSide.state.solver.assertions()) == 3
 
     # Make sure the answer makes sense
     assert ifSide.state.any_int('x') == 2
-    assert elseSide.state.any_int('x') == None
 
     #############
     # Less Than #
@@ -427,19 +398,17 @@ def test_pySym_CompareLeftNum():
     p = p.step()[0]
     p = p.step()[0]
     p2 = p.step()
-    ifSide = p2[0]
-    elseSide = p2[1]
+    assert len(p2) == 1
+    elseSide = p2[0]
+    assert elseSide.state.lineno() == 7
 
-    # If else should be correct
-    assert not ifSide.state.isSat()
+    # Only the else side is possible
     assert elseSide.state.isSat()
 
     # Track expected number of assertions
-    #assert len(ifSide.state.solver.assertions()) == 3
     #assert len(elseSide.state.solver.assertions()) == 3
 
     # Make sure the answer makes sense
-    assert ifSide.state.any_int('x') == None
     assert elseSide.state.any_int('x') == 1
 
     ######################
@@ -451,19 +420,17 @@ def test_pySym_CompareLeftNum():
     p = p.step()[0]
     p = p.step()[0]
     p2 = p.step()
-    ifSide = p2[0]
-    elseSide = p2[1]
+    assert len(p2) == 1
+    elseSide = p2[0]
+    assert elseSide.state.lineno() == 7
     
-    # Else side should be correct
-    assert not ifSide.state.isSat()
+    # Only the else side is possible
     assert elseSide.state.isSat()
 
     # Track expected number of assertions
-    #assert len(ifSide.state.solver.assertions()) == 3
     #assert len(elseSide.state.solver.assertions()) == 3
 
     # Make sure the answer makes sense
-    assert ifSide.state.any_int('x') == None
     assert elseSide.state.any_int('x') == 3
 
     #########
@@ -475,19 +442,17 @@ def test_pySym_CompareLeftNum():
     p = p.step()[0]
     p = p.step()[0]
     p2 = p.step()
-    ifSide = p2[0]
-    elseSide = p2[1]
+    assert len(p2) == 1
+    elseSide = p2[0]
+    assert elseSide.state.lineno() == 7
 
-    # If side should not be correct
-    assert not ifSide.state.isSat()
+    # Only the else side is possible
     assert elseSide.state.isSat()
 
     # Track expected number of assertions
-    #assert len(ifSide.state.solver.assertions()) == 3
     #assert len(elseSide.state.solver.assertions()) == 3
 
     # Make sure the answer makes sense
-    assert ifSide.state.any_int('x') == None
     assert elseSide.state.any_int('x') == 1
 
     #############
@@ -499,17 +464,15 @@ def test_pySym_CompareLeftNum():
     p = p.step()[0]
     p = p.step()[0]
     p2 = p.step()
+    assert len(p2) == 1
     ifSide = p2[0]
-    elseSide = p2[1]
+    assert ifSide.state.lineno() == 5
 
-    # If side should be correct
+    # Only the if side is possible
     assert ifSide.state.isSat()
-    assert not elseSide.state.isSat()
 
     # Track expected number of assertions
     #assert len(ifSide.state.solver.assertions()) == 3
-    #assert len(elseSide.state.solver.assertions()) == 3
 
     # Make sure the answer makes sense
     assert ifSide.state.any_int('x') == 1
-    assert elseSide.state.any_int('x') == None
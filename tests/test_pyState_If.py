@@ -69,7 +69,8 @@ def test_pySym_If_Subscript_Int():
     
     # Splits into 8 possibilities and then if splits again
     assert len(pg.completed) == 2
-    assert len(pg.deadended) == 2
+    # Sides that can't happen aren't forked
+    assert len(pg.deadended) == 0
 
     s = pg.completed[0].state.copy()
     x = s.getVar('x')
@@ -105,7 +106,8 @@ def test_pySym_If_StateSplit():
     
     # Splits into 8 possibilities and then if splits again
     assert len(pg.completed) == 8
-    assert len(pg.deadended) == 8
+    # Sides that can't happen aren't forked
+    assert len(pg.deadended) == 0
 
     # Two of those states should hit the y+=1
     assert sum([p.state.any_int('y') for p in pg.completed]) == 2
@@ -118,7 +120,8 @@ def test_pySym_If_StateSplit():
     
     # Splits into 8 possibilities and then if splits again
     assert len(pg.completed) == 8
-    assert len(pg.deadended) == 8
+    # Sides that can't happen aren't forked
+    assert len(pg.deadended) == 0
 
     # Two of those states should hit the y+=1
     assert sum([p.state.any_int('z') for p in pg.completed]) == 1
@@ -136,3 +139,36 @@ def test_pySym_ifBoolOp():
     
     pg.explore()
 
+
+def test_pySym_If_feasibleBranches():
+    from pySym.pyState import If
+
+    # Concrete test, so only the if side can happen
+    b = ast_parse.parse(test1).body
+    p = Path(b,source=test1)
+    p = p.step()[0].step()[0]
+    state = p.state.copy()
+
+    assert state.feasibleBranches(True) == (True, False)
+    assert state.feasibleBranches(False) == (False, True)
+
+    # The one side we take is the state itself, no copy
+    ret = If.handle(state,state.path[0])
+    assert len(ret) == 1
+    assert ret[0] is state
+    assert ret[0].isSat()
+
+    # Symbolic test, both sides can happen
+    b = ast_parse.parse(test3).body
+    p = Path(b,source=test3)
+    p = p.step()[0].step()[0]
+    x = z3.Int('x')
+    assert p.state.feasibleBranches(x > 5) == (True, True)
+
+    p.state.addConstraint(x > 5)
+    assert p.state.feasibleBranches(x > 3) == (True, False)
+    assert p.state.feasibleBranches(x < 3) == (False, True)
+
+    # State that is already unsat can't take either side
+    p.state.addConstraint(x < 5)
+    assert p.state.feasibleBranches(x == 1) == (False, False)
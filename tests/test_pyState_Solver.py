@@ -0,0 +1,295 @@
+import sys, os
+myPath = os.path.dirname(os.path.abspath(__file__))
+#sys.path.insert(0, myPath + '/../')
+
+import logging
+from pySym import Colorer
+logging.basicConfig(level=logging.DEBUG,format='%(name)s - %(levelname)s - %(message)s', datefmt='%m/%d/%Y %I:%M:%S %p')
+
+from pySym import ast_parse
+import z3
+from pySym.pyPath import Path
+from pySym.pyPathGroup import PathGroup
+from pySym.pyState import Solver
+from copy import copy
+
+test1 = """
+x = pyState.Int()
+if x > 5:
+    y = 1
+else:
+    y = 2
+"""
+
+def test_pyState_Solver_copy_shares_trail():
+    x = z3.Int('x')
+    s = Solver.Solver()
+    s.add(x > 5)
+
+    s2 = copy(s)
+    assert s2.trail is s.trail
+
+    # Siblings don't see each other's constraints
+    s.add(x < 7)
+    s2.add(x > 10)
+
+    assert s.check() == z3.sat
+    assert s.model().eval(x).as_long() == 6
+    assert s2.check() == z3.sat
+    assert s2.model().eval(x).as_long() > 10
+    assert len(s.assertions()) == 2
+    assert len(s2.assertions()) == 2
+
+    s.add(x == 20)
+    assert s.check() == z3.unsat
+    assert s2.check() == z3.sat
+
+
+def test_pyState_Solver_push_pop():
+    x = z3.Int('x')
+    s = Solver.Solver()
+    s.add(x > 5)
+
+    s.push()
+    s.add(x < 5)
+    assert s.check() == z3.unsat
+    s.pop()
+
+    assert s.check() == z3.sat
+    assert len(s.assertions()) == 1
+
+
+def test_pyState_Solver_fallback():
+    x = z3.Real('x')
+    s = Solver.Solver()
+    s.add(x * x == 2, x > 0)
+
+    assert s.check() == z3.sat
+    assert abs(float(s.model().eval(x).as_decimal(5).rstrip('?')) - 1.41421) < 0.001
+
+
+def test_pyState_Solver_branches():
+    b = ast_parse.parse(test1).body
+    p = Path(b,source=test1)
+    pg = PathGroup(p)
+
+    pg.explore()
+
+    assert len(pg.completed) == 2
+    assert set([p.state.any_int('y') for p in pg.completed]) == set([1,2])
+
+    # Both branches share the parent's part of the trail
+    trails = [list(p.state.solver.trail) for p in pg.completed]
+    assert trails[0][:-1] == trails[1][:-1]
+
+def test_pyState_Solver_partition():
+    x, y, z = z3.Ints('x y z')
+    s = Solver.Solver()
+    s.add(x > 5)
+    s.add(y > 5)
+    s.add(z == y + 1)
+    assert s.check() == z3.sat
+
+    partition = Solver.Partition(None).extend(list(s.trail))
+    nodes = list(s.trail)
+
+    # x is independent of y and z
+    assert partition.slice(Solver.get_variables(x)) == [nodes[0]]
+    assert partition.slice(Solver.get_variables(z)) == nodes[1:]
+
+
+def test_pyState_Solver_slice_unsat():
+    x, y = z3.Ints('x y')
+    s = Solver.Solver()
+    s.add(x > 5)
+    s.add(y > 5)
+    assert s.check() == z3.sat
+
+    s.add(y < 3)
+    assert s.check() == z3.unsat
+
+    # Independent model queries still only see their own slice
+    s2 = Solver.Solver()
+    s2.add(x > 5)
+    s2.add(y == 2)
+    assert s2.model(variables=[x]).eval(x).as_long() > 5
+
+
+def test_pyState_Solver_cache():
+    x, y = z3.Ints('x y')
+    cache = Solver.QueryCache(size=2)
+    a = Solver.TrailNode((x > 5,))
+    b = Solver.TrailNode((x < 3,), a)
+    c = Solver.TrailNode((y > 1,), a)
+
+    assert cache.lookup([a, b]) is None
+    assert cache.misses == 1
+
+    cache.store([a, b], z3.unsat)
+    cache.store([a, c], z3.sat)
+
+    # Exact, unsat subset and sat superset hits
+    assert cache.lookup([a, b])[0] == z3.unsat
+    assert cache.lookup([a, b, c])[0] == z3.unsat
+    assert cache.lookup([a])[0] == z3.sat
+    assert cache.hits == 3
+
+    # LRU eviction. [a, c] was used last.
+    cache.store([c], z3.sat)
+    assert len(cache.entries) == 2
+    assert cache.lookup([a, b]) is None
+    assert cache.lookup([a, c]) is not None
+
+
+def test_pyState_Solver_cache_siblings():
+    cache = Solver.get_cache()
+    x = z3.Int('x')
+
+    s = Solver.Solver()
+    s.add(x > 5)
+    s2 = copy(s)
+    s.add(x < 3)
+    s2.add(x < 3)
+
+    assert s.check() == z3.unsat
+    hits = cache.hits
+    assert s2.check() == z3.unsat
+    assert cache.hits == hits + 1
+
+
+def test_pyState_Solver_model_reuse():
+    cache = Solver.get_cache()
+    x, x1, x2 = z3.Ints('reuse_x reuse_x1 reuse_x2')
+
+    s = Solver.Solver()
+    s.add(x > 5)
+    assert s.check() == z3.sat
+    queries = cache.hits + cache.misses
+
+    # Definitions of fresh variables just extend the model
+    s2 = copy(s)
+    s2.add(x1 == x + 1)
+    s2.add(x2 == x1 * 2)
+    assert s2.check() == z3.sat
+    m = s2.model(variables=[x2])
+    assert m.eval(x2).as_long() == (m.eval(x).as_long() + 1) * 2
+
+    # As do constraints the model already happens to satisfy
+    s2.add(x2 > 0)
+    assert s2.check() == z3.sat
+    assert cache.hits + cache.misses == queries
+
+    # Parent's model is untouched
+    assert s.model().get_interp(x1.decl()) is None
+
+    # Ones it doesn't need the solver
+    s2.add(x2 > 100)
+    assert s2.check() == z3.sat
+    assert cache.hits + cache.misses > queries
+    assert s2.model().eval(x2).as_long() > 100
+
+
+def test_pyState_Solver_model_completion():
+    x, y, z = z3.Ints('complete_x complete_y complete_z')
+
+    s = Solver.Solver()
+    s.add(x > 5)
+    assert s.check() == z3.sat
+
+    # Checking a constraint on a variable the shared model has no value for
+    s2 = copy(s)
+    s2.add(x + y > 0)
+    assert s2.check() == z3.sat
+    assert s.model().get_interp(y.decl()) is None
+
+    # Or asking about one
+    s3 = copy(s)
+    assert s3.is_sat_with(z > x)
+    assert not s3.is_fixed(z)
+    assert s.model().get_interp(z.decl()) is None
+    assert Solver.evaluate(s.model(), x + z).as_long() == s.model().eval(x).as_long()
+    assert s.model().get_interp(z.decl()) is None
+
+def test_pyState_Solver_ConstraintIndex():
+    x, y = z3.Ints('index_x index_y')
+    index = Solver.ConstraintIndex()
+    index.add(x > 3)
+    index.add(x > 3)
+    index.add(x + y == 5)
+
+    assert len(index) == 2
+    assert index.uses(x)
+    assert index.uses(x, ignore=[x > 3])
+    assert not index.uses(x, ignore=[x > 3, x + y == 5])
+    assert not index.uses(z3.Int('index_z'))
+
+    # Copies don't see each other's changes
+    index2 = copy(index)
+    assert index2.remove(x + y == 5)
+    assert not index2.remove(x + y == 5)
+    assert not index2.uses(y)
+    assert index.uses(y)
+    assert (x + y == 5) in index
+
+
+def test_pyState_Solver_retractable():
+    x = z3.Int('retract_x')
+    s = Solver.Solver()
+    s.add(x > 5)
+    s.add(x < 3, retractable=True)
+    assert s.check() == z3.unsat
+    assert len(s.assertions()) == 2
+
+    s2 = copy(s)
+    trail = s2.trail
+    assert s2.remove(x < 3) == 1
+
+    # Removing only adds to the trail
+    assert s2.trail.parent is trail
+    assert s2.check() == z3.sat
+    assert s2.model().eval(x).as_long() > 5
+    assert s2.assertions() == [x > 5]
+
+    # The original still has it
+    assert s.check() == z3.unsat
+
+    # Anything else needs a rebuild
+    assert s2.remove(x > 5) == 1
+    assert s2.assertions() == []
+
+def _tracking_literal(_):
+    s = Solver.Solver()
+    s.add(z3.Int('retract_x') > 5, retractable=True)
+    return str(s.trail.literal)
+
+def test_pyState_Solver_retractable_workers():
+    # Workers all start from the same forked parent, but must not hand out the same literal names
+    from multiprocessing import Pool
+    from pySym import pyPathGroup
+
+    with Pool(processes=2, initializer=pyPathGroup._init_worker, initargs=(None,)) as pool:
+        names = pool.map(_tracking_literal, range(8), chunksize=1)
+
+    names.append(_tracking_literal(None))
+    assert len(set(names)) == len(names)
+
+def test_pyState_Solver_is_sat_with():
+    x, y = z3.Ints('x y')
+
+    s = Solver.Solver()
+    s.add(x > 5)
+    s.add(y > 5)
+    assert s.check() == z3.sat
+
+    assert s.is_sat_with(x == 10)
+    assert not s.is_sat_with(x < 3)
+
+    # Memoized on the trail. Asking again doesn't go to the solver.
+    cache = Solver.get_cache()
+    hits, misses = cache.hits, cache.misses
+    assert not s.is_sat_with(x < 3)
+    assert (cache.hits, cache.misses) == (hits, misses)
+
+    # New constraints on x start over
+    s.add(x < 8)
+    assert not s.is_sat_with(x == 10)
@@ -0,0 +1,77 @@
+import sys, os
+myPath = os.path.dirname(os.path.abspath(__file__))
+#sys.path.insert(0, myPath + '/../')
+
+import logging
+from pySym import Colorer
+logging.basicConfig(level=logging.DEBUG,format='%(name)s - %(levelname)s - %(message)s', datefmt='%m/%d/%Y %I:%M:%S %p')
+
+from pySym import ast_parse
+import pickle
+from pySym.pyPath import Path
+from pySym.pyPathGroup import PathGroup
+from pySym.pyState.Stack import Stack
+
+test1 = """
+def f(a):
+    if a > 1:
+        return a
+    return 0
+
+x = 5
+y = f(x)
+z = 1
+"""
+
+def test_pyState_Stack():
+    s = Stack()
+    assert len(s) == 0
+    assert list(s) == []
+
+    s1 = s.push(1)
+    s2 = s1.push(2)
+    s3 = s1.push(3)
+
+    # Pushing never changes the original
+    assert list(s1) == [1]
+    assert list(s2) == [2,1]
+    assert list(s3) == [3,1]
+    assert s2.tail is s3.tail
+    assert s2[0] == 2 and s2[-1] == 1
+
+    # Deep stacks pickle flat
+    for i in range(20000):
+        s = s.push(i)
+    s = pickle.loads(pickle.dumps(s))
+    assert len(s) == 20000
+    assert s[0] == 19999
+
+
+def test_pyState_Stack_state():
+    b = ast_parse.parse(test1).body
+    p = Path(b,source=test1)
+    pg = PathGroup(p)
+
+    # Step into f's if statement
+    while len(pg.active[0].state.callStack) < 2:
+        pg.step()
+
+    state = pg.active[0].state
+    frame = state.callStack.head
+    assert state.lineno() == 4
+    assert state.callStack[-1].path[0].lineno == 8
+
+    # Children share their parent's stacks
+    child = state.copy()
+    assert child.callStack is state.callStack
+    assert child.backtrace is state.backtrace
+
+    stepped = pg.active[0].step()[0].state
+    assert stepped.backtrace.tail is state.backtrace
+    assert state.callStack.head is frame
+
+    pg.explore()
+    assert len(pg.completed) == 1
+    assert pg.completed[0].state.any_int('y') == 5
+    assert [inst.lineno for inst in pg.completed[0].state.backtrace][:2] == [9,8]
+    pg.completed[0].printBacktrace()
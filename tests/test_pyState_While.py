@@ -166,7 +166,7 @@ def test_pySym_funcInWhileTest():
     assert len(pg.active) == 0
     assert len(pg.completed) == 1
     assert len(pg.errored) == 0
-    assert len(pg.deadended) == 6
+    assert len(pg.deadended) == 0
 
     assert pg.completed[0].state.any_int('x') == 5
 
@@ -180,7 +180,7 @@ def test_pySym_simpleWhile():
     assert len(pg.active) == 0
     assert len(pg.completed) == 0
     assert len(pg.errored) == 0
-    assert len(pg.deadended) == 11
+    assert len(pg.deadended) == 0
     assert len(pg.found) == 1
 
     assert pg.found[0].state.isSat()
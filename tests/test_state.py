@@ -334,6 +334,27 @@ def test_any_n_int():
     assert len(pg.completed[0].state.any_n_int('x',10)) == 10
 
 
+def test_is_fixed():
+    b = ast_parse.parse(test4).body
+    p = Path(b,source=test4)
+    pg = PathGroup(p)
+
+    pg.explore()
+
+    assert len(pg.completed) == 1
+    state = pg.completed[0].state
+    x = state.getVar('x')
+    assert not state.is_fixed('x')
+
+    state.addConstraint(x.getZ3Object() > 5)
+    assert not state.is_fixed(x)
+
+    # Answer changes once the variable gets pinned down
+    state.addConstraint(x.getZ3Object() < 7)
+    assert state.is_fixed(x)
+    assert state.any_int(x) == 6
+
+
 def test_assignInt():
     b = ast_parse.parse(test1).body
     p = Path(b,source=test1)
@@ -417,6 +438,30 @@ def test_copy():
     #assert s.objectManager.variables != {0: {}, 1: {'ret': {'count': 0, 'varType': 'z3.IntSort()'}}}
     #assert s2.objectManager.localVars == {0: {}, 1: {'ret': {'count': 0, 'varType': 'z3.IntSort()'}}}
 
+def test_copy_path():
+    source = """
+for x in [1,2]:
+    y = x
+z = 1
+"""
+    b = ast_parse.parse(source).body
+    s = Path(b,source=source).state
+    s2 = s.copy()
+
+    # Only the instruction about to run gets its own copy
+    assert s2.path[0] is not s.path[0]
+    assert s2.path[1] is s.path[1]
+
+    # Running the loop from the copy leaves the original alone
+    pg = PathGroup(Path(state=s2))
+    pg.explore()
+    assert pg.completed[0].state.any_int('y') == 2
+    assert pg.completed[0].state.any_int('z') == 1
+
+    pg = PathGroup(Path(state=s))
+    pg.explore()
+    assert pg.completed[0].state.any_int('y') == 2
+
 def test_any_int():
     b = ast_parse.parse("x = 12").body
     p = Path(b,source="x = 12")